@@ -10,6 +10,7 @@ from src.chemsie.legacy.text_spectra_plotter import (
     parse_proton_nmr, parse_carbon_nmr, parse_ir, parse_ms,
     plot_proton_nmr, plot_carbon_nmr, plot_ir, plot_ms
 )
+from src.parsing.spectra import configure_parse_cache
 from chemsie.internal.wrappers import process_doc_list_pics_first, get_filled_matched_molecule_segments
 
 from models.decimer_functions import get_square_image
@@ -104,9 +105,11 @@ def export_ms_list(ms_list, export_dir=None, image_dir_name='images', graph_sket
     results_df = pd.DataFrame(ms_dict_list)
     return results_df, image_dir_path
 
-def gen_database_from_ms_list(ms_list, export_dir=None, image_dir_name='images', database_name='my_database', graph_sketch=False):
+def gen_database_from_ms_list(ms_list, export_dir=None, image_dir_name='images', database_name='my_database', graph_sketch=False, parse_cache_path=None):
     if export_dir is None:
         export_dir = os.getcwd()
+    if parse_cache_path is not None: # reuse the spectra parsed by earlier export and scoring runs
+        configure_parse_cache(db_path=parse_cache_path)
     database_dir_path = os.path.join(export_dir, database_name)
     os.makedirs(database_dir_path, exist_ok=True)
     results_df, image_dir_path = export_ms_list(ms_list, export_dir=database_dir_path, image_dir_name=image_dir_name, graph_sketch=graph_sketch)
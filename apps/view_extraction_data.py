@@ -4,19 +4,28 @@ View the contents of a ChemSIE JSON extraction file.
 
 This script loads a JSON file that conforms to the ExtractedData schema,
 validates it, and prints a human-readable summary of its contents.
+NDJSON files written by `chemsie.pipeline.stream_extraction` (.ndjson, .jsonl) are
+read and printed line by line, without loading the whole document.
 
 Usage:
     python apps/view_extraction_data.py path/to/extraction.json
+    python apps/view_extraction_data.py path/to/extraction.ndjson
 """
 
 import sys
 import json
 import argparse
+from pathlib import Path
 from pydantic import ValidationError
 
-# As part of the refactor, we assume a project structure where the 'src'
-directory is in the PYTHONPATH.
-from chemsie.schemas import ExtractedData
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from src.chemsie.schemas import ExtractedData, NMRData, ExtractionHeader, MoleculeRecord
+from src.chemsie.streaming import iter_extraction_records, TRUNCATED_ERROR
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
 
 def print_section_header(title: str):
     """Prints a formatted section header."""
@@ -24,25 +33,62 @@ def print_section_header(title: str):
     print(f" {title.upper()}")
     print("=" * 80)
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="View and validate a ChemSIE JSON output file.",
-        formatter_class=argparse.RawTextHelpFormatter
-    )
-    parser.add_argument(
-        "json_file",
-        help="Path to the JSON file containing data extracted by ChemSIE."
-    )
-    args = parser.parse_args()
+def print_molecule(i, mol):
+    print(f"  {i}. Molecule ID: {mol.id}")
+    print(f"     Label: {mol.label or 'N/A'}")
+    print(f"     SMILES: {mol.smiles or 'N/A'}")
+    print(f"     InChI: {mol.inchi or 'N/A'}")
+    print(f"     Provenance sources: {len(mol.provenance)}")
+    # Display the first provenance item for brevity
+    if mol.provenance:
+        p = mol.provenance[0]
+        print(f"       e.g., Page {p.page_number}, Type: {p.source}, Confidence: {p.confidence or 'N/A'}")
+    print("-" * 40)
+
+def print_spectrum(i, spectrum):
+    spectrum = spectrum.to_rows()
+    if isinstance(spectrum, NMRData):
+        print(f"  {i}. Spectrum ID: {spectrum.id} ({spectrum.nucleus} NMR)")
+        print(f"     Associated Molecule ID: {spectrum.molecule_id}")
+        print(f"     Solvent: {spectrum.solvent or 'N/A'}")
+        print(f"     Peaks Found: {len(spectrum.peaks)}")
+        if spectrum.peaks:
+            p = spectrum.peaks[0]
+            print(f"       e.g., Peak at {p.shift} ppm")
+    else:
+        print(f"  {i}. Spectrum: {spectrum.type}")
+        print(f"     Associated Molecule ID: {spectrum.molecule_id or 'N/A'}")
+        print(f"     Peaks Found: {len(spectrum.peaks or [])}")
+    print("-" * 40)
+
+def print_reaction(i, reaction):
+    print(f"  {i}. Reaction ID: {reaction.id}")
+    roles = {'reactant': [], 'reagent': [], 'product': []}
+    for comp in reaction.components:
+        if comp.role in roles:
+            roles[comp.role].append(comp.molecule_id)
+    print(f"     Reactants: {roles['reactant']}")
+    print(f"     Reagents: {roles['reagent']}")
+    print(f"     Products: {roles['product']}")
+    if reaction.yield_value:
+        print(f"     Yield: {reaction.yield_value.value} {reaction.yield_value.units}")
+    print("-" * 40)
+
+def print_errors(errors):
+    if errors:
+        print_section_header("Processing Errors")
+        for error_msg in errors:
+            print(f"  - {error_msg}")
 
+def view_json(json_file):
     # --- Load and Validate ---
-    print(f"Loading and validating: {args.json_file}")
+    print(f"Loading and validating: {json_file}")
     try:
         # Pydantic handles both file reading and validation in one step.
         # This replaces the entire 'pickle_loader' system.
-        data = ExtractedData.parse_file(args.json_file)
+        data = ExtractedData.parse_file(json_file)
     except FileNotFoundError:
-        print(f"Error: File not found at '{args.json_file}'", file=sys.stderr)
+        print(f"Error: File not found at '{json_file}'", file=sys.stderr)
         sys.exit(1)
     except ValidationError as e:
         print(f"Error: The JSON file is invalid or does not conform to the schema.", file=sys.stderr)
@@ -51,7 +97,7 @@ def main():
         print(e, file=sys.stderr)
         sys.exit(1)
     except json.JSONDecodeError:
-        print(f"Error: The file at '{args.json_file}' is not a valid JSON file.", file=sys.stderr)
+        print(f"Error: The file at '{json_file}' is not a valid JSON file.", file=sys.stderr)
         sys.exit(1)
 
     print("Validation successful.")
@@ -70,56 +116,84 @@ def main():
     if data.molecules:
         print_section_header("Molecules")
         for i, mol in enumerate(data.molecules, 1):
-            print(f"  {i}. Molecule ID: {mol.id}")
-            print(f"     Label: {mol.label or 'N/A'}")
-            print(f"     SMILES: {mol.smiles or 'N/A'}")
-            print(f"     InChI: {mol.inchi or 'N/A'}")
-            print(f"     Provenance sources: {len(mol.provenance)}")
-            # Display the first provenance item for brevity
-            if mol.provenance:
-                p = mol.provenance[0]
-                print(f"       e.g., Page {p.page_number}, Type: {p.source}, Confidence: {p.confidence or 'N/A'}")
-            print("-" * 40)
+            print_molecule(i, mol)
 
     # --- Display Reactions ---
     if data.reactions:
         print_section_header("Reactions")
         for i, reaction in enumerate(data.reactions, 1):
-            print(f"  {i}. Reaction ID: {reaction.id}")
-            roles = {'reactant': [], 'reagent': [], 'product': []}
-            for comp in reaction.components:
-                if comp.role in roles:
-                    roles[comp.role].append(comp.molecule_id)
-            print(f"     Reactants: {roles['reactant']}")
-            print(f"     Reagents: {roles['reagent']}")
-            print(f"     Products: {roles['product']}")
-            if reaction.yield_value:
-                print(f"     Yield: {reaction.yield_value.value} {reaction.yield_value.units}")
-            print("-" * 40)
+            print_reaction(i, reaction)
 
     # --- Display Spectra ---
     if data.spectra:
         print_section_header("Spectra")
         for i, spectrum in enumerate(data.spectra, 1):
-            print(f"  {i}. Spectrum ID: {spectrum.id} ({spectrum.nucleus} NMR)")
-            print(f"     Associated Molecule ID: {spectrum.molecule_id}")
-            print(f"     Solvent: {spectrum.solvent or 'N/A'}")
-            print(f"     Peaks Found: {len(spectrum.peaks)}")
-            if spectrum.peaks:
-                p = spectrum.peaks[0]
-                print(f"       e.g., Peak at {p.shift} ppm")
-            print("-" * 40)
+            print_spectrum(i, spectrum)
 
     # --- Display Errors ---
-    if data.errors:
-        print_section_header("Processing Errors")
-        for error_msg in data.errors:
-            print(f"  - {error_msg}")
+    print_errors(data.errors)
+
+def view_ndjson(ndjson_file):
+    """Validates and prints an NDJSON extraction record by record, the summary comes last."""
+    print(f"Streaming and validating: {ndjson_file}")
+    num_molecules, num_spectra, footer = 0, 0, None
+    try:
+        for record in iter_extraction_records(ndjson_file):
+            if isinstance(record, ExtractionHeader):
+                print(f"Source Document: {record.source_filename}")
+                print_section_header("Molecules")
+            elif isinstance(record, MoleculeRecord):
+                num_molecules += 1
+                print_molecule(num_molecules, record.molecule)
+                for spectrum in record.spectra:
+                    num_spectra += 1
+                    print_spectrum(num_spectra, spectrum)
+            else:
+                footer = record
+    except FileNotFoundError:
+        print(f"Error: File not found at '{ndjson_file}'", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: The NDJSON file is invalid or does not conform to the schema.", file=sys.stderr)
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    print("Validation successful.")
+    reactions, errors = (footer.reactions, footer.errors) if footer is not None else ([], [TRUNCATED_ERROR])
+
+    # --- Display Reactions ---
+    if reactions:
+        print_section_header("Reactions")
+        for i, reaction in enumerate(reactions, 1):
+            print_reaction(i, reaction)
+
+    # --- Display Summary ---
+    print_section_header("Extraction Summary")
+    print(f"Total Molecules Extracted: {num_molecules}")
+    print(f"Total Reactions Extracted: {len(reactions)}")
+    print(f"Total Spectra Datasets Extracted: {num_spectra}")
+    if errors:
+        print(f"Processing Errors Encountered: {len(errors)}")
+
+    # --- Display Errors ---
+    print_errors(errors)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="View and validate a ChemSIE JSON or NDJSON output file.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "json_file",
+        help="Path to the JSON (or streamed .ndjson) file containing data extracted by ChemSIE."
+    )
+    args = parser.parse_args()
+
+    if args.json_file.endswith(NDJSON_SUFFIXES):
+        view_ndjson(args.json_file)
+    else:
+        view_json(args.json_file)
 
 
 if __name__ == "__main__":
-    # To run this script, ensure the 'src' directory is in your PYTHONPATH:
-    # export PYTHONPATH=$PYTHONPATH:./src
-    # Or on Windows:
-    # set PYTHONPATH=%PYTHONPATH%;./src
     main()
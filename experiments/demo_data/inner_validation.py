@@ -3,6 +3,8 @@ import re
 from scipy.optimize import linear_sum_assignment
 from difflib import SequenceMatcher
 
+from src.parsing.spectra import get_parse_cache
+
 def molecule_segment_to_dict_list(molecule_segment):
     dict_list = []
     mol_name = molecule_segment.molecule_name
@@ -168,14 +170,23 @@ def hrms_peak_patch(test_text, test_type):
         float_shifts = list(map(float, get_peaks_from_text(test_text)))
     return float_shifts 
 
+SCORE_PEAKS_VERSION = '1' # bump when hrms_peak_patch changes, the cache key only has the parser version of spectra
+
+def _parse_score_peaks(kind, test_text):
+    return hrms_peak_patch(test_text, kind.split(':', 2)[2])
+
+def get_score_peaks(test_text, test_type):
+    """hrms_peak_patch through the shared parse cache, as the same texts are scored against many candidates."""
+    return get_parse_cache().get_or_parse(f'score_peaks:{SCORE_PEAKS_VERSION}:{test_type}', test_text, _parse_score_peaks)
+
 def get_peak_score(gt_test_text, test_type, method = 'in_house', sus_test_text='', chemdata_dict=None):
     if gt_test_text in sus_test_text:
         return 1.0, 1.0, 1.0
      
-    float_gt_shifts = hrms_peak_patch(gt_test_text, test_type)
+    float_gt_shifts = get_score_peaks(gt_test_text, test_type)
 
     if method == 'in_house':
-        float_sus_shifts = hrms_peak_patch(sus_test_text, test_type)
+        float_sus_shifts = get_score_peaks(sus_test_text, test_type)
     elif method == 'chemdata':
         float_sus_shifts = get_peaks_from_nmrspectrum_dict(chemdata_dict)
     
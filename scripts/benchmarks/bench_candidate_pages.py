@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Structure detection on all pages against the candidate pages of a text-only pre-pass.
+
+Builds a thesis-like document: --filler_pages pages of prose (no test lines, as the chapters
+before an experimental section) followed by the pages of the demo PDFs (the experimental
+section). Then it times the text pre-pass (get_candidate_pages, --neighbourhood pages around
+every page with a test line) and extract_pics_from_pdf with the yode backend on all pages and
+on the candidate pages, and reports how many of the structures found on all pages are found
+on the candidate ones. Needs yolov5 and the YoDe weights (src/models/best.pt, or --weights).
+
+Usage:
+    python scripts/benchmarks/bench_candidate_pages.py
+    python scripts/benchmarks/bench_candidate_pages.py --filler_pages 100 --neighbourhood 0
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Only YoDe runs here, mock the other ML dependencies if they are not installed
+for name in ['decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_render_pipeline import make_document
+
+from src.chemsie.internal.full_process import get_candidate_pages
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.models.yode_backend import _get_yolo_model
+
+WORDS = ('the of synthesis reaction catalyst ligand yield selectivity mechanism substrate scope chapter '
+         'introduction results discussion proposed studies reported conditions temperature solvent').split()
+
+
+def make_thesis(pdf_paths, num_filler_pages, output_path, seed):
+    rng = random.Random(seed)
+    thesis = pymupdf.open()
+    for _ in range(num_filler_pages):
+        page = thesis.new_page() # letter size
+        text = '\n\n'.join(' '.join(rng.choice(WORDS) for _ in range(90)).capitalize() + '.' for _ in range(6))
+        page.insert_textbox(pymupdf.Rect(72, 72, 540, 720), text, fontsize=11)
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as experimental:
+        make_document(pdf_paths, sum(pymupdf.open(pdf_path).page_count for pdf_path in pdf_paths), experimental.name)
+        with pymupdf.open(experimental.name) as source:
+            thesis.insert_pdf(source)
+    thesis.save(output_path)
+    thesis.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection on candidate pages.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--filler_pages", type=int, default=340)
+    parser.add_argument("--neighbourhood", type=int, default=1)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        thesis_path = os.path.join(tmp_dir, 'thesis.pdf')
+        make_thesis(pdf_paths, args.filler_pages, thesis_path, args.seed)
+        num_pages = pymupdf.open(thesis_path).page_count
+
+        start = time.perf_counter()
+        candidate_pages = [page_num for page_num in get_candidate_pages(extract_document_lines(thesis_path), args.neighbourhood)
+                           if page_num < num_pages]
+        prepass_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        all_pics = extract_pics_from_pdf(thesis_path, backend='yode')
+        all_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        candidate_pics = extract_pics_from_pdf(thesis_path, backend='yode', pages=candidate_pages)
+        candidate_seconds = time.perf_counter() - start
+
+    found = {(mol_pic.page_num, mol_pic.bbox) for mol_pic in candidate_pics}
+    kept = sum((mol_pic.page_num, mol_pic.bbox) in found for mol_pic in all_pics)
+    print(f"{num_pages} pages ({args.filler_pages} filler), {len(candidate_pages)} candidate pages (neighbourhood {args.neighbourhood})\n")
+    print(f"{'route':<22} {'pages':>6} {'seconds':>8} {'structures':>11}")
+    print(f"{'all pages':<22} {num_pages:>6} {all_seconds:>8.2f} {len(all_pics):>11}")
+    print(f"{'candidate pages':<22} {len(candidate_pages):>6} {prepass_seconds + candidate_seconds:>8.2f} {len(candidate_pics):>11}"
+          f"   (pre-pass {prepass_seconds:.2f} s)")
+    print(f"\nspeedup {all_seconds/(prepass_seconds + candidate_seconds):.1f}x, structures of all pages kept: {kept}/{len(all_pics)}")
+
+
+if __name__ == "__main__":
+    main()
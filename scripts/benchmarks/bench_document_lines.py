@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Memory and speed of the columnar DocumentLines against the list of (multi_idx, text, bbox) tuples.
+
+For synthetic documents (see bench_line_index.py) and the demo PDFs, reports the memory held
+by the line store and the time of the whole-document test-line scan and segmentation, and
+checks that both stores give the same segments.
+
+Usage:
+    python scripts/benchmarks/bench_document_lines.py
+    python scripts/benchmarks/bench_document_lines.py --pages 500 2000 --pdf_dir data/
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Segmentation does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_line_index import make_document
+from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+from src.chemsie.internal.test_text_line import extract_test_text_lines
+from src.chemsie.internal.segments_creation import locate_molecule_segments
+
+
+def get_store_size(build):
+    tracemalloc.start()
+    store = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size
+
+
+def run_store(lines):
+    start = time.perf_counter()
+    test_lines = extract_test_text_lines(lines, test_names=[r'NMR'])
+    scan_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    molecule_segments = locate_molecule_segments(lines, tokens_mark=60, spaces_mark=30)
+    segment_seconds = time.perf_counter() - start
+    signature = (sorted((test_line.start_multi_idx, test_line.text) for test_line in test_lines),
+                 [(repr(segment), segment.start_multi_idx, segment.end_multi_idx) for segment in molecule_segments])
+    return scan_seconds, segment_seconds, signature
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar line store.")
+    parser.add_argument("--pages", type=int, nargs='+', default=[500, 2000])
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    args = parser.parse_args()
+
+    documents = [(f'synthetic {num_pages}p', lambda num_pages=num_pages: make_document(num_pages)) for num_pages in args.pages]
+    documents += [(pdf_file, lambda pdf_file=pdf_file: extract_text_with_multi_idx(os.path.join(args.pdf_dir, pdf_file)))
+                  for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf'))]
+
+    print(f"{'document':<28} {'store':<8} {'lines':>7} {'MB':>7} {'scan s':>7} {'segment s':>10} {'same':>5}")
+    for document_name, get_lines in documents:
+        tuple_lines, tuple_size = get_store_size(get_lines)
+        document_lines, columnar_size = get_store_size(lambda: DocumentLines.from_tuples(tuple_lines))
+        reference = None
+        for store_name, lines, size in [('tuples', tuple_lines, tuple_size), ('columnar', document_lines, columnar_size)]:
+            scan_seconds, segment_seconds, signature = run_store(lines)
+            reference = signature if reference is None else reference
+            print(f"{document_name:<28} {store_name:<8} {len(lines):>7} {size/2**20:>7.2f} "
+                  f"{scan_seconds:>7.2f} {segment_seconds:>10.2f} {str(signature==reference):>5}")
+
+
+if __name__ == "__main__":
+    main()
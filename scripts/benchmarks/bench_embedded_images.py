@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Rendered pages against embedded images for structures pasted into a PDF as bitmaps.
+
+Builds a document whose pages are the first --max_pages pages of each demo PDF rasterised at
+--dpi and pasted back as one image each (as a scanned SI, or figures pasted as bitmaps), then
+extracts its structure images with extract_pics_from_pdf (yode backend) two ways:
+- rendered: each page rendered at the detection size, crops rendered at 300 dpi (render_clip);
+- embedded: each page composed from its decoded image at the detection size, crops cut from
+  the native pixels of the image (compose_embedded_page, get_embedded_crop).
+and reports time, how many MolPic bboxes (percent of the page) of the rendered route the
+embedded one finds with an IoU of at least --iou, and the mean crop size. Needs yolov5 and the
+YoDe weights (src/models/best.pt, or --weights); a low --conf_thres gives more boxes.
+
+Usage:
+    python scripts/benchmarks/bench_embedded_images.py
+    python scripts/benchmarks/bench_embedded_images.py --max_pages 3 --dpi 200 --conf_thres 0.05
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from bench_two_resolution import iou
+
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import iter_page_segments_yode, get_page_mol_pics
+from src.models.yode_backend import _get_yolo_model, iter_detect_chemical_structures_yode
+
+
+def make_bitmap_document(pdf_paths, max_pages, dpi, output_path):
+    document = pymupdf.open()
+    for pdf_path in pdf_paths:
+        with pymupdf.open(pdf_path) as source:
+            for page in list(source)[:max_pages]:
+                pix = page.get_pixmap(matrix=pymupdf.Matrix(dpi / 72, dpi / 72), alpha=False)
+                document.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pix)
+    document.save(output_path, deflate=True)
+    document.close()
+
+
+def extract(pdf_path, embedded_images):
+    mol_pics, crop_sizes = [], []
+    for (_, page_num), page_shape, page_segments in iter_page_segments_yode([pdf_path], embedded_images=embedded_images):
+        crop_sizes += [segment.shape[0]*segment.shape[1] for segment in page_segments[0]]
+        mol_pics += get_page_mol_pics(page_num, page_segments, page_shape, pdf_path)
+    return mol_pics, crop_sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark direct extraction of embedded structure images.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--max_pages", type=int, default=4)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--conf_thres", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.9)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    mol_pic.iter_detect_chemical_structures_yode = partial(iter_detect_chemical_structures_yode, conf_thres=args.conf_thres)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'bitmaps.pdf')
+        make_bitmap_document(pdf_paths, args.max_pages, args.dpi, pdf_path)
+        num_pages = pymupdf.open(pdf_path).page_count
+        print(f"{num_pages} pages pasted as {args.dpi} dpi bitmaps\n")
+        print(f"{'route':<10} {'seconds':>8} {'pics':>6} {'matched':>8} {'mean crop px':>13}")
+        reference = None
+        for route_name, embedded_images in [('rendered', False), ('embedded', True)]:
+            start = time.perf_counter()
+            mol_pics, crop_sizes = extract(pdf_path, embedded_images)
+            seconds = time.perf_counter() - start
+            found = [(pic.page_num, pic.bbox) for pic in mol_pics]
+            reference = found if reference is None else reference
+            matched = sum(any(page_num == other_page_num and iou(bbox, other_bbox) >= args.iou for other_page_num, other_bbox in found)
+                          for page_num, bbox in reference)
+            print(f"{route_name:<10} {seconds:>8.2f} {len(found):>6} {matched:>8} {np.mean(crop_sizes) if crop_sizes else 0:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
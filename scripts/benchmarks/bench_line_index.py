@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the multi_idx line lookups on synthetic documents.
+
+Builds documents of repeated experimental blocks (name, procedure, 1H/13C NMR, HRMS) and times
+test-line extraction plus sequence sorting with the LineIndex lookups and with the reference
+linear scan over the multi_idx list. The scan is quadratic in document length, so it is only
+run up to --max_scan_pages.
+
+Usage:
+    python scripts/benchmarks/bench_line_index.py
+    python scripts/benchmarks/bench_line_index.py --pages 250 500 1000 2000 --max_scan_pages 500
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+import src.chemsie.internal.test_text_line as test_text_line
+import src.chemsie.internal.test_text_sequence as test_text_sequence
+from src.chemsie.internal.test_text_line import extract_test_text_lines
+from src.chemsie.internal.test_text_sequence import sort_test_lines_to_sequences
+from src.chemsie.utils.general import LineIndex
+
+BLOCK = ['methyl 2-(4-methoxyphenyl)-3-oxobutanoate ({compound})',
+         'To a solution of the ketone in dry THF was added the reagent at room temperature.',
+         'The mixture was stirred for two hours and then concentrated under reduced pressure.',
+         '1H NMR (400 MHz, CDCl3) δ 7.26 (d, J = 8.4 Hz, 2H), 6.88 (d, J = 8.4 Hz, 2H), 3.80 (s, 3H).',
+         '13C NMR (101 MHz, CDCl3) δ 170.1, 159.3, 130.2, 114.0, 55.3.',
+         'HRMS (ESI) m/z calcd for C12H14O4 [M+H]+ 223.0965, found 223.0961.']
+
+
+def make_document(num_pages, lines_per_page=36):
+    page_lines = []
+    for page_num in range(num_pages):
+        for line_num in range(lines_per_page):
+            block_idx, block_line = divmod(page_num*lines_per_page + line_num, len(BLOCK))
+            text = BLOCK[block_line].format(compound=block_idx)
+            bbox = (round(100*line_num/lines_per_page, 2), 10.0, round(100*(line_num + 1)/lines_per_page, 2), 90.0)
+            page_lines.append((f'{page_num}_{line_num}', text, bbox))
+    return page_lines
+
+
+class ScanIndex(list):
+    """The multi_idx list of the lines, resolved by a linear scan as before the LineIndex."""
+    def __init__(self, lines):
+        super().__init__(line if isinstance(line, str) else line[0] for line in lines)
+
+
+def run_lookups(page_lines):
+    start = time.perf_counter()
+    test_lines = extract_test_text_lines(page_lines, test_names=[r'NMR'])
+    test_lines = sorted(test_lines, key=lambda test_line: (test_line.start_page, test_line.start_line))
+    sequences = sort_test_lines_to_sequences(test_lines, test_text_line.LineIndex(page_lines))
+    return time.perf_counter() - start, len(test_lines), len(sequences)
+
+
+def run_with_index(index_class, page_lines):
+    test_text_line.LineIndex = index_class
+    test_text_sequence.LineIndex = index_class
+    try:
+        return run_lookups(page_lines)
+    finally:
+        test_text_line.LineIndex = LineIndex
+        test_text_sequence.LineIndex = LineIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi_idx lookups on synthetic documents.")
+    parser.add_argument("--pages", type=int, nargs='+', default=[250, 500, 1000, 2000])
+    parser.add_argument("--max_scan_pages", type=int, default=500, help="Largest document the linear scan is run on.")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'lines':>8} {'test lines':>11} {'index s':>9} {'ms/page':>8} {'scan s':>9} {'speedup':>8}")
+    for num_pages in args.pages:
+        page_lines = make_document(num_pages)
+        index_seconds, num_test_lines, num_sequences = run_with_index(LineIndex, page_lines)
+        if num_pages<=args.max_scan_pages:
+            scan_seconds, scan_test_lines, scan_sequences = run_with_index(ScanIndex, page_lines)
+            assert (scan_test_lines, scan_sequences)==(num_test_lines, num_sequences)
+            scan_text, speedup = f"{scan_seconds:>9.2f}", f"{scan_seconds/index_seconds:>7.1f}x"
+        else:
+            scan_text, speedup = f"{'-':>9}", f"{'-':>8}"
+        print(f"{num_pages:>6} {len(page_lines):>8} {num_test_lines:>11} {index_seconds:>9.2f} "
+              f"{1000*index_seconds/num_pages:>8.2f} {scan_text} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
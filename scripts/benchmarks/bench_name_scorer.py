@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the molecule-name line scorer.
+
+Scores every text line of the PDFs with the reference path (pattern list rebuilt and the
+regex assembled for every line) and with the compiled, memoised MoleculeNameScorer, then
+checks that both give the same scores.
+
+Usage:
+    python scripts/benchmarks/bench_name_scorer.py
+    python scripts/benchmarks/bench_name_scorer.py --pdf_dir data/ --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+from src.chemsie.internal.tokenizer.base_tokenize import tokenize
+from src.chemsie.internal.tokenizer.molecule_name import load_default_molecule_name_tokens, MoleculeNameScorer
+
+
+def reference_probability(word):
+    if not word:
+        return 0
+    word_tokens = tokenize(word, load_default_molecule_name_tokens())
+    return 100*sum(map(len, word_tokens))/len(word)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the molecule-name line scorer.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--repeat", type=int, default=3, help="Times the line set is scored (repeated documents hit the memo).")
+    args = parser.parse_args()
+
+    line_texts = []
+    for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf')):
+        page_lines = extract_text_with_multi_idx(os.path.join(args.pdf_dir, pdf_file))
+        line_texts.extend(line_text for _, line_text, _ in page_lines)
+    print(f"lines: {len(line_texts)}, unique: {len(set(line_texts))}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        reference_scores = [reference_probability(line_text) for line_text in line_texts]
+    reference_seconds = time.perf_counter() - start
+
+    scorer = MoleculeNameScorer()
+    start = time.perf_counter()
+    first_scores = scorer.score_lines(line_texts)
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        scores = scorer.score_lines(line_texts)
+    warm_seconds = time.perf_counter() - start
+
+    total_lines = len(line_texts)*args.repeat
+    print(f"{'path':<20} {'lines/sec':>12}")
+    print(f"{'reference':<20} {total_lines/reference_seconds:>12.0f}")
+    print(f"{'compiled (cold)':<20} {len(line_texts)/cold_seconds:>12.0f}")
+    print(f"{'compiled (memo)':<20} {total_lines/warm_seconds:>12.0f}")
+    print(f"speedup: cold {reference_seconds/args.repeat/cold_seconds:.1f}x, memo {reference_seconds/warm_seconds:.1f}x")
+    print(f"identical scores: {scores==reference_scores and first_scores==reference_scores}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Structure detection with and without the structure-free page pre-filter.
+
+Builds the thesis-like document of bench_candidate_pages (--filler_pages pages of prose, then the
+pages of the demo PDFs) and, for each demo PDF on its own and the thesis, times
+extract_pics_from_pdf with the yode backend with page_filter None (every page rendered) and
+'skip', then runs 'check' (every page rendered, structures found on pages the filter would skip
+counted as misses) and reports the page stats. Filter is the time of the page inspection alone.
+Needs yolov5 and the YoDe weights (src/models/best.pt, or --weights).
+
+Usage:
+    python scripts/benchmarks/bench_page_filter.py
+    python scripts/benchmarks/bench_page_filter.py --filler_pages 50 --conf_thres 0.1
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+from functools import partial
+from pathlib import Path
+
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from bench_candidate_pages import make_thesis
+
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf
+from src.chemsie.internal.page_filter import get_structure_free_pages
+from src.models.yode_backend import _get_yolo_model, iter_detect_chemical_structures_yode
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the structure-free page pre-filter.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--filler_pages", type=int, default=100)
+    parser.add_argument("--conf_thres", type=float, default=0.25)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    mol_pic.iter_detect_chemical_structures_yode = partial(iter_detect_chemical_structures_yode, conf_thres=args.conf_thres)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+
+    print(f"{'document':<24} {'pages':>5} {'skipped':>7} {'filter s':>8} {'all s':>7} {'skip s':>7} {'speedup':>7} "
+          f"{'pics':>5} {'kept':>5} {'missed':>6}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        thesis_path = os.path.join(tmp_dir, 'thesis.pdf')
+        make_thesis(pdf_paths, args.filler_pages, thesis_path, args.seed)
+        for pdf_path in pdf_paths + [thesis_path]:
+            with pymupdf.open(pdf_path) as pdf_document:
+                num_pages = pdf_document.page_count
+                filter_seconds, _ = timed(lambda: get_structure_free_pages(pdf_document, range(num_pages)))
+            all_seconds, all_pics = timed(lambda: extract_pics_from_pdf(pdf_path, backend='yode', page_filter=None))
+            skip_stats, check_stats = dict(), dict()
+            skip_seconds, skip_pics = timed(lambda: extract_pics_from_pdf(pdf_path, backend='yode', page_stats=skip_stats))
+            extract_pics_from_pdf(pdf_path, backend='yode', page_filter='check', page_stats=check_stats)
+            found = {(pic.page_num, pic.bbox) for pic in skip_pics}
+            kept = sum((pic.page_num, pic.bbox) in found for pic in all_pics)
+            print(f"{os.path.basename(pdf_path):<24} {num_pages:>5} {skip_stats.get('skipped_pages', 0):>7} {filter_seconds:>8.2f} "
+                  f"{all_seconds:>7.2f} {skip_seconds:>7.2f} {all_seconds/skip_seconds:>6.1f}x {len(all_pics):>5} {kept:>5} "
+                  f"{check_stats.get('missed_pages', 0):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Repeated spectra parsing with and without the content-keyed ParseCache.
+
+A test text is parsed when its ExtractedTest is built, again by the database export, again
+for its plot and again when it is scored. This replays those passes over the test texts of
+bench_spectra_parser.py: without the cache (a batch of one text per call), with the in-memory
+cache, and in a new process warm-started from a cache on disk. All must give the same peaks.
+
+Usage:
+    python scripts/benchmarks/bench_parse_cache.py
+    python scripts/benchmarks/bench_parse_cache.py --texts 20000 --passes 4
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Parsing does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_spectra_parser import PARSERS, get_pdf_texts, make_text
+from src.parsing.spectra import parse_peaks, parse_spectra_batch, configure_parse_cache
+
+
+def run_passes(test_items, num_passes):
+    return [[parse_peaks(text, test_type) for test_type, text in test_items] for _ in range(num_passes)]
+
+
+def run_uncached_passes(test_items, num_passes):
+    return [[parse_spectra_batch([text], test_type).to_records(0) for test_type, text in test_items] for _ in range(num_passes)]
+
+
+def time_it(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the spectra parse cache.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--texts", type=int, default=5000, help="texts per spectrum kind")
+    parser.add_argument("--passes", type=int, default=4, help="times every text is parsed (build, export, plot, score)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pdf_texts = get_pdf_texts(args.pdf_dir)
+    test_items = []
+    for spectrum_kind, test_type, _, _ in PARSERS:
+        texts = list(pdf_texts[spectrum_kind])
+        texts += [make_text(spectrum_kind, rng) for _ in range(args.texts - len(texts))]
+        test_items += [(test_type, text) for text in texts]
+
+    uncached_seconds, uncached_results = time_it(lambda: run_uncached_passes(test_items, args.passes))
+
+    parse_cache = configure_parse_cache()
+    cached_seconds, cached_results = time_it(lambda: run_passes(test_items, args.passes))
+    memory_stats = parse_cache.get_stats()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'parse_cache.sqlite')
+        parse_cache = configure_parse_cache(db_path=db_path)
+        disk_cold_seconds, _ = time_it(lambda: (run_passes(test_items, 1), parse_cache.close()))
+        parse_cache = configure_parse_cache(db_path=db_path)
+        disk_warm_seconds, disk_results = time_it(lambda: run_passes(test_items, args.passes))
+        disk_stats = parse_cache.get_stats()
+        parse_cache.close()
+
+    same = uncached_results==cached_results==disk_results
+    print(f"{len(test_items)} texts x {args.passes} passes\n")
+    print(f"{'run':<22} {'seconds':>8} {'speedup':>8} {'hit rate':>9}")
+    print(f"{'no cache':<22} {uncached_seconds:>8.2f} {1.0:>7.1f}x {'-':>9}")
+    print(f"{'memory cache':<22} {cached_seconds:>8.2f} {uncached_seconds/cached_seconds:>7.1f}x {memory_stats['hit_rate']:>9}")
+    print(f"{'disk, warm start':<22} {disk_warm_seconds:>8.2f} {uncached_seconds/disk_warm_seconds:>7.1f}x {disk_stats['hit_rate']:>9}")
+    print(f"{'disk, filling 1 pass':<22} {disk_cold_seconds:>8.2f}")
+    print(f"\nsame peaks: {same}")
+
+
+if __name__ == "__main__":
+    main()
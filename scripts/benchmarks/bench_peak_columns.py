@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+JSON size and validate / serialise time of ExtractedData with row and columnar peaks.
+
+Builds a synthetic document of --molecules molecules, each with a 1H and a 13C NMRData
+(one NMRPeak with its Provenance per peak) and an IR and an MS Spectrum as the legacy
+parsers give them, then compares the row form with ExtractedData.to_columnar(): JSON bytes,
+model_dump_json and model_validate_json time. Peak provenances are either the provenance of
+the whole text (as the pipeline has them now) or one with its own span per peak, which the
+columnar form cannot share. The columnar JSON must round-trip to the row models.
+
+Usage:
+    python scripts/benchmarks/bench_peak_columns.py
+    python scripts/benchmarks/bench_peak_columns.py --molecules 2000
+"""
+
+import sys
+import time
+import random
+import argparse
+import warnings
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+warnings.filterwarnings('ignore', message='Valid config keys have changed in V2')
+
+from src.chemsie.schemas import (ExtractedData, Molecule, NMRData, NMRPeak, Spectrum, Provenance, MoleculeProvenance,
+                                 BoundingBox, Span, ExtractionMethod)
+
+
+def make_provenance(rng, page_number, span=None):
+    x0, y0 = rng.uniform(50, 300), rng.uniform(50, 700)
+    return Provenance(page_number=page_number, bbox=BoundingBox(x0=x0, y0=y0, x1=x0 + 250, y1=y0 + 40), source="text",
+                      span=span, method=ExtractionMethod(algorithm="regex", version="1.0", confidence=0.9), confidence=0.9)
+
+
+def make_nmr_data(rng, molecule_id, nucleus, num_peaks, page_number, per_peak_spans):
+    provenance = make_provenance(rng, page_number)
+    peaks = []
+    for peak_idx in range(num_peaks):
+        peak_provenance = provenance
+        if per_peak_spans:
+            peak_provenance = provenance.model_copy(update={'span': Span(start=10*peak_idx, end=10*peak_idx + 8, text=f'{peak_idx}.00 (s)')})
+        if nucleus=='1H':
+            multiplicity = rng.choice(['s', 'd', 't', 'q', 'dd', 'm'])
+            peaks.append(NMRPeak(shift=round(rng.uniform(0.5, 8.5), 2), multiplicity=multiplicity, integration=float(rng.randint(1, 6)),
+                                 coupling_constants=[round(rng.uniform(1, 16), 1)] if multiplicity not in ('s', 'm') else [],
+                                 provenance=peak_provenance))
+        else:
+            peaks.append(NMRPeak(shift=round(rng.uniform(10, 210), 1), provenance=peak_provenance))
+    return NMRData(id=f'{molecule_id}-{nucleus}', molecule_id=molecule_id, nucleus=nucleus, frequency='400 MHz', peaks=peaks,
+                   raw_text=f'{nucleus} NMR (400 MHz, CDCl3) δ ...', provenance=provenance)
+
+
+def make_document(num_molecules, per_peak_spans, seed=0):
+    rng = random.Random(seed)
+    molecules, spectra = [], []
+    for molecule_idx in range(num_molecules):
+        molecule_id = f'mol-{molecule_idx}'
+        page_number = molecule_idx//3 + 1
+        molecules.append(Molecule(id=molecule_id, label=f'{molecule_idx}a', smiles='c1ccccc1',
+                                  provenance=[MoleculeProvenance(role="label_text", **make_provenance(rng, page_number).model_dump())]))
+        spectra.append(make_nmr_data(rng, molecule_id, '1H', rng.randint(6, 14), page_number, per_peak_spans))
+        spectra.append(make_nmr_data(rng, molecule_id, '13C', rng.randint(8, 20), page_number, per_peak_spans))
+        spectra.append(Spectrum(type='IR', molecule_id=molecule_id, text_representation='IR (neat) ...',
+                                peaks=[{"wn": float(rng.randint(600, 3600)), "intensity": 0.55, "broad": False, "raw": "1720 m"}
+                                       for _ in range(rng.randint(4, 9))]))
+        spectra.append(Spectrum(type='MS', molecule_id=molecule_id, text_representation='MS (EI) ...',
+                                peaks=[(float(rng.randint(40, 600)), 100.0, "") for _ in range(rng.randint(2, 6))]))
+    return ExtractedData(source_filename='synthetic.pdf', molecules=molecules, reactions=[], spectra=spectra)
+
+
+def time_best(function, repeats):
+    best, result = None, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark columnar peak encoding.")
+    parser.add_argument("--molecules", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'provenance':<16} {'form':<9} {'JSON MB':>8} {'dump s':>7} {'validate s':>11} {'convert s':>10} {'round trip':>11}")
+    for per_peak_spans in [False, True]:
+        extracted_data = make_document(args.molecules, per_peak_spans)
+        convert_seconds, columnar_data = time_best(extracted_data.to_columnar, args.repeats)
+        for form, data, convert in [('rows', extracted_data, None), ('columnar', columnar_data, convert_seconds)]:
+            dump_seconds, json_text = time_best(data.model_dump_json, args.repeats)
+            validate_seconds, validated = time_best(lambda: ExtractedData.model_validate_json(json_text), args.repeats)
+            same = validated.to_rows().model_dump_json()==extracted_data.model_dump_json()
+            print(f"{'per-peak span' if per_peak_spans else 'shared':<16} {form:<9} {len(json_text.encode())/2**20:>8.2f} {dump_seconds:>7.3f} "
+                  f"{validate_seconds:>11.3f} {'-' if convert is None else f'{convert:.3f}':>10} {str(same):>11}")
+
+
+if __name__ == "__main__":
+    main()
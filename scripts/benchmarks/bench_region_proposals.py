@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Full-page structure detection against detection on vector-drawing region proposals.
+
+For each demo PDF, extracts its structure images with extract_pics_from_pdf (yode backend)
+with region_proposals off (every page detected as a whole) and on (the drawing clusters of the
+pages with vector structures packed into one smaller detector input, see
+region_proposals.get_region_proposals and mol_pic.compose_proposal_page), and reports time, the
+pages detected on proposals, the detector input pixels against the full-page route, and the
+recall of the proposal route: how many MolPic bboxes (percent of the page) of the full-page
+route it finds with an IoU of at least --iou. Needs yolov5 and the YoDe weights
+(src/models/best.pt, or --weights); recall is only meaningful with the trained weights.
+
+Usage:
+    python scripts/benchmarks/bench_region_proposals.py
+    python scripts/benchmarks/bench_region_proposals.py --iou 0.7 --conf_thres 0.1
+"""
+
+import os
+import sys
+import time
+import argparse
+from functools import partial
+from pathlib import Path
+
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from bench_two_resolution import iou
+
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf, get_proposal_layouts, get_page_shape
+from src.models.yode_backend import _get_yolo_model, iter_detect_chemical_structures_yode, get_letterbox_size
+
+
+def get_input_pixels(pdf_path, region_proposals):
+    with pymupdf.open(pdf_path) as pdf_document:
+        proposal_layouts = get_proposal_layouts(pdf_document, range(pdf_document.page_count)) if region_proposals else dict()
+        num_pixels = 0
+        for page_num in range(pdf_document.page_count):
+            if page_num in proposal_layouts:
+                height, width = proposal_layouts[page_num][2]
+            else:
+                height, width = get_letterbox_size(get_page_shape(pdf_document[page_num]))
+            num_pixels += height * width
+    return num_pixels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection on vector-drawing region proposals.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--conf_thres", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    mol_pic.iter_detect_chemical_structures_yode = partial(iter_detect_chemical_structures_yode, conf_thres=args.conf_thres)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+
+    print(f"{'document':<24} {'pages':>5} {'proposal':>8} {'full s':>7} {'prop s':>7} {'pixels':>7} {'pics':>5} {'recall':>7}")
+    for pdf_path in pdf_paths:
+        seconds, found = dict(), dict()
+        for region_proposals in (False, True):
+            page_stats = dict()
+            start = time.perf_counter()
+            mol_pics = extract_pics_from_pdf(pdf_path, backend='yode', page_stats=page_stats, region_proposals=region_proposals)
+            seconds[region_proposals] = time.perf_counter() - start
+            found[region_proposals] = [(pic.page_num, pic.bbox) for pic in mol_pics]
+        matched = sum(any(page_num == other_page_num and iou(bbox, other_bbox) >= args.iou for other_page_num, other_bbox in found[True])
+                      for page_num, bbox in found[False])
+        pixel_ratio = get_input_pixels(pdf_path, True) / get_input_pixels(pdf_path, False)
+        recall = matched / len(found[False]) if found[False] else 1.0
+        print(f"{Path(pdf_path).name[:24]:<24} {pymupdf.open(pdf_path).page_count:>5} {page_stats.get('proposal_pages', 0):>8} "
+              f"{seconds[False]:>7.2f} {seconds[True]:>7.2f} {pixel_ratio:>7.2f} {len(found[False]):>5} {recall:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of rendering and detecting structures, as documents grow.
+
+Builds documents of --pages pages from the pages of the demo PDFs, repeated, then extracts
+their structure images with YoDe two ways:
+- all pages: every page rendered at 300 dpi into a list first, all held until the end
+  (segment_chemical_structures_from_file, the previous extract_pics_from_pdf route);
+- streaming: extract_pics_from_pdf, rendering workers feed the detector and each page is
+  released once its crops are taken, at most --max_in_flight pages alive.
+Peak is the tracemalloc peak (page buffers, crops; torch tensors are not traced), time is
+measured in a separate run without tracemalloc. Needs yolov5 and the YoDe weights
+(src/models/best.pt, or --weights).
+
+Usage:
+    python scripts/benchmarks/bench_render_pipeline.py
+    python scripts/benchmarks/bench_render_pipeline.py --pages 10 100 --max_in_flight 4
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.chemsie.internal.mol_pic import segment_chemical_structures_from_file, get_page_mol_pics, extract_pics_from_pdf
+from src.models.yode_backend import _get_yolo_model
+
+
+def make_document(pdf_paths, num_pages, output_path):
+    """A PDF of num_pages pages, the pages of pdf_paths repeated."""
+    document = pymupdf.open()
+    while document.page_count < num_pages:
+        for pdf_path in pdf_paths:
+            remaining = num_pages - document.page_count
+            if remaining <= 0:
+                break
+            with pymupdf.open(pdf_path) as source:
+                document.insert_pdf(source, to_page=min(source.page_count, remaining) - 1)
+    document.save(output_path)
+    document.close()
+
+
+def extract_all_pages(pdf_path, batch_size):
+    page_images, overall_segments = segment_chemical_structures_from_file(pdf_path, backend='yode', batch_size=batch_size)
+    mol_pics = []
+    for page_num, page_segments in overall_segments:
+        mol_pics += get_page_mol_pics(page_num, page_segments, page_images[page_num].shape, pdf_path)
+    return mol_pics
+
+
+def measure(function):
+    start = time.perf_counter()
+    mol_pics = function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, mol_pics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bounded render-to-detect pipeline.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--pages", type=int, nargs='+', default=[10, 40, 80])
+    parser.add_argument("--batch_size", type=int, default=4)
+    parser.add_argument("--max_in_flight", type=int, default=8)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+    routes = [('all pages', lambda pdf_path: extract_all_pages(pdf_path, args.batch_size)),
+              (f'streaming, {args.max_in_flight} in flight',
+               lambda pdf_path: extract_pics_from_pdf(pdf_path, backend='yode', batch_size=args.batch_size, max_in_flight_pages=args.max_in_flight))]
+
+    print(f"{'pages':>5}  {'route':<24} {'seconds':>8} {'pages/s':>8} {'peak MB':>8} {'pics':>5} {'same':>5}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_pages in args.pages:
+            pdf_path = os.path.join(tmp_dir, f'doc_{num_pages}.pdf')
+            make_document(pdf_paths, num_pages, pdf_path)
+            reference = None
+            for route_name, route in routes:
+                seconds, peak, mol_pics = measure(lambda: route(pdf_path))
+                found = [(mol_pic.page_num, mol_pic.bbox) for mol_pic in mol_pics]
+                reference = found if reference is None else reference
+                print(f"{num_pages:>5}  {route_name:<24} {seconds:>8.2f} {num_pages/seconds:>8.2f} {peak/2**20:>8.1f} "
+                      f"{len(mol_pics):>5} {str(found==reference):>5}")
+
+
+if __name__ == "__main__":
+    main()
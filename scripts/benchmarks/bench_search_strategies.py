@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare the sweep search strategies against the exhaustive 'long' grid.
+
+For every PDF the picture clusters are loaded from a pics_*.pkl directory (as written by
+store_in_pkl(..., part='pics')). Without one, synthetic clusters are placed at the segments
+found by a reference option, which is enough to compare the search cost and outcome.
+
+Usage:
+    python scripts/benchmarks/bench_search_strategies.py
+    python scripts/benchmarks/bench_search_strategies.py --pdf_dir data/ --pkl_pic_dir pics/ --budget 12
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+# The sweep does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from src.chemsie.internal.full_process import load_default_optimize_options
+from src.chemsie.internal.parameter_sweep import DocumentSweep
+from src.chemsie.internal.search_strategies import run_search_strategy, SEARCH_STRATEGIES
+from src.chemsie.internal.mol_pic import MolPic
+from src.chemsie.internal.mol_pic_cluster import sort_mol_pics_to_clusters
+from src.chemsie.legacy.storage import load_mol_pic_clusters_dict
+
+
+def get_synthetic_clusters(document_sweep, reference_option):
+    mol_pics = []
+    for molecule_segment in document_sweep.process_option(reference_option):
+        y = molecule_segment.upper_y
+        mol_pics.append(MolPic(molecule_segment.start_page, (y - 2, y - 2, 4, 4), None))
+    return sort_mol_pics_to_clusters(mol_pics) if mol_pics else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sweep search strategies.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--pkl_pic_dir", default=None, help="Directory of pics_*.pkl files with pre-taken picture clusters.")
+    parser.add_argument("--budget", type=float, default=12, help="Evaluation budget (full-document evaluations) per strategy.")
+    args = parser.parse_args()
+
+    pics_dict = load_mol_pic_clusters_dict(args.pkl_pic_dir) if args.pkl_pic_dir else dict()
+    optimize_options = load_default_optimize_options(optimize_version='long')
+    short_options = load_default_optimize_options(optimize_version='short')
+
+    print(f"{'file':<28} {'strategy':<20} {'matched':>8} {'evaluations':>12} {'cost':>6} {'seconds':>8}")
+    for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf')):
+        pdf_path = os.path.join(args.pdf_dir, pdf_file)
+        mol_pic_clusters = pics_dict.get(pdf_file)
+        if mol_pic_clusters is None:
+            mol_pic_clusters = get_synthetic_clusters(DocumentSweep(pdf_path), {'tokens': 60, 'spaces': 30})
+
+        runs = [('short grid', short_options, 'grid', None)]
+        runs += [(strategy, optimize_options, strategy, None if strategy=='grid' else args.budget) for strategy in SEARCH_STRATEGIES]
+        for run_name, options, strategy, budget in runs:
+            start = time.perf_counter()
+            # a fresh sweep per run so caches do not leak between strategies
+            document_sweep = DocumentSweep(pdf_path)
+            search_result = run_search_strategy(document_sweep, mol_pic_clusters, options, strategy, budget)
+            elapsed = time.perf_counter() - start
+            run_name = 'long grid' if run_name=='grid' else run_name
+            print(f"{pdf_file:<28} {run_name:<20} {search_result.best_result:>8} "
+                  f"{search_result.num_evaluated:>12} {search_result.evaluation_cost:>6.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cost of mapping molecule segments to the schemas, per 1,000 segments.
+
+Locates the molecule segments of the demo PDFs (text only, no model is run) and adds generated
+ones (1H NMR, 13C NMR, IR and MS texts of bench_spectra_parser.py) up to --segments, each with a
+matched structure image (a 224x224 RGB array, as YoDe gives). Then it times the direct mapper
+of src/chemsie/segment_mapping.py, to models and to the plain dicts the NDJSON writer takes.
+Each one runs on an empty parse cache (cold) and again with the texts already parsed (warm,
+best of --repeats). tests/test_segment_mapping.py checks the output against what the previous
+ExtractedMolecule mapping gave.
+
+Usage:
+    python scripts/benchmarks/bench_segment_mapping.py
+    python scripts/benchmarks/bench_segment_mapping.py --segments 5000
+"""
+
+import os
+import gc
+import sys
+import time
+import random
+import argparse
+import warnings
+from types import SimpleNamespace
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+warnings.filterwarnings('ignore', message='Valid config keys have changed in V2')
+
+# Mapping does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_spectra_parser import make_text
+
+from src.chemsie.internal.full_process import process_text_doc
+from src.chemsie.segment_mapping import map_segments_to_models, map_segments_to_records
+from src.parsing.spectra import configure_parse_cache
+
+
+TESTS = [('proton', '1H NMR'), ('carbon', '13C NMR'), ('ir', 'IR'), ('ms', 'MS')]
+
+
+def make_segment(segment_idx, rng):
+    page_num = segment_idx//4 + 1
+    test_text_lines = [SimpleNamespace(test_type=test_type, text=make_text(spectrum_kind, rng), start_page=page_num,
+                                       bbox_list=[(page_num, (72.0, 100.0 + 40*test_idx, 450.0, 36.0))])
+                       for test_idx, (spectrum_kind, test_type) in enumerate(TESTS)]
+    return SimpleNamespace(start_multi_idx=f'{page_num}_{segment_idx}', end_multi_idx=f'{page_num}_{segment_idx + 8}',
+                           molecule_name=f'Compound {segment_idx}', mol_pic_smiles='', mol_pics=[],
+                           test_text_sequence=SimpleNamespace(test_text_lines=test_text_lines))
+
+
+def get_segments(pdf_dir, num_segments, seed):
+    segments = []
+    for pdf_file in sorted(f for f in os.listdir(pdf_dir) if f.endswith('pdf')):
+        segments += process_text_doc(os.path.join(pdf_dir, pdf_file))
+    rng = random.Random(seed)
+    segments += [make_segment(segment_idx, rng) for segment_idx in range(len(segments), num_segments)]
+    for molecule_segment in segments:
+        molecule_segment.mol_pics = [SimpleNamespace(page_num=molecule_segment.start_page if hasattr(molecule_segment, 'start_page') else 1,
+                                                     bbox=(12.5, 20.0, 30.0, 18.5), pic=np.zeros((224, 224, 3), dtype=np.uint8))]
+        molecule_segment.mol_pic_smiles = 'c1ccccc1'
+    return segments[:num_segments]
+
+
+def time_it(function):
+    # as timeit, without the collector: its pauses grow with whatever the earlier runs left alive
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    gc.enable()
+    return seconds, result
+
+
+def time_cold_and_warm(function, repeats):
+    configure_parse_cache()
+    cold_seconds, result = time_it(function)
+    warm_seconds = min(time_it(function)[0] for _ in range(repeats))
+    return cold_seconds, warm_seconds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mapping molecule segments to the schemas.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--segments", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    molecule_segments = get_segments(args.pdf_dir, args.segments, args.seed)
+    per_1000 = 1000/len(molecule_segments)
+    models_cold, models_warm, models = time_cold_and_warm(lambda: list(map_segments_to_models(molecule_segments, 'bench.pdf')), args.repeats)
+    records_cold, records_warm, _ = time_cold_and_warm(lambda: list(map_segments_to_records(molecule_segments, 'bench.pdf')), args.repeats)
+    same_ids = [molecule.id for molecule, _ in models]==[molecule.id for molecule, _ in map_segments_to_models(molecule_segments, 'bench.pdf')]
+
+    print(f"{len(molecule_segments)} segments, {sum(len(spectra) for _, spectra in models)} spectra\n")
+    print(f"{'route':<34} {'cold ms/1000':>13} {'warm ms/1000':>13}")
+    print(f"{'map_segments_to_models':<34} {1000*models_cold*per_1000:>13.1f} {1000*models_warm*per_1000:>13.1f}")
+    print(f"{'map_segments_to_records':<34} {1000*records_cold*per_1000:>13.1f} {1000*records_warm*per_1000:>13.1f}")
+    print(f"\ndeterministic IDs: {same_ids}")
+
+
+if __name__ == "__main__":
+    main()
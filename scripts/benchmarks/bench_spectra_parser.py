@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Per-string spectra parsing against the batch parser of src/parsing/spectra.py.
+
+Builds a corpus of 1H NMR, 13C NMR, IR and MS test texts (the test lines the pipeline
+extracts from the demo PDFs, plus generated texts up to --texts per kind) and times:
+the per-string loop of the wrappers, one parse_spectra_batch call, and the batch with a
+process pool. All must give the same peaks; tests/test_spectra_parser.py checks them
+against the peaks the previous parsers gave.
+
+Usage:
+    python scripts/benchmarks/bench_spectra_parser.py
+    python scripts/benchmarks/bench_spectra_parser.py --texts 50000 --workers 4
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+# Parsing does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner
+from src.parsing import spectra
+
+PARSERS = [('proton', '1H NMR', spectra.parse_proton_nmr),
+           ('carbon', '13C NMR', spectra.parse_carbon_nmr),
+           ('ir', 'IR', spectra.parse_ir),
+           ('ms', 'MS', spectra.parse_ms)]
+
+
+def get_pdf_texts(pdf_dir):
+    """Test texts of the demo PDFs per spectrum kind."""
+    texts = {spectrum_kind: [] for spectrum_kind, _, _ in PARSERS}
+    for pdf_file in sorted(f for f in os.listdir(pdf_dir) if f.endswith('pdf')):
+        document_lines = extract_document_lines(os.path.join(pdf_dir, pdf_file))
+        for _, test_lines in DocumentTestLineScanner(document_lines).get_segment_test_lines(document_lines):
+            for test_line in test_lines:
+                spectrum_kind = spectra.get_spectrum_kind(test_line.test_type) or ('ms' if 'MS' in test_line.test_type else None)
+                if spectrum_kind:
+                    texts[spectrum_kind].append(test_line.text)
+    return texts
+
+
+def make_text(spectrum_kind, rng):
+    if spectrum_kind=='proton':
+        peaks = []
+        for _ in range(rng.randint(3, 12)):
+            shift = f'{rng.uniform(0.5, 8.5):.2f}'
+            if rng.random()<0.2:
+                shift += f'–{float(shift) - rng.uniform(0.05, 0.3):.2f}'
+            mult = rng.choice(['s', 'd', 't', 'q', 'dd', 'm', 'br s', 'td'])
+            coupling = f', J = {rng.uniform(1, 16):.1f} Hz' if mult not in ('s', 'm', 'br s') else ''
+            peaks.append(f'{shift} ({mult}{coupling}, {rng.randint(1, 9)}H)')
+        return f'1H NMR ({rng.choice([300, 400, 500, 600])} MHz, CDCl3) δ ' + ', '.join(peaks) + '.'
+    if spectrum_kind=='carbon':
+        return f'13C NMR (101 MHz, CDCl3) δ ' + ', '.join(f'{rng.uniform(10, 210):.1f}' for _ in range(rng.randint(5, 25))) + '.'
+    if spectrum_kind=='ir':
+        return 'IR (neat) ' + ', '.join(f'{rng.randint(600, 3600)}{rng.choice(["", " s", " m", " w", " br", " vs"])}'
+                                       for _ in range(rng.randint(3, 10))) + ' cm-1'
+    return 'MS (EI) m/z ' + ', '.join(f'{rng.randint(40, 600)} ({rng.randint(1, 100)})' for _ in range(rng.randint(2, 8)))
+
+
+def clear_memos():
+    # every route starts without the memoised shifts, peak info and IR tokens
+    spectra._parse_proton_shift.cache_clear()
+    spectra._parse_proton_info.cache_clear()
+    spectra._parse_ir_token.cache_clear()
+
+
+def time_it(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batch spectra parser.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--texts", type=int, default=20000, help="texts per spectrum kind")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pdf_texts = get_pdf_texts(args.pdf_dir)
+    print(f"{'kind':<8} {'texts':>7} {'wrapper loop s':>15} {'batch s':>8} {'pool s':>7} {'batch speedup':>14} {'same':>5}")
+    for spectrum_kind, _, wrapper_parser in PARSERS:
+        texts = list(pdf_texts[spectrum_kind])
+        texts += [make_text(spectrum_kind, rng) for _ in range(args.texts - len(texts))]
+        clear_memos()
+        wrapper_seconds, wrapper_results = time_it(lambda: [wrapper_parser(text) for text in texts])
+        clear_memos()
+        batch_seconds, peak_table = time_it(lambda: spectra.parse_spectra_batch(texts, spectrum_kind))
+        pool_seconds, pool_table = time_it(lambda: spectra.parse_spectra_batch(texts, spectrum_kind, num_workers=args.workers))
+        same = all(wrapper_result==peak_table.to_records(text_idx)==pool_table.to_records(text_idx)
+                   for text_idx, wrapper_result in enumerate(wrapper_results))
+        print(f"{spectrum_kind:<8} {len(texts):>7} {wrapper_seconds:>15.2f} {batch_seconds:>8.2f} "
+              f"{pool_seconds:>7.2f} {wrapper_seconds/batch_seconds:>13.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Mapping and writing extraction output: validated models and one JSON document against
+the streaming NDJSON writer of src/chemsie/streaming.py.
+
+Builds --molecules molecule segments, each with 13C NMR, IR and MS texts generated as in
+bench_spectra_parser.py, parses them once into the parse cache and times the mapping to validated
+models (map_segments_to_models), with model_construct (for reference) and to plain dicts
+(map_segments_to_records). Then it maps and writes the output as one ExtractedData JSON file,
+as strict NDJSON and as trusted NDJSON, with the tracemalloc peak of each. All files must read
+back to the same data.
+
+Usage:
+    python scripts/benchmarks/bench_streaming_output.py
+    python scripts/benchmarks/bench_streaming_output.py --molecules 20000
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+import tracemalloc
+from types import SimpleNamespace
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Mapping does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_spectra_parser import make_text
+from src.chemsie.segment_mapping import map_segments_to_models, map_segments_to_records
+from src.chemsie.schemas import ExtractedData, Molecule, MoleculeProvenance, Spectrum, Provenance, BoundingBox, ExtractionMethod
+from src.chemsie.streaming import NDJSONExtractionWriter, read_extracted_data
+
+TESTS = [('carbon', '13C NMR'), ('ir', 'IR'), ('ms', 'MS')]
+
+
+def make_segments(num_molecules, rng):
+    molecule_segments = []
+    for molecule_idx in range(num_molecules):
+        page_num = molecule_idx//3 + 1
+        test_text_lines = [SimpleNamespace(test_type=test_type, text=make_text(spectrum_kind, rng), start_page=page_num,
+                                           bbox_list=[(page_num, (12.0, 10.0 + 5*test_idx, 75.0, 4.0))])
+                           for test_idx, (spectrum_kind, test_type) in enumerate(TESTS)]
+        mol_pic = SimpleNamespace(page_num=page_num, bbox=(rng.uniform(0, 60), rng.uniform(0, 70), 30.0, 20.0))
+        molecule_segments.append(SimpleNamespace(start_multi_idx=f'{page_num}_{molecule_idx}', end_multi_idx=f'{page_num}_{molecule_idx + 8}',
+                                                 molecule_name=f'{molecule_idx}a', mol_pic_smiles='c1ccccc1', mol_pics=[mol_pic],
+                                                 test_text_sequence=SimpleNamespace(test_text_lines=test_text_lines)))
+    return molecule_segments
+
+
+def get_page_sizes(molecule_segments):
+    # A4 pages in points, which the provenance bboxes (percent of the page) are mapped to
+    return {molecule_segment.mol_pics[0].page_num: (595.0, 842.0) for molecule_segment in molecule_segments}
+
+
+def time_it(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def measure_writing(function):
+    # timed without tracemalloc, which slows every allocation down
+    seconds, _ = time_it(function)
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def write_json(molecule_segments, output_path):
+    molecules, spectra = [], []
+    for molecule, specs in map_segments_to_models(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments)):
+        molecules.append(molecule)
+        spectra.extend(specs)
+    extracted_data = ExtractedData(source_filename='synthetic.pdf', molecules=molecules, reactions=[], spectra=spectra, errors=[])
+    with open(output_path, 'w') as f:
+        f.write(extracted_data.model_dump_json())
+
+
+def write_ndjson(molecule_segments, output_path, strict):
+    map_segments = map_segments_to_models if strict else map_segments_to_records
+    with NDJSONExtractionWriter(output_path, 'synthetic.pdf', strict=strict) as writer:
+        for molecule, spectra in map_segments(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments)):
+            writer.write_molecule(molecule, spectra)
+
+
+def construct_molecule(molecule, spectra):
+    """The models of map_segments_to_models, with model_construct for every one."""
+    def construct_provenance(model, provenance):
+        return model.model_construct(**{**provenance, 'bbox': BoundingBox.model_construct(**provenance['bbox']),
+                                        'method': ExtractionMethod.model_construct(**provenance['method'])})
+    return (Molecule.model_construct(**{**molecule, 'provenance': [construct_provenance(MoleculeProvenance, provenance)
+                                                                   for provenance in molecule['provenance']]}),
+            [Spectrum.model_construct(**{**spectrum, 'provenance': construct_provenance(Provenance, spectrum['provenance'])})
+             for spectrum in spectra])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trusted construction and NDJSON output.")
+    parser.add_argument("--molecules", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    molecule_segments = make_segments(args.molecules, random.Random(args.seed))
+    # parse every text once, the timings below are the ones of the mapping and writing only
+    list(map_segments_to_records(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments)))
+    strict_seconds, _ = time_it(lambda: list(map_segments_to_models(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments))))
+    construct_seconds, _ = time_it(lambda: [construct_molecule(*records) for records in map_segments_to_records(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments))])
+    record_seconds, _ = time_it(lambda: list(map_segments_to_records(molecule_segments, 'synthetic.pdf', get_page_sizes(molecule_segments))))
+    print(f"{args.molecules} molecules, {len(TESTS)} spectra each\n")
+    print(f"{'mapping':<28} {'seconds':>8} {'speedup':>8}")
+    for name, seconds in [('validated models', strict_seconds), ('model_construct', construct_seconds), ('plain dicts', record_seconds)]:
+        print(f"{name:<28} {seconds:>8.2f} {strict_seconds/seconds:>7.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'out.json')
+        json_seconds, json_peak = measure_writing(lambda: write_json(molecule_segments, json_path))
+        with open(json_path) as f:
+            from_json = ExtractedData.model_validate_json(f.read())
+        print(f"\n{'map + write':<28} {'seconds':>8} {'peak MB':>8} {'file MB':>8} {'same':>5}")
+        print(f"{'ExtractedData JSON':<28} {json_seconds:>8.2f} {json_peak/2**20:>8.2f} {os.path.getsize(json_path)/2**20:>8.1f} {'-':>5}")
+        for strict in [True, False]:
+            ndjson_path = os.path.join(tmp_dir, f'out_{strict}.ndjson')
+            ndjson_seconds, ndjson_peak = measure_writing(lambda: write_ndjson(molecule_segments, ndjson_path, strict))
+            from_ndjson = read_extracted_data(ndjson_path)
+            same = from_json.molecules==from_ndjson.molecules and from_json.spectra==from_ndjson.spectra
+            print(f"{'NDJSON, ' + ('strict' if strict else 'trusted'):<28} {ndjson_seconds:>8.2f} {ndjson_peak/2**20:>8.2f} "
+                  f"{os.path.getsize(ndjson_path)/2**20:>8.1f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
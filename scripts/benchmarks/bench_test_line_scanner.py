@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test-line extraction per segment against the document-wide DocumentTestLineScanner.
+
+Segments a document (synthetic, see bench_line_index.py, or the demo PDFs) and times
+process_molecule_segment_text + adjust_molecule_segments_by_common_sequence with the old
+per-segment, per-test-type rescanning and with one scanner for the document. Both must give
+the same segments. A single pass extracts every test-text window once either way; the scanner
+pays off when segments are rebuilt with other boundaries, so the 'long' (tokens, spaces) sweep
+is timed on the PDFs too.
+
+Usage:
+    python scripts/benchmarks/bench_test_line_scanner.py
+    python scripts/benchmarks/bench_test_line_scanner.py --pages 2000 --pdf_dir data/
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Segmentation does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_line_index import make_document
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+from src.chemsie.internal.segments_creation import locate_molecule_segments
+from src.chemsie.internal.sequences2segments import process_molecule_segment_text
+from src.chemsie.internal.segements_merging import adjust_molecule_segments_by_common_sequence
+from src.chemsie.internal.segment_cache import SegmentCache
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner
+from src.chemsie.internal.parameter_sweep import DocumentSweep
+from src.chemsie.internal.full_process import load_default_optimize_options
+
+
+def run_text_pass(document_lines, tokens_mark, spaces_mark, use_scanner):
+    molecule_segments = locate_molecule_segments(document_lines, tokens_mark=tokens_mark, spaces_mark=spaces_mark)
+    start = time.perf_counter()
+    test_line_scanner = DocumentTestLineScanner(document_lines) if use_scanner else None
+    segment_cache = SegmentCache(test_line_scanner)
+    processed_molecule_segments = process_molecule_segment_text(molecule_segments, segment_cache=segment_cache)
+    final_molecule_segments = adjust_molecule_segments_by_common_sequence(processed_molecule_segments, segment_cache=segment_cache)
+    elapsed = time.perf_counter() - start
+    signature = [(repr(segment), segment.end_multi_idx, segment.test_text_sequence.test_type_list if segment.test_text_sequence else None)
+                 for segment in final_molecule_segments]
+    return elapsed, signature
+
+
+def run_sweep(document_lines, use_scanner):
+    document_sweep = DocumentSweep(page_lines_with_multi_idx=document_lines)
+    if not use_scanner:
+        document_sweep.segment_cache = SegmentCache()
+    start = time.perf_counter()
+    document_sweep.evaluate_options(load_default_optimize_options(optimize_version='long'), None)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the document-wide test-line scanner.")
+    parser.add_argument("--pages", type=int, nargs='+', default=[500, 2000])
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--tokens", type=float, default=60)
+    parser.add_argument("--spaces", type=float, default=30)
+    args = parser.parse_args()
+
+    documents = [(f'synthetic {num_pages}p', lambda num_pages=num_pages: DocumentLines.from_tuples(make_document(num_pages)))
+                 for num_pages in args.pages]
+    documents += [(pdf_file, lambda pdf_file=pdf_file: extract_document_lines(os.path.join(args.pdf_dir, pdf_file)))
+                  for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf'))]
+
+    print(f"{'document':<28} {'lines':>7} {'per segment s':>14} {'scanner s':>10} {'speedup':>8} {'same':>5}")
+    for document_name, get_document_lines in documents:
+        document_lines = get_document_lines()
+        segment_seconds, segment_signature = run_text_pass(document_lines, args.tokens, args.spaces, use_scanner=False)
+        scanner_seconds, scanner_signature = run_text_pass(document_lines, args.tokens, args.spaces, use_scanner=True)
+        print(f"{document_name:<28} {len(document_lines):>7} {segment_seconds:>14.2f} {scanner_seconds:>10.2f} "
+              f"{segment_seconds/scanner_seconds:>7.1f}x {str(segment_signature==scanner_signature):>5}")
+
+    print(f"\n{'long sweep':<28} {'lines':>7} {'per segment s':>14} {'scanner s':>10} {'speedup':>8}")
+    for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf')):
+        document_lines = extract_document_lines(os.path.join(args.pdf_dir, pdf_file))
+        segment_seconds = run_sweep(document_lines, use_scanner=False)
+        scanner_seconds = run_sweep(document_lines, use_scanner=True)
+        print(f"{pdf_file:<28} {len(document_lines):>7} {segment_seconds:>14.2f} {scanner_seconds:>10.2f} {segment_seconds/scanner_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
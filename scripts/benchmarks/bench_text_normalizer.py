@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Clean / replace / ender rules per test text against the compiled TextNormalizer.
+
+Builds a corpus of raw test texts (the text from every test-name hit to the end of its
+window, as extract_test_line_from_segmented_lines sees it) from the demo PDFs and synthetic
+documents (see bench_line_index.py), then times cut_text_by_enders + clean_text_by_tokens +
+replace_text_by_tokens against TextNormalizer.cut_by_enders + normalize, cold (a new
+normalizer per corpus) and warm (its memo filled, as for the later options of a sweep).
+Both must give the same texts.
+
+Usage:
+    python scripts/benchmarks/bench_text_normalizer.py
+    python scripts/benchmarks/bench_text_normalizer.py --pages 2000 --repeats 5
+"""
+
+import os
+import sys
+import time
+import pickle
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Text cleaning does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_line_index import make_document
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner, PAD_AFTER
+from src.chemsie.internal.text_cleaning.clean_patterns import clean_text_by_tokens, load_default_clean_tokens
+from src.chemsie.internal.text_cleaning.replacement import replace_text_by_tokens, load_default_replacement_tokens
+from src.chemsie.internal.text_cleaning.test_enders import cut_text_by_enders, load_default_end_tokens
+from src.chemsie.internal.text_cleaning.normalizer import TextNormalizer
+
+
+def get_test_texts(document_lines):
+    """(test names, raw text) of every test-name hit of the document."""
+    test_line_scanner = DocumentTestLineScanner(document_lines)
+    texts = []
+    for test_type, name_hits in test_line_scanner.hits.items():
+        test_names = test_line_scanner.test_names[test_type]
+        for test_name, positions in zip(test_names, name_hits):
+            for position in positions:
+                text = document_lines[position:position + PAD_AFTER].get_text()
+                texts.append((tuple(test_names), text[text.find(test_name):]))
+    return texts
+
+
+def run_rules(texts):
+    clean_patterns = load_default_clean_tokens()
+    replacement_patterns, replacement_dict = load_default_replacement_tokens()
+    results = []
+    for test_names, text in texts:
+        text_enders = load_default_end_tokens()
+        text_enders = [text_ender for text_ender in text_enders if text_ender not in test_names]
+        text = cut_text_by_enders(text, text_enders)
+        text = clean_text_by_tokens(text, clean_patterns)
+        results.append(replace_text_by_tokens(text, replacement_patterns, replacement_dict))
+    return results
+
+
+def run_normalizer(texts, text_normalizer):
+    return [text_normalizer.normalize(text_normalizer.cut_by_enders(text, test_names)) for test_names, text in texts]
+
+
+def time_best(function, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled text normalizer.")
+    parser.add_argument("--pages", type=int, nargs='+', default=[500])
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    corpora = [(pdf_file, get_test_texts(extract_document_lines(os.path.join(args.pdf_dir, pdf_file))))
+               for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf'))]
+    corpora += [(f'synthetic {num_pages}p', get_test_texts(DocumentLines.from_tuples(make_document(num_pages))))
+                for num_pages in args.pages]
+
+    print(f"{'corpus':<28} {'texts':>7} {'rules texts/s':>14} {'cold texts/s':>13} {'warm texts/s':>13} {'same':>5}")
+    for corpus_name, texts in corpora:
+        rules_seconds, rules_results = time_best(lambda: run_rules(texts), args.repeats)
+        # a normalizer that went through pickle, as it would reach a worker
+        text_normalizer = pickle.loads(pickle.dumps(TextNormalizer()))
+        cold_seconds, cold_results = time_best(lambda: run_normalizer(texts, text_normalizer), 1)
+        warm_seconds, warm_results = time_best(lambda: run_normalizer(texts, text_normalizer), args.repeats)
+        same = rules_results==cold_results==warm_results
+        print(f"{corpus_name:<28} {len(texts):>7} {len(texts)/rules_seconds:>14.0f} {len(texts)/cold_seconds:>13.0f} "
+              f"{len(texts)/warm_seconds:>13.0f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
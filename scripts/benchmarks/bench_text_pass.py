@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark the text pass (extract_text_with_multi_idx) with and without page rendering.
+
+The rendered mode is the old behaviour (a 200 dpi pixmap per page, used only for its size),
+the layout-only mode reads the page geometry from the PDF. Both outputs are compared
+before the timings are printed.
+
+Usage:
+    python scripts/benchmarks/bench_text_pass.py
+    python scripts/benchmarks/bench_text_pass.py path/to/thesis.pdf path/to/si.pdf --repeat 3
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+import fitz
+from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+
+
+def time_text_pass(pdf_path, layout_only, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lines = extract_text_with_multi_idx(pdf_path, layout_only=layout_only)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return lines, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rendered vs layout-only text extraction.")
+    parser.add_argument("pdf_files", nargs="*", help="PDF files to benchmark (default: experiments/demo_data/*.pdf)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode, the best one is reported.")
+    args = parser.parse_args()
+
+    pdf_files = args.pdf_files or sorted(str(p) for p in (project_root / "experiments" / "demo_data").glob("*.pdf"))
+
+    total_pages, total_rendered, total_layout = 0, 0.0, 0.0
+    print(f"{'file':<40} {'pages':>6} {'rendered p/s':>14} {'layout p/s':>12} {'speedup':>8} {'identical':>10}")
+    for pdf_path in pdf_files:
+        with fitz.open(pdf_path) as document:
+            num_pages = document.page_count
+        rendered_lines, rendered_time = time_text_pass(pdf_path, False, args.repeat)
+        layout_lines, layout_time = time_text_pass(pdf_path, True, args.repeat)
+        identical = rendered_lines == layout_lines
+        total_pages += num_pages
+        total_rendered += rendered_time
+        total_layout += layout_time
+        print(f"{Path(pdf_path).name:<40} {num_pages:>6} {num_pages / rendered_time:>14.1f} "
+              f"{num_pages / layout_time:>12.1f} {rendered_time / layout_time:>7.1f}x {str(identical):>10}")
+
+    if total_pages:
+        print(f"{'TOTAL':<40} {total_pages:>6} {total_pages / total_rendered:>14.1f} "
+              f"{total_pages / total_layout:>12.1f} {total_rendered / total_layout:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Full resolution against two-resolution rendering for YoDe structure detection.
+
+Extracts the structure images of the demo PDFs (or the first --max_pages pages of each) with
+extract_pics_from_pdf two ways:
+- 300 dpi: every page rendered at 300 dpi, letterboxed down to the model input, crops cut from
+  the 300 dpi page;
+- two resolutions: every page rendered straight at the model input size, the boxes scaled to
+  the 300 dpi page and only they rendered at 300 dpi (render_clip).
+and reports time, tracemalloc peak (page buffers and crops, torch tensors are not traced) and
+how many MolPic bboxes (percent of the page) of the 300 dpi route the other one finds, exactly
+and with an IoU of at least --iou. Needs yolov5 and the YoDe weights (src/models/best.pt, or
+--weights); a low --conf_thres gives more boxes to compare.
+
+Usage:
+    python scripts/benchmarks/bench_two_resolution.py
+    python scripts/benchmarks/bench_two_resolution.py --max_pages 5 --conf_thres 0.05
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+import pymupdf
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf
+from src.models.yode_backend import _get_yolo_model, iter_detect_chemical_structures_yode
+
+
+def iou(box, other):
+    (x, y, w, h), (ox, oy, ow, oh) = box, other
+    inter = max(0, min(x + w, ox + ow) - max(x, ox)) * max(0, min(y + h, oy + oh) - max(y, oy))
+    return inter / (w*h + ow*oh - inter) if inter else 0.0
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark two-resolution rendering for YoDe.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--max_pages", type=int, default=None)
+    parser.add_argument("--conf_thres", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.9)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--weights", default=None)
+    args = parser.parse_args()
+
+    _get_yolo_model(device_str=args.device, weights=args.weights)
+    mol_pic.iter_detect_chemical_structures_yode = partial(iter_detect_chemical_structures_yode, conf_thres=args.conf_thres)
+    pdf_paths = [os.path.join(args.pdf_dir, f) for f in sorted(os.listdir(args.pdf_dir)) if f.endswith('pdf')]
+
+    print(f"{'document':<28} {'pages':>5}  {'route':<16} {'seconds':>8} {'peak MB':>8} {'pics':>5} {'exact':>6} {'iou':>6}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pdf_path in pdf_paths:
+            if args.max_pages:
+                pdf_path_pages = os.path.join(tmp_dir, os.path.basename(pdf_path))
+                with pymupdf.open(pdf_path) as source, pymupdf.open() as document:
+                    document.insert_pdf(source, to_page=min(args.max_pages, source.page_count) - 1)
+                    document.save(pdf_path_pages)
+                pdf_path = pdf_path_pages
+            num_pages = pymupdf.open(pdf_path).page_count
+            reference = None
+            for route_name, two_resolution in [('300 dpi', False), ('two resolutions', True)]:
+                seconds, peak, found = measure(
+                    lambda: [(pic.page_num, pic.bbox) for pic in extract_pics_from_pdf(pdf_path, backend='yode', two_resolution=two_resolution)])
+                reference = found if reference is None else reference
+                exact = sum(box in found for box in reference)
+                close = sum(any(page_num == other_page_num and iou(bbox, other_bbox) >= args.iou for other_page_num, other_bbox in found)
+                            for page_num, bbox in reference)
+                print(f"{os.path.basename(pdf_path):<28} {num_pages:>5}  {route_name:<16} {seconds:>8.2f} {peak/2**20:>8.1f} "
+                      f"{len(found):>5} {exact:>6} {close:>6}")
+
+
+if __name__ == "__main__":
+    main()
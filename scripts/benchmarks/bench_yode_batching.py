@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+YoDe structure detection throughput (pages/sec) across batch sizes.
+
+Renders the pages of the PDFs in --pdf_dir at 300 dpi (as mol_pic.py does), then runs
+segment_chemical_structures_yode_batch over all of them for each of --batch_sizes, after one
+warm-up batch. Batch size 1 is the previous page-by-page route. The boxes of every batch size are
+compared with the ones of batch size 1 (they may differ by a pixel where batched convolutions round
+differently). Needs yolov5 and the YoDe weights (src/models/best.pt, or --weights).
+
+Usage:
+    python scripts/benchmarks/bench_yode_batching.py
+    python scripts/benchmarks/bench_yode_batching.py --batch_sizes 1 4 16 --threads 8
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import torch
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.chemsie.internal.mol_pic import render_page_images
+from src.models.yode_backend import segment_chemical_structures_yode_batch
+
+
+def get_page_images(pdf_dir, max_pages):
+    page_images = []
+    for pdf_file in sorted(f for f in os.listdir(pdf_dir) if f.endswith('pdf')):
+        page_images += [im for im in render_page_images(os.path.join(pdf_dir, pdf_file)) if im is not None]
+    return page_images[:max_pages] if max_pages else page_images
+
+
+def max_box_difference(bboxes, reference_bboxes):
+    """Largest coordinate difference between the boxes of two runs, None if the box counts differ."""
+    difference = 0
+    for page_bboxes, page_reference_bboxes in zip(bboxes, reference_bboxes):
+        if len(page_bboxes)!=len(page_reference_bboxes):
+            return None
+        for bbox, reference_bbox in zip(page_bboxes, page_reference_bboxes):
+            difference = max([difference] + [abs(a - b) for a, b in zip(bbox, reference_bbox)])
+    return difference
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched YoDe inference.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--batch_sizes", type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument("--max_pages", type=int, default=0)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads, 0 keeps the default")
+    parser.add_argument("--weights", default=None)
+    parser.add_argument("--conf_thres", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    page_images = get_page_images(args.pdf_dir, args.max_pages)
+    options = dict(device=args.device, weights=args.weights, conf_thres=args.conf_thres)
+    segment_chemical_structures_yode_batch(page_images[:max(args.batch_sizes)], batch_size=max(args.batch_sizes), **options) # model load, warm-up
+
+    print(f"{len(page_images)} pages of {page_images[0].shape[1]}x{page_images[0].shape[0]}, {torch.get_num_threads()} threads\n")
+    print(f"{'batch size':>10} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'boxes':>6} {'max box diff px':>16}")
+    reference_bboxes, reference_seconds = None, None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        # only the boxes are kept, the crops of one run are dropped before the next
+        bboxes = [page_bboxes for _, page_bboxes in segment_chemical_structures_yode_batch(page_images, batch_size=batch_size, **options)]
+        seconds = time.perf_counter() - start
+        if reference_bboxes is None:
+            reference_bboxes, reference_seconds = bboxes, seconds
+        print(f"{batch_size:>10} {seconds:>8.2f} {len(page_images)/seconds:>8.2f} {reference_seconds/seconds:>7.2f}x "
+              f"{sum(map(len, bboxes)):>6} {str(max_box_difference(bboxes, reference_bboxes)):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Per-rule cost of the clean, replacement and ender rule packs.
+
+Times every named rule group on the raw test texts of the demo PDFs (see
+bench_text_normalizer.py) and on generated adversarial inputs (long whitespace, digit and
+bracket runs, near misses of every rule, seeded random texts), and reports hit counts,
+total cost and the worst input of every rule, the costliest first. With --budget, every
+match runs on the regex package with that timeout (seconds per rule and text) and the
+rules that exceed it are flagged instead of stalling the run.
+
+Usage:
+    python scripts/benchmarks/profile_text_rules.py
+    python scripts/benchmarks/profile_text_rules.py --budget 0.05 --json rule_costs.json
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+# Text cleaning does not run any model, mock the ML dependencies if they are not installed
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    try:
+        __import__(name)
+    except Exception:
+        sys.modules[name] = MagicMock()
+
+from bench_text_normalizer import get_test_texts
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.chemsie.internal.text_cleaning.rule_profiler import load_rule_packs, make_adversarial_texts, profile_rules, format_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the text-cleaning rule packs per rule.")
+    parser.add_argument("--pdf_dir", default=str(project_root / "experiments" / "demo_data"))
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000], help="lengths of the adversarial inputs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget", type=float, default=None, help="time budget in seconds per rule and text")
+    parser.add_argument("--json", default=None, help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    texts = []
+    for pdf_file in sorted(f for f in os.listdir(args.pdf_dir) if f.endswith('pdf')):
+        texts += [text for _, text in get_test_texts(extract_document_lines(os.path.join(args.pdf_dir, pdf_file)))]
+    rules = load_rule_packs()
+    adversarial_texts = make_adversarial_texts(rules, sizes=args.sizes, seed=args.seed)
+    print(f"{len(rules)} rules, {len(texts)} corpus texts, {len(adversarial_texts)} adversarial texts\n")
+
+    profiles = profile_rules(texts, rules, adversarial_texts, time_budget=args.budget)
+    print(format_report(profiles, time_budget=args.budget))
+
+    if args.json:
+        report = [{kind: rule_profile.to_dict() for kind, rule_profile in rule_profiles.items()} for rule_profiles in profiles.values()]
+        with open(args.json, 'w') as f:
+            json.dump({'budget': args.budget, 'rules': report}, f, indent=2)
+        print(f"\nSaved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from math import ceil
+
+import pymupdf
+
+CASCADE_CONFIDENT_CONF = 0.5 # YoDe boxes below are borderline, YoDe keeps boxes from its conf_thres (0.25)
+CASCADE_TEXT_FRACTION = 0.3 # of a box covered by words, more is a block of text rather than a structure with atom labels
+LINES_PER_STRUCTURE = {'NMR': 2} # test lines of one compound: a 1H and a 13C NMR line, one line of each other test
+ESCALATION_REASONS = ('borderline', 'text_overlap', 'missing')
+
+
+def get_expected_structures(test_line_counts):
+    """
+    {page_num: number of structures the text pass expects on the page} from the test lines of
+    each page ({page_num: {test_type: number of lines}}, see
+    DocumentTestLineScanner.get_test_line_counts): one per compound, the compounds of a page
+    being the most any one test type accounts for.
+    """
+    return {page_num: max(ceil(count / LINES_PER_STRUCTURE.get(test_type, 1)) for test_type, count in page_counts.items())
+            for page_num, page_counts in test_line_counts.items() if page_counts}
+
+
+def get_text_fraction(words, bbox, zoom):
+    """The fraction of a (x1, y1, x2, y2) box of the page rendered at zoom (pixels) covered by words (page.get_text('words'))."""
+    box = pymupdf.Rect(bbox) * (1 / zoom)
+    if box.is_empty:
+        return 0.0
+    covered = sum((pymupdf.Rect(word[:4]) & box).get_area() for word in words)
+    return covered / box.get_area()
+
+
+def get_escalation_reasons(page, bboxes, confidences, page_shape, expected_structures=0):
+    """
+    Why the YoDe boxes of a page (300 dpi page of page_shape, pixels) are not to be trusted, a
+    list of ESCALATION_REASONS, empty when they are:
+    - borderline: a box has a confidence below CASCADE_CONFIDENT_CONF;
+    - text_overlap: words cover more than CASCADE_TEXT_FRACTION of a box (a paragraph or a
+      table taken for a structure, or a structure run into its caption);
+    - missing: the text pass expects more structures on the page than there are boxes.
+    """
+    reasons = []
+    if any(confidence < CASCADE_CONFIDENT_CONF for confidence in confidences):
+        reasons.append('borderline')
+    if bboxes:
+        words, zoom = page.get_text('words'), page_shape[1] / page.rect.width
+        if any(get_text_fraction(words, bbox, zoom) > CASCADE_TEXT_FRACTION for bbox in bboxes):
+            reasons.append('text_overlap')
+    if expected_structures > len(bboxes):
+        reasons.append('missing')
+    return reasons
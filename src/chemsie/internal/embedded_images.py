@@ -0,0 +1,92 @@
+from math import floor, ceil
+
+import numpy as np
+import pymupdf
+
+from src.chemsie.internal.page_filter import MIN_PATH_SEGMENTS, INLINE_IMAGE_PATTERN, count_path_segments, iter_page_streams
+
+
+def get_placed_images(pdf_document, page_num, min_path_segments=MIN_PATH_SEGMENTS):
+    """
+    [(xref, rect)] of the images a page shows, in drawing order, with their placement rectangles
+    (points), when a structure on the page can only be in them, else None. That is: fewer than
+    min_path_segments drawn lines and curves (see page_filter), an unrotated page, and images
+    that are all plain image XObjects placed upright (no inline, masked or stencil images, no
+    flips or rotations), so their pixels are what the page shows.
+    """
+    page = pdf_document[page_num]
+    if page.rotation:
+        return None
+    num_path_segments = 0
+    for stream in iter_page_streams(pdf_document, page):
+        num_path_segments += count_path_segments(stream, min_path_segments - num_path_segments)
+        if num_path_segments >= min_path_segments or INLINE_IMAGE_PATTERN.search(b' ' + (stream or b'') + b' '):
+            return None
+    placed_images = []
+    image_infos = page.get_image_info()
+    xrefs = get_image_xrefs(page, image_infos)
+    for image_info, xref in zip(image_infos, xrefs):
+        a, b, c, d, _, _ = image_info['transform']
+        if xref <= 0 or image_info['has-mask'] or not image_info['colorspace'] or b or c or a <= 0 or d <= 0:
+            return None
+        placed_images.append((xref, pymupdf.Rect(image_info['bbox'])))
+    return placed_images or None
+
+
+def get_image_xrefs(page, image_infos):
+    """
+    The xrefs of the images of page.get_image_info(), 0 for inline images. They are told apart by
+    their size in the page resources: get_image_info(xrefs=True) decodes and hashes every image
+    to find them, which takes longer than rendering the page, so it is used only when two
+    different images of the page have the same size.
+    """
+    xrefs_by_size = dict()
+    for xref, _, width, height, *_ in page.get_images(full=True):
+        xrefs_by_size.setdefault((width, height), set()).add(xref)
+    if any(len(xrefs_by_size.get((image_info['width'], image_info['height']), ())) > 1 for image_info in image_infos):
+        return [image_info['xref'] for image_info in page.get_image_info(xrefs=True)]
+    # an image without a resource of its size is an inline image (or a size mismatch), not used
+    return [next(iter(xrefs_by_size.get((image_info['width'], image_info['height']), {0}))) for image_info in image_infos]
+
+
+def get_embedded_image_pages(pdf_document, page_nums, min_path_segments=MIN_PATH_SEGMENTS):
+    """{page_num: placed images} for the pages of page_nums whose structures can only be in their images (see get_placed_images)."""
+    placed_images_by_page = dict()
+    for page_num in page_nums:
+        placed_images = get_placed_images(pdf_document, page_num, min_path_segments)
+        if placed_images:
+            placed_images_by_page[page_num] = placed_images
+    return placed_images_by_page
+
+
+def get_image_array(pdf_document, xref):
+    """An image XObject as an RGB array at its native resolution."""
+    pix = pymupdf.Pixmap(pdf_document, xref)
+    if pix.alpha:
+        pix = pymupdf.Pixmap(pix, 0)
+    if pix.n != 3:
+        pix = pymupdf.Pixmap(pymupdf.csRGB, pix)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, 3)
+
+
+def get_embedded_crop(pdf_document, placed_images, bbox, zoom, image_arrays):
+    """
+    The (x1, y1, x2, y2) box of the page rendered at zoom (pixels), cut from the native pixels of
+    the one image that holds it, or None when the box is not within a single image (e.g. it spans
+    two tiles). image_arrays caches {xref: image array} across the boxes of a page.
+    """
+    box = pymupdf.Rect(bbox) * (1 / zoom)
+    holders = [(xref, rect) for xref, rect in placed_images if rect.intersects(box)]
+    # the box is rounded to page pixels, a pixel of slack
+    if len(holders) != 1 or not (holders[0][1] + (-1/zoom, -1/zoom, 1/zoom, 1/zoom)).contains(box):
+        return None
+    xref, rect = holders[0]
+    if xref not in image_arrays:
+        image_arrays[xref] = get_image_array(pdf_document, xref)
+    image = image_arrays[xref]
+    h, w = image.shape[:2]
+    x0, x1 = max(0, floor((box.x0 - rect.x0)*w/rect.width)), min(w, ceil((box.x1 - rect.x0)*w/rect.width))
+    y0, y1 = max(0, floor((box.y0 - rect.y0)*h/rect.height)), min(h, ceil((box.y1 - rect.y0)*h/rect.height))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return image[y0:y1, x0:x1].copy()
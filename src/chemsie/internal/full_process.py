@@ -1,15 +1,28 @@
 from src.chemsie.internal.matching import match_mol_pic_clusters_to_molecule_segments
-from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
 from src.chemsie.internal.segments_creation import locate_molecule_segments, fill_smiles
 from src.chemsie.internal.sequences2segments import process_molecule_segment_text
 from src.chemsie.internal.segements_merging import adjust_molecule_segments_by_common_sequence
-from src.chemsie.internal.mol_pic import extract_pics_from_pdf
+from src.chemsie.internal.parameter_sweep import DocumentSweep
+from src.chemsie.internal.segment_cache import SegmentCache
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner
+from src.chemsie.internal.search_strategies import run_search_strategy, SearchResult, WARM_START_STRATEGIES
+from src.chemsie.internal.parameter_priors import get_layout_fingerprint
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf, extract_pics_from_pdf_list, YODE_BATCH_SIZE, MAX_IN_FLIGHT_PAGES
 from src.chemsie.internal.mol_pic_cluster import sort_mol_pics_to_clusters
+from src.chemsie.internal.detector_cascade import get_expected_structures
 from src.chemsie.legacy.storage import load_pickle_by_filename
 
+import os
+import time
 import timeit
+import logging
 from functools import wraps
 
+logger = logging.getLogger(__name__)
+
+CANDIDATE_PAGE_NEIGHBOURHOOD = 1 # structure images often sit a page before or after their test lines
+
 def benchmark(number=1000, repeat=5):
     def decorator(func):
         @wraps(func)
@@ -23,17 +36,39 @@ def benchmark(number=1000, repeat=5):
     return decorator
 
 def process_text_doc(pdf_path, tokens_mark=80, spaces_mark=35):
-    page_lines_with_multi_idx = extract_text_with_multi_idx(pdf_path)
+    page_lines_with_multi_idx = extract_document_lines(pdf_path)
     molecule_segments = locate_molecule_segments(page_lines_with_multi_idx, tokens_mark=tokens_mark, spaces_mark=spaces_mark)
-    processed_molecule_segments = process_molecule_segment_text(molecule_segments)
-    final_molecule_segments = adjust_molecule_segments_by_common_sequence(processed_molecule_segments)
+    segment_cache = SegmentCache(DocumentTestLineScanner(page_lines_with_multi_idx))
+    processed_molecule_segments = process_molecule_segment_text(molecule_segments, segment_cache=segment_cache)
+    final_molecule_segments = adjust_molecule_segments_by_common_sequence(processed_molecule_segments, segment_cache=segment_cache)
     return final_molecule_segments
 
-def process_pic_doc(pdf_path, save_pics=False, save_dir='', pages=[], backend='decimer'):
-    mol_pics = extract_pics_from_pdf(pdf_path, save_pics, save_dir, pages, backend=backend)
+def process_pic_doc(pdf_path, save_pics=False, save_dir='', pages=[], backend='decimer', batch_size=YODE_BATCH_SIZE,
+                    max_in_flight_pages=MAX_IN_FLIGHT_PAGES, page_filter='skip', page_stats=None, expected_structures=None,
+                    page_backends=None):
+    mol_pics = extract_pics_from_pdf(pdf_path, save_pics, save_dir, pages, backend=backend, batch_size=batch_size,
+                                     max_in_flight_pages=max_in_flight_pages, page_filter=page_filter, page_stats=page_stats,
+                                     expected_structures=expected_structures, page_backends=page_backends)
     mol_pic_clusters = sort_mol_pics_to_clusters(mol_pics)
     return mol_pic_clusters
 
+def get_candidate_pages(page_lines_with_multi_idx, page_neighbourhood=CANDIDATE_PAGE_NEIGHBOURHOOD):
+    """
+    The pages worth running the structure detector on, from a text-only pass: the pages with a
+    test line (NMR, IR, Rf, HRMS) and page_neighbourhood pages on each side of them. Empty when the
+    text has no test line (e.g. a scanned document), which process_pic_doc takes as all pages.
+    """
+    test_pages = DocumentTestLineScanner(page_lines_with_multi_idx).get_test_pages()
+    return sorted({page_num for test_page in test_pages
+                   for page_num in range(max(test_page - page_neighbourhood, 0), test_page + page_neighbourhood + 1)})
+
+def process_pic_doc_list(pdf_paths, batch_size=YODE_BATCH_SIZE, max_in_flight_pages=MAX_IN_FLIGHT_PAGES, pages_by_path=None,
+                         page_filter='skip', page_stats=None):
+    # yode only, the pages of all documents are batched together
+    mol_pics_dict = extract_pics_from_pdf_list(pdf_paths, batch_size=batch_size, max_in_flight_pages=max_in_flight_pages,
+                                               pages_by_file=pages_by_path, page_filter=page_filter, page_stats=page_stats)
+    return {pdf_path: sort_mol_pics_to_clusters(mol_pics) for pdf_path, mol_pics in mol_pics_dict.items()}
+
 def process_doc_text_first(pdf_path, process_pics=False, tokens_mark=80, spaces_mark=35):
     final_molecule_segments = process_text_doc(pdf_path, tokens_mark, spaces_mark)
     pages = [molecule_segment.start_page for molecule_segment in final_molecule_segments]
@@ -61,43 +96,74 @@ def load_default_optimize_options(optimize_options=None, optimize_version='short
                                 {'tokens': 80, 'spaces': 40}]
     return optimize_options
 
+def search_with_prior(document_sweep, mol_pic_clusters, optimize_options, search_strategy, eval_budget, prior_store=None, file_name=None):
+    if prior_store is None:
+        return run_search_strategy(document_sweep, mol_pic_clusters, optimize_options, search_strategy, eval_budget)
+    fingerprint = get_layout_fingerprint(document_sweep.pdf_path)
+    prior_option, similarity, confidence = prior_store.suggest(fingerprint)
+    mean_search_seconds = prior_store.get_mean_search_seconds()
+    if prior_option and prior_store.should_skip(confidence):
+        search_result = SearchResult('prior', prior_option, None, 0, 0.0, len(optimize_options))
+        prior_store.record_usage(file_name, 'skip', similarity, confidence, 0.0, mean_search_seconds)
+        return search_result
+    if search_strategy not in WARM_START_STRATEGIES:
+        prior_option = None # grid and successive halving cover the options in a fixed order, a start option changes nothing
+    start_time = time.perf_counter()
+    search_result = run_search_strategy(document_sweep, mol_pic_clusters, optimize_options, search_strategy, eval_budget, start_option=prior_option)
+    search_seconds = time.perf_counter() - start_time
+    if prior_option:
+        prior_store.record_usage(file_name, 'warm_start', similarity, confidence, search_seconds, max(mean_search_seconds - search_seconds, 0.0))
+    else:
+        prior_store.record_usage(file_name, 'cold', similarity, confidence, search_seconds, 0.0)
+    prior_store.record_result(file_name, fingerprint, search_result.best_option, search_result.best_result, search_seconds)
+    return search_result
+
 # @benchmark(number=10, repeat=5)
-def optimize_text_grab_by_pic_matching(pdf_path, mol_pic_clusters, optimize_options=None, optimize_version='short'):
+def optimize_text_grab_by_pic_matching(pdf_path, mol_pic_clusters, optimize_options=None, optimize_version='short',
+                                       search_strategy='grid', eval_budget=None, search_stats=None, prior_store=None,
+                                       page_lines_with_multi_idx=None):
     optimize_options = load_default_optimize_options(optimize_options, optimize_version)
-    # Initialize so we always have a safe fallback
-    best_result = -1
-    best_condition = None
-    for opt_option in optimize_options:
-        molecule_segments = process_text_doc(pdf_path, tokens_mark=opt_option.get('tokens'), spaces_mark=opt_option.get('spaces'))
-        # Guard if clusters are None or empty
-        if mol_pic_clusters:
-            match_mol_pic_clusters_to_molecule_segments(molecule_segments, mol_pic_clusters, False)
-        matched_segments = [molecule_segment for molecule_segment in molecule_segments if molecule_segment.mol_pics]
-        current_result = len(matched_segments)
-        if current_result>best_result:
-            best_result = current_result
-            best_condition = opt_option
-    # Fallback to first option if nothing matched
-    if best_condition is None:
-        best_condition = optimize_options[0]
-    molecule_segments = process_text_doc(pdf_path, tokens_mark=best_condition.get('tokens'), spaces_mark=best_condition.get('spaces'))
-    # print('last test')
-    # for ms in molecule_segments:
-    #     if ms.has_test_text_sequence:
-    #         len1 = len(ms.test_text_sequence.test_text_lines)
-    #         len2 = len(ms.test_text_sequence.test_type_list)
-    #         print(len1==len2)
+    # Text is extracted and scored once, each option only re-thresholds the stored line statistics
+    document_sweep = DocumentSweep(pdf_path, page_lines_with_multi_idx)
+    search_result = search_with_prior(document_sweep, mol_pic_clusters, optimize_options, search_strategy, eval_budget,
+                                      prior_store, os.path.basename(pdf_path))
+    molecule_segments = document_sweep.process_option(search_result.best_option)
+    logger.debug(f'{pdf_path}: {search_result}, {document_sweep}')
+    if search_stats is not None:
+        search_stats.update(search_result.__dict__)
+        search_stats['segment_cache'] = document_sweep.segment_cache.get_stats()
     if mol_pic_clusters:
         match_mol_pic_clusters_to_molecule_segments(molecule_segments, mol_pic_clusters, False)
     return molecule_segments
 
 def process_doc_pics_first(pdf_path, pre_taken_pics=None, save_pics=False, save_dir='', optimize_options=None, 
-                           optimize_version='short', backend='yode', get_smiles=True):
-    if pre_taken_pics:
+                           optimize_version='short', backend='yode', get_smiles=True, search_strategy='grid', eval_budget=None,
+                           search_stats=None, prior_store=None, batch_size=YODE_BATCH_SIZE, max_in_flight_pages=MAX_IN_FLIGHT_PAGES,
+                           pages=None, candidate_pages=False, page_neighbourhood=CANDIDATE_PAGE_NEIGHBOURHOOD, page_filter='skip',
+                           page_stats=None, page_lines_with_multi_idx=None):
+    page_stats = dict() if page_stats is None else page_stats # pages the structure detector skipped, see iter_page_segments_yode
+    page_backends = dict() # with the cascade backend, the detector of the final boxes of each page
+    if pre_taken_pics is not None:
         mol_pic_clusters = pre_taken_pics
     else:
-        mol_pic_clusters = process_pic_doc(pdf_path, save_pics, save_dir, backend=backend)
-    final_molecule_segments = optimize_text_grab_by_pic_matching(pdf_path, mol_pic_clusters, optimize_options, optimize_version)
+        expected_structures = None
+        if page_lines_with_multi_idx is None and ((pages is None and candidate_pages) or backend == 'cascade'):
+            # text-only pre-pass, its lines are reused by the sweep
+            page_lines_with_multi_idx = extract_document_lines(pdf_path)
+        if pages is None and candidate_pages:
+            pages = get_candidate_pages(page_lines_with_multi_idx, page_neighbourhood)
+        if backend == 'cascade':
+            expected_structures = get_expected_structures(DocumentTestLineScanner(page_lines_with_multi_idx).get_test_line_counts())
+        mol_pic_clusters = process_pic_doc(pdf_path, save_pics, save_dir, pages=pages, backend=backend, batch_size=batch_size,
+                                           max_in_flight_pages=max_in_flight_pages, page_filter=page_filter, page_stats=page_stats,
+                                           expected_structures=expected_structures, page_backends=page_backends)
+    final_molecule_segments = optimize_text_grab_by_pic_matching(pdf_path, mol_pic_clusters, optimize_options, optimize_version,
+                                                                 search_strategy, eval_budget, search_stats, prior_store,
+                                                                 page_lines_with_multi_idx)
+    if search_stats is not None and page_stats:
+        search_stats['pages'] = page_stats
+    if search_stats is not None and page_backends:
+        search_stats['page_backends'] = page_backends
     match_mol_pic_clusters_to_molecule_segments(final_molecule_segments, mol_pic_clusters, True)
     if get_smiles:
         final_molecule_segments = fill_smiles(final_molecule_segments)
@@ -1,42 +1,392 @@
 import os
+from math import ceil
 import numpy as np
 # import gzip
 from PIL import Image
 
-# from decimer_segmentation import segment_chemical_structures
-from src.models.yode_backend import segment_chemical_structures_yode
+from src.models.yode_backend import (iter_segment_chemical_structures_yode, iter_detect_chemical_structures_yode, get_letterbox_size,
+                                     YODE_BATCH_SIZE, YODE_IMGSZ)
 from src.models.decimer_functions import get_square_image
+from src.chemsie.internal.page_filter import get_structure_free_pages
+from src.chemsie.internal.embedded_images import get_embedded_image_pages, get_image_array, get_embedded_crop
+from src.chemsie.internal.region_proposals import get_region_proposals
+from src.chemsie.internal.detector_cascade import get_escalation_reasons
 
 import pymupdf  # PyMuPDF
+import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Pool
 import cv2
 from tqdm import tqdm
+import logging
 
+logger = logging.getLogger(__name__)
 
-def segment_chemical_structures_from_file(file_path: str, expand: bool = True, pages=None, backend='decimer'):
+RENDER_DPI = 300
+RENDER_WORKERS = 4
+MAX_IN_FLIGHT_PAGES = 8 # rendered pages not yet through the detector, ~25 MB each at 300 dpi, ~1 MB at the YoDe input size
+PAGE_FILTERS = (None, 'skip', 'check') # pre-filter of structure-free pages, see iter_page_segments_yode
+PROPOSAL_TILE_GAP = 32 # pixels between the region proposals packed into one detector input, the model stride
+BACKENDS = ('yode', 'decimer', 'cascade') # structure detectors of extract_pics_from_pdf
 
+
+def pixmap_to_array(pix):
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+
+def render_page(pdf_document, page_num):
+    page = pdf_document[page_num]
+    matrix = pymupdf.Matrix(RENDER_DPI / 72, RENDER_DPI / 72)
+    return pixmap_to_array(page.get_pixmap(matrix=matrix, alpha=False))
+
+def get_page_shape(page):
+    """The shape of the page rendered at 300 dpi, without rendering it."""
+    zoom = RENDER_DPI / 72
+    page_irect = (page.rect * pymupdf.Matrix(zoom, zoom)).irect # the size get_pixmap gives
+    return page_irect.height, page_irect.width, 3
+
+def render_page_for_detection(pdf_document, page_num, imgsz=None, placed_images=None, proposal_layout=None):
+    """
+    (page image, page shape) for the detector. Without imgsz, the page at 300 dpi and None. With
+    imgsz, the page rendered straight at the size YoDe letterboxes its 300 dpi rendering to (so no
+    300 dpi pixels are made or resized), and the shape that 300 dpi rendering would have.
+    With placed_images, the page is composed from its embedded images (compose_embedded_page),
+    with proposal_layout, from its region proposals (compose_proposal_page).
+    """
+    if placed_images:
+        return compose_embedded_page(pdf_document, page_num, placed_images, imgsz or YODE_IMGSZ)
+    if proposal_layout:
+        return compose_proposal_page(pdf_document, page_num, proposal_layout)
+    if imgsz is None:
+        return render_page(pdf_document, page_num), None
+    page = pdf_document[page_num]
+    page_shape = get_page_shape(page)
+    height, width = get_letterbox_size(page_shape, imgsz)
+    pix = page.get_pixmap(matrix=pymupdf.Matrix(width / page.rect.width, height / page.rect.height), alpha=False)
+    return pixmap_to_array(pix), page_shape
+
+def compose_embedded_page(pdf_document, page_num, placed_images, imgsz=YODE_IMGSZ):
+    """
+    render_page_for_detection with imgsz for a page whose structures can only be in its images
+    (embedded_images.get_placed_images): the images, decoded at their native resolution, scaled
+    into their placement rectangles on a white page. Nothing of the page is rasterised, and the
+    detector sees the images at the scale they have on the page.
+    """
+    page = pdf_document[page_num]
+    page_shape = get_page_shape(page)
+    height, width = get_letterbox_size(page_shape, imgsz)
+    scale_x, scale_y = width / page.rect.width, height / page.rect.height
+    page_image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for xref, rect in placed_images: # in drawing order, later images cover earlier ones
+        x0, y0 = round(rect.x0 * scale_x), round(rect.y0 * scale_y)
+        image = cv2.resize(get_image_array(pdf_document, xref),
+                           (max(1, round(rect.width * scale_x)), max(1, round(rect.height * scale_y))), interpolation=cv2.INTER_AREA)
+        # images may bleed off the page
+        x1, y1 = min(x0 + image.shape[1], width), min(y0 + image.shape[0], height)
+        if x1 > max(x0, 0) and y1 > max(y0, 0):
+            page_image[max(y0, 0):y1, max(x0, 0):x1] = image[max(y0, 0) - y0:y1 - y0, max(x0, 0) - x0:x1 - x0]
+    return page_image, page_shape
+
+def get_proposal_layout(page, proposals, imgsz=YODE_IMGSZ):
+    """
+    How the region proposals of a page (rects in points, see region_proposals) are packed into one
+    detector input: (scale, [(rect, (x, y))], (height, width)). The proposals are rendered at the
+    scale the detector sees the whole page at, left to right on shelves as wide as the page input,
+    PROPOSAL_TILE_GAP apart. None when that is not smaller than the page input.
+    """
+    height, width = get_letterbox_size(get_page_shape(page), imgsz)
+    scale = width / page.rect.width
+    tiles, x, y, shelf_height = [], 0, 0, 0
+    for rect in proposals:
+        tile_width, tile_height = ceil(rect.width * scale), ceil(rect.height * scale)
+        if x and x + tile_width > width:
+            x, y, shelf_height = 0, y + shelf_height + PROPOSAL_TILE_GAP, 0
+        tiles.append((rect, (x, y)))
+        x += tile_width + PROPOSAL_TILE_GAP
+        shelf_height = max(shelf_height, tile_height)
+    if y + shelf_height >= height:
+        return None
+    return scale, tiles, (y + shelf_height, width)
+
+def get_proposal_layouts(pdf_document, page_nums, imgsz=YODE_IMGSZ):
+    """{page_num: proposal layout} for the pages of page_nums with region proposals that pack smaller than the page (get_proposal_layout)."""
+    proposal_layouts = dict()
+    for page_num in page_nums:
+        proposals = get_region_proposals(pdf_document, page_num)
+        proposal_layout = proposals and get_proposal_layout(pdf_document[page_num], proposals, imgsz)
+        if proposal_layout:
+            proposal_layouts[page_num] = proposal_layout
+    return proposal_layouts
+
+def compose_proposal_page(pdf_document, page_num, proposal_layout):
+    """The region proposals of a page rendered into the mosaic of its proposal_layout, and the mosaic shape."""
+    page = pdf_document[page_num]
+    scale, tiles, (height, width) = proposal_layout
+    mosaic = np.full((height, width, 3), 255, dtype=np.uint8)
+    for rect, (x, y) in tiles:
+        tile = pixmap_to_array(page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), clip=rect, alpha=False))[:height - y, :width - x]
+        mosaic[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+    return mosaic, mosaic.shape
+
+def get_proposal_boxes(proposal_layout, bboxes, page_shape):
+    """
+    The (x1, y1, x2, y2) boxes found on a proposal mosaic (pixels) in the pixels of the page at
+    300 dpi, each clipped to the proposal its centre is in.
+    """
+    scale, tiles, _ = proposal_layout
+    zoom = RENDER_DPI / 72
+    page_bboxes = []
+    for x1, y1, x2, y2 in bboxes:
+        centre_x, centre_y = (x1 + x2) / 2, (y1 + y2) / 2
+        for rect, (x, y) in tiles:
+            if x <= centre_x < x + rect.width * scale and y <= centre_y < y + rect.height * scale:
+                box = pymupdf.Rect(rect.x0 + (x1 - x) / scale, rect.y0 + (y1 - y) / scale,
+                                   rect.x0 + (x2 - x) / scale, rect.y0 + (y2 - y) / scale) & rect
+                x1_page, y1_page = max(0, round(box.x0 * zoom)), max(0, round(box.y0 * zoom))
+                x2_page, y2_page = min(page_shape[1] - 1, round(box.x1 * zoom)), min(page_shape[0] - 1, round(box.y1 * zoom))
+                if x2_page > x1_page and y2_page > y1_page:
+                    page_bboxes.append((x1_page, y1_page, x2_page, y2_page))
+                break
+    return page_bboxes
+
+def render_clip(page, bbox):
+    """The (x1, y1, x2, y2) box of the page at 300 dpi (pixels), rendered alone: the crop of the full page rendering."""
+    zoom = RENDER_DPI / 72
+    return pixmap_to_array(page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), clip=pymupdf.Rect(bbox) * (1 / zoom), alpha=False))
+
+def get_page_crop(pdf_document, page_num, bbox, placed_images=None, image_arrays=None):
+    """
+    The crop of the (x1, y1, x2, y2) box of a page at 300 dpi (pixels): cut from the native pixels
+    of the embedded image that holds it when the page has placed_images (get_embedded_crop,
+    image_arrays caches the decoded images), else rendered (render_clip).
+    """
+    crop = get_embedded_crop(pdf_document, placed_images, bbox, RENDER_DPI / 72, image_arrays) if placed_images else None
+    return crop if crop is not None else render_clip(pdf_document[page_num], bbox)
+
+def get_selected_pages(page_count, pages=None):
+    """The page numbers (0-based) to render in page order: pages within the document, or all of them when pages is empty."""
+    if not pages:
+        return list(range(page_count))
+    return sorted({page_num for page_num in pages if 0 <= page_num < page_count})
+
+def render_page_images(file_path: str, pages=None):
+    """
+    The pages of a PDF as RGB arrays at 300 dpi, or the image file as the one page. All pages are held.
+    With pages, only those are rendered and the others are None.
+    """
     if file_path[-3:].lower() == "pdf":
         # Convert PDF to images using PyMuPDF with optimized settings
         pdf_document = pymupdf.open(file_path)
-        images = [None] * pdf_document.page_count
-
-        def render_page(page_num):
-            page = pdf_document[page_num]
-            matrix = pymupdf.Matrix(300 / 72, 300 / 72)
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
-            img_array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
-            return page_num, img_array
-
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [executor.submit(render_page, i) for i in range(pdf_document.page_count)]
-            for future in futures:
-                page_num, img_array = future.result()
-                images[page_num] = img_array
+        page_images = [None] * pdf_document.page_count
+
+        with ThreadPoolExecutor(max_workers=RENDER_WORKERS) as executor:
+            futures = {i: executor.submit(render_page, pdf_document, i) for i in get_selected_pages(pdf_document.page_count, pages)}
+            for page_num, future in futures.items():
+                page_images[page_num] = future.result()
         pdf_document.close()
-        page_images = [img for img in images if img is not None]
     else:
         page_images = [cv2.imread(file_path, cv2.IMREAD_COLOR)]
+    return page_images
+
+def iter_rendered_pages(file_path: str, page_slots, pages=None, imgsz=None, num_workers=RENDER_WORKERS, embedded_pages=None,
+                        proposal_layouts=None):
+    """
+    Yields (page_num, page image, page shape) of a PDF in page order (an image file is the one page),
+    as render_page_for_detection gives them, rendered ahead by num_workers threads, only the given
+    pages when there are any. Each page takes one of page_slots (a threading.Semaphore) before
+    it is rendered, and the consumer releases it once done with the page, so no more pages than
+    slots are alive at once. The pages of embedded_pages ({page_num: placed images}) are composed
+    from their images instead, and those of proposal_layouts ({page_num: proposal layout}) from
+    their region proposals.
+    """
+    if file_path[-3:].lower() != "pdf":
+        page_slots.acquire()
+        yield 0, cv2.imread(file_path, cv2.IMREAD_COLOR), None
+        return
+
+    pdf_document = pymupdf.open(file_path)
+    try:
+        page_nums = deque(get_selected_pages(pdf_document.page_count, pages))
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            pending = deque()
+            while page_nums or pending:
+                # render ahead while slots are free, wait for one only when nothing is left to hand out
+                while page_nums and page_slots.acquire(blocking=not pending):
+                    page_num = page_nums.popleft()
+                    pending.append((page_num, executor.submit(render_page_for_detection, pdf_document, page_num, imgsz,
+                                                              (embedded_pages or dict()).get(page_num),
+                                                              (proposal_layouts or dict()).get(page_num))))
+                # no reference to a page is kept here once it is handed out
+                yield (pending[0][0], *pending.popleft()[1].result())
+    finally:
+        pdf_document.close()
+
+def update_page_stats(page_stats, **counts):
+    for name, count in counts.items():
+        page_stats[name] = page_stats.get(name, 0) + count
+
+def filter_pages(pdf_document, pages, page_filter, page_stats):
+    """
+    (pages to render, structure-free pages) of a PDF for page_filter, among pages (in order).
+    'skip' leaves the structure-free pages out, 'check' renders them anyway. Counts go to page_stats.
+    """
+    structure_free_pages = get_structure_free_pages(pdf_document, pages)
+    update_page_stats(page_stats, inspected_pages=len(pages), structure_free_pages=len(structure_free_pages))
+    if page_filter == 'skip':
+        update_page_stats(page_stats, skipped_pages=len(structure_free_pages))
+        pages = sorted(set(pages) - set(structure_free_pages))
+    return pages, structure_free_pages
+
+def iter_page_segments_yode(file_paths, batch_size=YODE_BATCH_SIZE, max_in_flight_pages=MAX_IN_FLIGHT_PAGES, pages_by_file=None,
+                            two_resolution=True, page_filter='skip', page_stats=None, embedded_images=True,
+                            region_proposals=False, confidences=None):
+    """
+    Yields ((file_path, page_num), page_shape, [segments, bboxes]) for the pages of the files (only
+    pages_by_file[file_path] when given, see get_selected_pages), in order, rendering ahead while
+    the detector runs. At most max_in_flight_pages rendered pages are alive at once, the detector
+    batch included (so batch_size is capped to it): a page is released as soon as its boxes are
+    found, and peak memory does not grow with the document length. Pages of consecutive files
+    share batches.
+    With two_resolution, PDF pages are detected on a rendering at the model input size and only
+    the detected boxes are rendered at 300 dpi (render_clip); boxes, crops and page_shape are the
+    ones of the 300 dpi page either way.
+    page_filter: the PDF pages that cannot contain a structure (page_filter.may_contain_structure,
+    read from the page content before rendering) are not rendered with 'skip', and are detected
+    anyway with 'check', which counts and logs the structures found on them (filter misses).
+    None renders all pages.
+    With embedded_images, the PDF pages whose structures can only be in embedded images
+    (embedded_images.get_placed_images) are not rendered: the detector sees the images composed
+    into the page (compose_embedded_page), and the crops are cut from their native pixels.
+    With region_proposals, the other PDF pages with vector structures are not detected as a whole:
+    the clusters of their drawings (region_proposals.get_region_proposals) are packed into a
+    smaller input at the scale of the page (compose_proposal_page), and YoDe keeps, and tightens,
+    the ones that hold a structure. Pages without proposals are detected as a whole.
+    The page counts (inspected, structure-free, skipped, embedded image pages, proposal pages and
+    proposals) and misses are added to page_stats when given, and the YoDe confidences of the
+    boxes of each page to confidences[(file_path, page_num)], in the order of its bboxes.
+    """
+    if page_filter not in PAGE_FILTERS:
+        raise ValueError(f'Unknown page filter: {page_filter}, choose from {list(PAGE_FILTERS)}')
+    page_stats = dict() if page_stats is None else page_stats
+    page_slots = threading.Semaphore(max_in_flight_pages)
+    page_shapes = dict()
+    structure_free_keys = set() # with 'check', to tell misses
+    placed_images_by_key = dict() # of the embedded image pages, for their crops
+    proposal_layouts_by_key = dict() # of the proposal pages, for their boxes
+
+    def iter_pages():
+        for file_path in file_paths:
+            pages = (pages_by_file or dict()).get(file_path)
+            embedded_pages, proposal_layouts = None, None
+            if (page_filter or embedded_images or region_proposals) and file_path[-3:].lower() == "pdf":
+                with pymupdf.open(file_path) as pdf_document:
+                    pages = get_selected_pages(pdf_document.page_count, pages)
+                    if page_filter:
+                        pages, structure_free_pages = filter_pages(pdf_document, pages, page_filter, page_stats)
+                        if page_filter == 'check':
+                            structure_free_keys.update((file_path, page_num) for page_num in structure_free_pages)
+                    if embedded_images:
+                        embedded_pages = get_embedded_image_pages(pdf_document, pages)
+                        update_page_stats(page_stats, embedded_image_pages=len(embedded_pages))
+                        placed_images_by_key.update(((file_path, page_num), placed_images) for page_num, placed_images in embedded_pages.items())
+                    if region_proposals:
+                        proposal_layouts = get_proposal_layouts(pdf_document, [page_num for page_num in pages if page_num not in (embedded_pages or dict())])
+                        update_page_stats(page_stats, proposal_pages=len(proposal_layouts),
+                                          proposals=sum(len(tiles) for _, tiles, _ in proposal_layouts.values()))
+                        proposal_layouts_by_key.update(((file_path, page_num), proposal_layout) for page_num, proposal_layout in proposal_layouts.items())
+                if not pages: # all pages left out, not all pages
+                    continue
+            for page_num, im, page_shape in iter_rendered_pages(file_path, page_slots, pages, YODE_IMGSZ if two_resolution else None,
+                                                                embedded_pages=embedded_pages, proposal_layouts=proposal_layouts):
+                if im is None:
+                    page_slots.release()
+                    continue
+                page_shapes[(file_path, page_num)] = page_shape or im.shape
+                yield (file_path, page_num), im, page_shape
+                del im
+
+    clip_document = None # results come in file order, one document is open for the crops at a time
+    try:
+        # proposal mosaics are smaller than the model input, and are to stay at the scale of their page
+        for key, (segments, bboxes) in iter_detect_chemical_structures_yode(iter_pages(), batch_size=max(1, min(batch_size, max_in_flight_pages)),
+                                                                            scaleup=not region_proposals, confidences=confidences):
+            page_slots.release()
+            file_path, page_num = key
+            page_shape = page_shapes.pop(key)
+            if key in structure_free_keys:
+                structure_free_keys.discard(key)
+                if bboxes:
+                    logger.warning(f'page filter miss: {len(bboxes)} structures on page {page_num} of {file_path}')
+                    update_page_stats(page_stats, missed_pages=1, missed_structures=len(bboxes))
+            if segments is None:
+                if clip_document is None or clip_document.name != file_path:
+                    if clip_document is not None:
+                        clip_document.close()
+                    clip_document = pymupdf.open(file_path)
+                proposal_layout = proposal_layouts_by_key.pop(key, None)
+                if proposal_layout:
+                    page_shape = get_page_shape(clip_document[page_num])
+                    if confidences is not None: # of the boxes that map into a proposal
+                        confidences[key] = [confidence for bbox, confidence in zip(bboxes, confidences[key])
+                                            if get_proposal_boxes(proposal_layout, [bbox], page_shape)]
+                    bboxes = get_proposal_boxes(proposal_layout, bboxes, page_shape)
+                placed_images, image_arrays = placed_images_by_key.pop(key, None), dict()
+                segments = [get_page_crop(clip_document, page_num, bbox, placed_images, image_arrays) for bbox in bboxes]
+            yield key, page_shape, [segments, bboxes]
+    finally:
+        if clip_document is not None:
+            clip_document.close()
+
+def segment_page_decimer(im):
+    """[segments, bboxes] of a 300 dpi page image by DECIMER segmentation, imported on first use (TensorFlow)."""
+    from decimer_segmentation import segment_chemical_structures
+    return [entry for entry in segment_chemical_structures(im, expand=False, return_bboxes=True)]
+
+def iter_page_segments_cascade(pdf_file, pages=None, batch_size=YODE_BATCH_SIZE, max_in_flight_pages=MAX_IN_FLIGHT_PAGES,
+                               page_filter='skip', page_stats=None, embedded_images=True, expected_structures=None, page_backends=None):
+    """
+    Yields (page_num, page_shape, [segments, bboxes]) for the pages of a PDF (see
+    iter_page_segments_yode for pages, page_filter and embedded_images): YoDe runs on all of them,
+    and the pages whose YoDe boxes are uncertain (detector_cascade.get_escalation_reasons, with
+    expected_structures {page_num: structures the text pass expects}) are segmented again with
+    DECIMER, whose boxes replace YoDe's. The YoDe pages come first, in order, then the escalated
+    ones. page_backends[page_num] is set to the backend of the final boxes of each page, and the
+    escalated pages and their reasons are counted in page_stats, when given.
+    """
+    page_stats = dict() if page_stats is None else page_stats
+    page_backends = dict() if page_backends is None else page_backends
+    confidences = dict()
+    escalated_pages = []
+    with pymupdf.open(pdf_file) as pdf_document:
+        for key, page_shape, page_segments in iter_page_segments_yode([pdf_file], batch_size, max_in_flight_pages, {pdf_file: pages},
+                                                                      page_filter=page_filter, page_stats=page_stats,
+                                                                      embedded_images=embedded_images, confidences=confidences):
+            page_num = key[1]
+            reasons = get_escalation_reasons(pdf_document[page_num], page_segments[1], confidences.pop(key), page_shape,
+                                             (expected_structures or dict()).get(page_num, 0))
+            if reasons:
+                logger.debug(f'page {page_num} of {pdf_file} escalated to DECIMER: {reasons}')
+                update_page_stats(page_stats, escalated_pages=1, **{f'{reason}_pages': 1 for reason in reasons})
+                escalated_pages.append(page_num)
+                continue
+            page_backends[page_num] = 'yode'
+            yield page_num, page_shape, page_segments
+        # DECIMER only once YoDe is through, the YoDe pages are not held up behind it
+        for page_num in escalated_pages:
+            im = render_page(pdf_document, page_num)
+            page_backends[page_num] = 'decimer'
+            yield page_num, im.shape, segment_page_decimer(im)
+
+def segment_chemical_structures_from_file(file_path: str, expand: bool = True, pages=None, backend='decimer', batch_size=YODE_BATCH_SIZE):
+
+    page_images = render_page_images(file_path, pages)
+
+    if backend == 'yode':
+        # batch_size pages per forward pass
+        keyed_images = ((idx, im) for idx, im in enumerate(page_images) if im is not None)
+        segs_by_page = dict(tqdm(iter_segment_chemical_structures_yode(keyed_images, batch_size=batch_size),
+                                 total=sum(im is not None for im in page_images), desc='Segmenting pages', unit='page'))
+        return page_images, [(idx, segs_by_page.get(idx, [])) for idx in range(len(page_images))]
 
     overall_segments = []
 
@@ -49,14 +399,7 @@ def segment_chemical_structures_from_file(file_path: str, expand: bool = True, p
             overall_segments.append((idx, []))
             continue
         
-        if backend == 'yode':
-            # print ('yode')
-            segs = segment_chemical_structures_yode (im)
-
-        else:
-            segs = segment_chemical_structures(im, expand = False, return_bboxes=True)
-
-        page_segments = [entry for entry in segs]
+        page_segments = segment_page_decimer(im)
 
         overall_segments.append((idx, page_segments))
 
@@ -96,10 +439,44 @@ def bbox_xyxy_to_xywh(bbox, page_w, page_h):
                 round(100*(y1-y0)/page_h, 2), )
     return new_bbox
 
-def extract_pics_from_pdf(pdf_file, save_pics=False, save_dir='', pages=None, backend='decimer'):
+def get_page_mol_pics(page_num, page_segments, page_shape, pdf_file):
+    # Expect (segment_images, bboxes)
+    if not page_segments or not isinstance(page_segments, (tuple, list)) or len(page_segments) != 2:
+        return []
+    segment_images, bboxes = page_segments
+    page_h, page_w = page_shape[:2]
+
+    mol_pics = []
+    for idx, im in enumerate(segment_images):
+        image = get_square_image(im, 224)
+        xywh_bbox = bbox_xyxy_to_xywh(bboxes[idx], page_w, page_h)
+        mol_pics.append(MolPic(page_num, xywh_bbox, image, pdf_file))
+    return mol_pics
+
+def extract_pics_from_pdf(pdf_file, save_pics=False, save_dir='', pages=None, backend='decimer', batch_size=YODE_BATCH_SIZE,
+                          max_in_flight_pages=MAX_IN_FLIGHT_PAGES, two_resolution=True, page_filter='skip', page_stats=None,
+                          embedded_images=True, region_proposals=False, expected_structures=None, page_backends=None):
+    """
+    MolPics of the structures of a PDF, found with backend (BACKENDS): 'yode' or 'decimer' on all
+    pages, or 'cascade', YoDe with DECIMER on the pages YoDe is uncertain about (see
+    iter_page_segments_cascade for expected_structures and page_backends).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown backend: {backend}, choose from {list(BACKENDS)}')
+
+    if backend == 'cascade':
+        mol_pics = []
+        for page_num, page_shape, page_segments in iter_page_segments_cascade(pdf_file, pages, batch_size, max_in_flight_pages, page_filter,
+                                                                              page_stats, embedded_images, expected_structures, page_backends):
+            mol_pics += get_page_mol_pics(page_num, page_segments, page_shape, pdf_file)
+        return sorted(mol_pics, key=lambda mol_pic: mol_pic.page_num)
+
+    if backend == 'yode':
+        return extract_pics_from_pdf_list([pdf_file], batch_size, max_in_flight_pages, {pdf_file: pages}, two_resolution,
+                                          page_filter, page_stats, embedded_images, region_proposals)[pdf_file]
 
     page_images, overalll_segments = segment_chemical_structures_from_file(
-        pdf_file, expand=True, pages=pages, backend = backend
+        pdf_file, expand=True, pages=pages, backend = backend, batch_size=batch_size
     )
 
     if not page_images:
@@ -113,19 +490,26 @@ def extract_pics_from_pdf(pdf_file, save_pics=False, save_dir='', pages=None, ba
         if len(segment) == 0:
             continue
         page_num, page_segments = segment
-        # Expect (segment_images, bboxes)
-        if not page_segments or not isinstance(page_segments, (tuple, list)) or len(page_segments) != 2:
+        if page_images[page_num] is None: # not rendered, or not readable
             continue
-        segment_images, bboxes = page_segments
-
-        page_h = page_images[page_num].shape[0]
-        page_w = page_images[page_num].shape[1]
+        mol_pics += get_page_mol_pics(page_num, page_segments, page_images[page_num].shape, pdf_file)
 
-        if len(segment_images) > 0:
-            for idx, im in enumerate(segment_images):
-                image = get_square_image(im, 224)
-                xywh_bbox = bbox_xyxy_to_xywh(bboxes[idx], page_w, page_h)
-                molecule_pic = MolPic(page_num, xywh_bbox, image, pdf_file)
-                mol_pics.append(molecule_pic)
+    return mol_pics
 
-    return mol_pics
\ No newline at end of file
+def extract_pics_from_pdf_list(pdf_files, batch_size=YODE_BATCH_SIZE, max_in_flight_pages=MAX_IN_FLIGHT_PAGES, pages_by_file=None,
+                               two_resolution=True, page_filter='skip', page_stats=None, embedded_images=True, region_proposals=False):
+    """
+    extract_pics_from_pdf with the yode backend for several documents: {pdf_file: mol_pics}, on the
+    pages of pages_by_file[pdf_file] when given.
+    The pages of all documents go through the model batch_size at a time, so the last pages of
+    a document share a batch with the first of the next. Rendering and detection overlap, with
+    at most max_in_flight_pages page images alive, and pages without a possible structure or with
+    structures only in embedded images are not rendered (see iter_page_segments_yode for
+    page_filter, page_stats, embedded_images and region_proposals).
+    """
+    mol_pics_dict = {pdf_file: [] for pdf_file in pdf_files}
+    for (pdf_file, page_num), page_shape, page_segments in tqdm(iter_page_segments_yode(pdf_files, batch_size, max_in_flight_pages, pages_by_file, two_resolution,
+                                                                                        page_filter, page_stats, embedded_images, region_proposals),
+                                                                desc='Segmenting pages', unit='page'):
+        mol_pics_dict[pdf_file] += get_page_mol_pics(page_num, page_segments, page_shape, pdf_file)
+    return mol_pics_dict
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Tuple
 from src.chemsie.utils.general import get_page_num_and_line_num_from_multi_idx
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
 from src.chemsie.internal.mol_pic import export_mol_pic, MolPic
 from src.chemsie.internal.test_text_sequence import export_test_sequence_as_pic, TestTextSequence
 import re
@@ -22,12 +23,15 @@ class Spectra:
 class MoleculeSegment:
     def __init__(self, segment_lines: List[Tuple[int, str, Tuple[float, float, float, float]]]):
         self.segment_lines: List[Tuple[int, str, Tuple[float, float, float, float]]] = segment_lines
-        self.start_multi_idx: int = segment_lines[0][0]
+        if isinstance(segment_lines, DocumentLines):
+            self.start_multi_idx, self.end_multi_idx, self.upper_y, self.lower_y = segment_lines.get_bounds()
+        else:
+            self.start_multi_idx: int = segment_lines[0][0]
+            self.end_multi_idx: int = segment_lines[-1][0]
+            self.upper_y: float = segment_lines[0][2][0]
+            self.lower_y: float = segment_lines[-1][2][2]
         self.start_page, self.start_line = get_page_num_and_line_num_from_multi_idx(self.start_multi_idx)
-        self.end_multi_idx: int = segment_lines[-1][0]
         self.end_page, self.end_line = get_page_num_and_line_num_from_multi_idx(self.end_multi_idx)
-        self.upper_y: float = segment_lines[0][2][0]
-        self.lower_y: float = segment_lines[-1][2][2]
 
         self.molecule_name: str = ""
         self.molecule_name_smiles: str = ""
@@ -51,10 +55,13 @@ class MoleculeSegment:
 
     def extract_molecule_name(self, num_lines_to_check: int = 3):
         """Extracts molecule name from the segment text."""
-        logger.debug(f"Extracting molecule name from segment: {self}")
+        logger.debug("Extracting molecule name from segment: %s", self) # lazy, str(self) joins every segment line
         for num_lines in range(1, num_lines_to_check + 1):
             if num_lines <= len(self.segment_lines):
-                text = ''.join(line for _, line, _ in self.segment_lines[:num_lines])
+                if isinstance(self.segment_lines, DocumentLines):
+                    text = self.segment_lines[:num_lines].get_text()
+                else:
+                    text = ''.join(line for _, line, _ in self.segment_lines[:num_lines])
                 name = self._search_molecule_name(text)
                 if name:
                     self.molecule_name = self._clean_molecule_name(name)
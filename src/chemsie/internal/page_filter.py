@@ -0,0 +1,64 @@
+import re
+from itertools import islice
+
+MIN_PATH_SEGMENTS = 5 # the smallest common ring is five bonds, fewer drawn lines and curves are rules or underlines
+
+# line and Bezier curve operators, and the close-path operator, the last bond of a ring drawn as one closed path;
+# rectangles (re, closed already, h after them draws nothing) are table cells and frames, never bonds
+PATH_SEGMENT_PATTERN = re.compile(rb'(?<=\s)(?:[lcvy]|(?<!re\s)h)(?=\s)')
+INLINE_IMAGE_PATTERN = re.compile(rb'(?<=\s)BI(?=\s)')
+
+
+class PageContent:
+    """What a page draws, read from its content streams without interpreting them."""
+    def __init__(self, page_num, num_path_segments, num_images):
+        self.page_num = page_num
+        self.num_path_segments = num_path_segments
+        self.num_images = num_images # both counted only until the page is known to be kept
+
+    def __repr__(self):
+        return f'PageContent - page: {self.page_num}, path segments: {self.num_path_segments}, images: {self.num_images}'
+
+
+def count_path_segments(stream, limit):
+    """The line, curve and close-path operators of a content stream, counted up to limit."""
+    return sum(1 for _ in islice(PATH_SEGMENT_PATTERN.finditer(b' ' + (stream or b'') + b' '), limit))
+
+
+def iter_page_streams(pdf_document, page):
+    yield page.read_contents()
+    for xref, *_ in page.get_xobjects(): # form XObjects, nested ones included (e.g. embedded ChemDraw objects)
+        yield pdf_document.xref_stream(xref)
+
+
+def get_page_content(pdf_document, page_num, min_path_segments=MIN_PATH_SEGMENTS):
+    """
+    The PageContent of a page: its images (resources, nested ones included, and inline images) and
+    path segments, counted on the raw operators of the page and its form XObjects until
+    may_contain_structure holds. Pages of vector spectra draw tens of thousands of segments, and
+    interpreting them all (get_drawings) takes longer than rendering the page.
+    Operators inside strings or inline image data may be counted too, which can only keep a page.
+    """
+    page = pdf_document[page_num]
+    page_content = PageContent(page_num, 0, len(page.get_images(full=True)))
+    # streams are read only until the page is known to be kept
+    for stream in iter_page_streams(pdf_document, page):
+        if may_contain_structure(page_content, min_path_segments):
+            break
+        page_content.num_images += len(INLINE_IMAGE_PATTERN.findall(b' ' + (stream or b'') + b' '))
+        page_content.num_path_segments += count_path_segments(stream, min_path_segments - page_content.num_path_segments)
+    return page_content
+
+
+def may_contain_structure(page_content, min_path_segments=MIN_PATH_SEGMENTS):
+    """
+    False only for pages that cannot show a structure: no image (which could be a structure or a
+    scheme) and fewer than min_path_segments drawn lines and curves (text, rules, underlines, boxes).
+    """
+    return page_content.num_images > 0 or page_content.num_path_segments >= min_path_segments
+
+
+def get_structure_free_pages(pdf_document, page_nums, min_path_segments=MIN_PATH_SEGMENTS):
+    """The pages of page_nums that cannot contain a structure (see may_contain_structure), in order."""
+    return [page_num for page_num in page_nums
+            if not may_contain_structure(get_page_content(pdf_document, page_num, min_path_segments), min_path_segments)]
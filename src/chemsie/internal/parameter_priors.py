@@ -0,0 +1,142 @@
+import re
+import json
+import sqlite3
+import fitz
+from collections import Counter
+
+from src.chemsie.utils.metadata import extract_metadata_from_text
+
+FINGERPRINT_METADATA_FIELDS = ['Text_university', 'Text_subject']
+
+
+class LayoutFingerprint:
+    """Cheap description of a document template: page size, fonts and the template-like metadata fields."""
+    def __init__(self, page_width, page_height, fonts, metadata):
+        self.page_width = page_width
+        self.page_height = page_height
+        self.fonts = set(fonts)
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f'LayoutFingerprint - page: {self.page_width}x{self.page_height}, fonts: {len(self.fonts)}, metadata: {self.metadata}'
+
+    def similarity(self, other):
+        """Score in [0, 1]; fonts weigh the most as they identify a publisher or thesis template best."""
+        same_page = abs(self.page_width-other.page_width)<=2 and abs(self.page_height-other.page_height)<=2
+        font_union = self.fonts | other.fonts
+        font_sim = len(self.fonts & other.fonts)/len(font_union) if font_union else 0.0
+        metadata_keys = [key for key in FINGERPRINT_METADATA_FIELDS if self.metadata.get(key) or other.metadata.get(key)]
+        if metadata_keys:
+            metadata_sim = sum(self.metadata.get(key)==other.metadata.get(key) for key in metadata_keys)/len(metadata_keys)
+        else:
+            metadata_sim = 1.0
+        return round(0.2*same_page + 0.6*font_sim + 0.2*metadata_sim, 4)
+
+def clean_font_name(font_name):
+    # embedded subsets are prefixed with a random tag, e.g. 'ABCDEF+TimesNewRoman'
+    return re.sub(r'^[A-Z]{6}\+', '', font_name)
+
+def get_layout_fingerprint(pdf_path, num_pages=5):
+    document = fitz.open(pdf_path)
+    first_rect = document[0].rect if document.page_count else fitz.Rect(0, 0, 0, 0)
+    fonts = set()
+    text = ''
+    for page_idx in range(min(num_pages, document.page_count)):
+        page = document.load_page(page_idx)
+        fonts.update(clean_font_name(font[3]) for font in page.get_fonts() if font[3])
+        text += page.get_text()
+    document.close()
+    metadata = extract_metadata_from_text(text)
+    template_metadata = {key: metadata.get(key) for key in FINGERPRINT_METADATA_FIELDS if metadata.get(key)}
+    return LayoutFingerprint(round(first_rect.width), round(first_rect.height), sorted(fonts), template_metadata)
+
+
+class ParameterPriorStore:
+    """
+    Local SQLite store of the winning (tokens, spaces) options and the layout fingerprint of the
+    documents they were found on. New documents look up the nearest known templates to warm-start
+    the sweep, or to skip it when enough similar documents agree on the same option.
+    """
+    def __init__(self, db_path, min_similarity=0.7, skip_confidence=0.9, min_support=3):
+        self.db_path = db_path
+        self.min_similarity = min_similarity
+        self.skip_confidence = skip_confidence
+        self.min_support = min_support
+        self.connection = sqlite3.connect(db_path)
+        self.create_tables()
+
+    def __repr__(self):
+        return f'ParameterPriorStore - {self.db_path}, {self.get_usage_stats()}'
+
+    def create_tables(self):
+        with self.connection:
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS priors (
+                                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                        file_name TEXT, page_width REAL, page_height REAL, fonts TEXT, metadata TEXT,
+                                        tokens INTEGER, spaces INTEGER, best_result INTEGER, search_seconds REAL)''')
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS prior_usage (
+                                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                        file_name TEXT, action TEXT, similarity REAL, confidence REAL,
+                                        search_seconds REAL, saved_seconds REAL)''')
+
+    def close(self):
+        self.connection.close()
+
+    def load_priors(self):
+        rows = self.connection.execute('SELECT page_width, page_height, fonts, metadata, tokens, spaces, search_seconds FROM priors').fetchall()
+        priors = []
+        for page_width, page_height, fonts, metadata, tokens, spaces, search_seconds in rows:
+            fingerprint = LayoutFingerprint(page_width, page_height, json.loads(fonts), json.loads(metadata))
+            priors.append((fingerprint, {'tokens': tokens, 'spaces': spaces}, search_seconds))
+        return priors
+
+    def suggest(self, fingerprint):
+        """
+        Returns (option, similarity, confidence) from the nearest known template, or (None, 0, 0).
+        Confidence is the similarity of the nearest document times the share of similar documents
+        that agree with its option, and is zeroed below min_support agreeing documents.
+        """
+        scored = [(fingerprint.similarity(prior_fingerprint), option) for prior_fingerprint, option, _ in self.load_priors()]
+        similar = [(similarity, option) for similarity, option in scored if similarity>=self.min_similarity]
+        if not similar:
+            return None, 0.0, 0.0
+        best_similarity, best_option = max(similar, key=lambda x: x[0])
+        votes = Counter((option['tokens'], option['spaces']) for _, option in similar)
+        support = votes[(best_option['tokens'], best_option['spaces'])]
+        confidence = best_similarity*support/len(similar) if support>=self.min_support else 0.0
+        return best_option, best_similarity, round(confidence, 4)
+
+    def should_skip(self, confidence):
+        return confidence>=self.skip_confidence
+
+    def get_mean_search_seconds(self):
+        """Average cost of a sweep without a prior, the reference for the time saved."""
+        mean_seconds = self.connection.execute("SELECT AVG(search_seconds) FROM prior_usage WHERE action='cold'").fetchone()[0]
+        if mean_seconds is None:
+            mean_seconds = self.connection.execute('SELECT AVG(search_seconds) FROM priors').fetchone()[0]
+        return mean_seconds or 0.0
+
+    def record_result(self, file_name, fingerprint, option, best_result, search_seconds):
+        with self.connection:
+            self.connection.execute('INSERT INTO priors (file_name, page_width, page_height, fonts, metadata, tokens, spaces, best_result, search_seconds) '
+                                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                    (file_name, fingerprint.page_width, fingerprint.page_height, json.dumps(sorted(fingerprint.fonts)),
+                                     json.dumps(fingerprint.metadata), option.get('tokens'), option.get('spaces'), best_result, search_seconds))
+
+    def record_usage(self, file_name, action, similarity, confidence, search_seconds, saved_seconds):
+        with self.connection:
+            self.connection.execute('INSERT INTO prior_usage (file_name, action, similarity, confidence, search_seconds, saved_seconds) '
+                                    'VALUES (?, ?, ?, ?, ?, ?)',
+                                    (file_name, action, similarity, confidence, search_seconds, saved_seconds))
+
+    def get_usage_stats(self):
+        rows = self.connection.execute('SELECT action, COUNT(*), SUM(saved_seconds) FROM prior_usage GROUP BY action').fetchall()
+        counts = {action: count for action, count, _ in rows}
+        total = sum(counts.values())
+        reused = counts.get('skip', 0) + counts.get('warm_start', 0)
+        return {'documents': total,
+                'skipped': counts.get('skip', 0),
+                'warm_started': counts.get('warm_start', 0),
+                'cold': counts.get('cold', 0),
+                'reuse_rate': round(reused/total, 3) if total else 0.0,
+                'saved_seconds': round(sum(saved or 0.0 for _, _, saved in rows), 2)}
@@ -0,0 +1,114 @@
+import numpy as np
+
+from src.chemsie.internal.matching import match_mol_pic_clusters_to_molecule_segments
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
+from src.chemsie.internal.text_processing.document_lines import as_document_lines
+from src.chemsie.internal.segments_creation import get_line_statistics, create_molecule_segments
+from src.chemsie.internal.sequences2segments import process_molecule_segment_text
+from src.chemsie.internal.segements_merging import adjust_molecule_segments_by_common_sequence
+from src.chemsie.internal.segment_cache import SegmentCache
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner
+
+
+class DocumentSweep:
+    """
+    Runs the (tokens, spaces) sweep of a single document on top of one text extraction.
+    Lines are extracted and scored once; every option is then a percentile threshold over
+    the stored per-line statistics, and options that select the same boundary lines share
+    their downstream processing and matching result. Segments that recur between different
+    selections reuse their test-line results through a shared SegmentCache.
+    """
+    def __init__(self, pdf_path=None, page_lines_with_multi_idx=None, token_patterns=None, num_lines_to_check=3):
+        if page_lines_with_multi_idx is None:
+            page_lines_with_multi_idx = extract_document_lines(pdf_path)
+        else:
+            page_lines_with_multi_idx = as_document_lines(page_lines_with_multi_idx)
+        self.pdf_path = pdf_path
+        self.page_lines_with_multi_idx = page_lines_with_multi_idx
+        self.num_lines_to_check = num_lines_to_check
+        tokens_percentages, num_of_spaces_list, suspected_lines = get_line_statistics(page_lines_with_multi_idx, token_patterns)
+        self.tokens_percentages = np.asarray(tokens_percentages, dtype=float)
+        self.num_of_spaces = np.asarray(num_of_spaces_list, dtype=float)
+        self.suspected_lines = np.asarray(suspected_lines, dtype=int)
+        self.selection_results = dict() # (selected lines, line window) -> number of matched segments
+        self.num_evaluations = 0
+        self.evaluation_cost = 0.0
+        self.num_processed_selections = 0
+        self.segment_cache = SegmentCache(DocumentTestLineScanner(page_lines_with_multi_idx))
+
+    def get_selection_masks(self, optimize_options):
+        """Returns one boolean mask over the suspected lines per option, computed in one vectorised pass."""
+        if len(self.suspected_lines)==0:
+            return np.zeros((len(optimize_options), 0), dtype=bool)
+        tokens_marks = np.array([opt_option.get('tokens') for opt_option in optimize_options], dtype=float)
+        spaces_marks = np.array([opt_option.get('spaces') for opt_option in optimize_options], dtype=float)
+        tokens_percentiles = np.percentile(self.tokens_percentages, tokens_marks)
+        spaces_percentiles = np.percentile(self.num_of_spaces, spaces_marks)
+        tokens_masks = self.tokens_percentages[None, :] > tokens_percentiles[:, None]
+        spaces_masks = self.num_of_spaces[None, :] < spaces_percentiles[:, None]
+        return tokens_masks & spaces_masks
+
+    def get_selected_lines(self, optimize_options):
+        selection_masks = self.get_selection_masks(optimize_options)
+        return [tuple(self.suspected_lines[selection_mask].tolist()) for selection_mask in selection_masks]
+
+    def get_line_window(self, line_fraction=1.0, mol_pic_clusters=None):
+        """Lines used by a partial evaluation: a line_fraction long window starting at the first page with pictures."""
+        num_lines = len(self.page_lines_with_multi_idx)
+        if line_fraction>=1.0:
+            return 0, num_lines
+        start_line = 0
+        if mol_pic_clusters:
+            first_pic_page = min(mol_pic_cluster.page_num for mol_pic_cluster in mol_pic_clusters)
+            on_pic_pages = np.flatnonzero(self.page_lines_with_multi_idx.pages>=first_pic_page)
+            if len(on_pic_pages):
+                start_line = int(on_pic_pages[0])
+        end_line = start_line + max(1, int((num_lines - start_line)*line_fraction))
+        return start_line, min(end_line, num_lines)
+
+    def process_selected_lines(self, selected_lines, line_window=None):
+        """Same as process_text_doc after the line statistics, for an already selected set of lines.
+        line_window=(start, end) limits the run to part of the document (cheap, partial evaluations)."""
+        page_lines_with_multi_idx = self.page_lines_with_multi_idx
+        if line_window is not None and line_window!=(0, len(page_lines_with_multi_idx)):
+            start_line, end_line = line_window
+            page_lines_with_multi_idx = page_lines_with_multi_idx[start_line:end_line]
+            selected_lines = [line_idx - start_line for line_idx in selected_lines if start_line<=line_idx<end_line]
+        molecule_segments = create_molecule_segments(page_lines_with_multi_idx, list(selected_lines))
+        for segment in molecule_segments:
+            segment.extract_molecule_name(num_lines_to_check=self.num_lines_to_check)
+        processed_molecule_segments = process_molecule_segment_text(molecule_segments, segment_cache=self.segment_cache)
+        final_molecule_segments = adjust_molecule_segments_by_common_sequence(processed_molecule_segments, segment_cache=self.segment_cache)
+        self.num_processed_selections += 1
+        return final_molecule_segments
+
+    def process_option(self, opt_option):
+        selected_lines = self.get_selected_lines([opt_option])[0]
+        return self.process_selected_lines(selected_lines)
+
+    def count_matched_segments(self, selected_lines, mol_pic_clusters, line_window=None):
+        line_window = (0, len(self.page_lines_with_multi_idx)) if line_window is None else line_window
+        result_key = (selected_lines, line_window)
+        if result_key not in self.selection_results:
+            molecule_segments = self.process_selected_lines(selected_lines, line_window)
+            # Guard if clusters are None or empty
+            if mol_pic_clusters:
+                match_mol_pic_clusters_to_molecule_segments(molecule_segments, mol_pic_clusters, False)
+            matched_segments = [molecule_segment for molecule_segment in molecule_segments if molecule_segment.mol_pics]
+            self.selection_results[result_key] = len(matched_segments)
+        return self.selection_results[result_key]
+
+    def evaluate_options(self, optimize_options, mol_pic_clusters, line_fraction=1.0):
+        """Returns the number of matched segments for every option, in order.
+        With line_fraction<1 only part of the document is segmented and matched (see get_line_window)."""
+        selected_lines_list = self.get_selected_lines(optimize_options)
+        line_window = self.get_line_window(line_fraction, mol_pic_clusters)
+        results = []
+        for selected_lines in selected_lines_list:
+            results.append(self.count_matched_segments(selected_lines, mol_pic_clusters, line_window))
+            self.num_evaluations += 1
+            self.evaluation_cost += min(line_fraction, 1.0)
+        return results
+
+    def __repr__(self):
+        return f'DocumentSweep - lines: {len(self.page_lines_with_multi_idx)}, suspected lines: {len(self.suspected_lines)}, evaluations: {self.num_evaluations}, processed selections: {self.num_processed_selections}, cache: {self.segment_cache.get_stats()}'
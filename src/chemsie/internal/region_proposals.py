@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+import pymupdf
+
+from src.chemsie.internal.page_filter import MIN_PATH_SEGMENTS, count_path_segments, iter_page_streams
+
+MAX_PROPOSAL_SEGMENTS = 5000 # pages drawing more are spectra, reading their drawings takes longer than rendering them
+PROPOSAL_GAP = 6 # points, drawings closer than this are one cluster (bonds around an atom label are ~3 apart)
+PROPOSAL_MARGIN = 18 # points around a cluster, for the atom labels and charges that are text, not drawings
+MAX_PROPOSAL_FRACTION = 0.5 # of the page area, larger clusters are frames or plots, not structures
+
+
+def count_page_path_segments(pdf_document, page, limit):
+    """The lines and curves the page and its form XObjects draw, counted up to limit (see page_filter.count_path_segments)."""
+    num_path_segments = 0
+    for stream in iter_page_streams(pdf_document, page):
+        num_path_segments += count_path_segments(stream, limit - num_path_segments)
+    return num_path_segments
+
+
+def get_drawing_clusters(page, gap=PROPOSAL_GAP):
+    """
+    [(rect, num_path_segments)] of the clusters of the line and curve drawings of a page (in
+    points), drawings within gap of each other being one cluster. Rectangles (table cells, frames)
+    are left out. The drawings are painted onto a one pixel per point mask, grown by gap, and the
+    clusters are its connected components.
+    """
+    width, height = int(np.ceil(page.rect.width)), int(np.ceil(page.rect.height))
+    mask = np.zeros((height + 1, width + 1), dtype=np.uint8)
+    drawing_rects = []
+    for drawing in page.get_cdrawings():
+        num_path_segments = sum(item[0] in ('l', 'c') for item in drawing['items'])
+        if not num_path_segments:
+            continue
+        x0, y0, x1, y1 = drawing['rect']
+        x0, y0 = max(0, int(x0 - gap/2)), max(0, int(y0 - gap/2))
+        x1, y1 = min(width, int(np.ceil(x1 + gap/2))), min(height, int(np.ceil(y1 + gap/2)))
+        if x1 < x0 or y1 < y0:
+            continue
+        mask[y0:y1 + 1, x0:x1 + 1] = 1
+        drawing_rects.append(((x0, y0), num_path_segments))
+    if not drawing_rects:
+        return []
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    num_segments_by_label = np.zeros(num_labels, dtype=int)
+    for (x0, y0), num_path_segments in drawing_rects:
+        num_segments_by_label[labels[y0, x0]] += num_path_segments
+    return [(pymupdf.Rect(x + gap/2, y + gap/2, x + w - gap/2, y + h - gap/2), int(num_segments_by_label[label]))
+            for label, (x, y, w, h, _) in enumerate(stats) if label and num_segments_by_label[label]]
+
+
+def merge_overlapping(rects):
+    """The rects, those that overlap merged into their union, until none overlap."""
+    rects = [pymupdf.Rect(rect) for rect in rects]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                if rects[i].intersects(rects[j]):
+                    rects[i] |= rects.pop(j)
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+def get_region_proposals(pdf_document, page_num, min_path_segments=MIN_PATH_SEGMENTS, max_path_segments=MAX_PROPOSAL_SEGMENTS):
+    """
+    The candidate structure regions of a page (rects in points, sorted top to bottom), from the
+    clusters of its vector drawings with at least min_path_segments lines and curves, with
+    PROPOSAL_MARGIN around them. None when the page is to be detected as a whole: it shows
+    images, draws more than max_path_segments segments or a cluster larger than
+    MAX_PROPOSAL_FRACTION of the page (spectra, plots), or has no cluster to propose.
+    """
+    page = pdf_document[page_num]
+    if page.rotation or page.get_images(full=True):
+        return None
+    if count_page_path_segments(pdf_document, page, max_path_segments + 1) > max_path_segments:
+        return None
+    proposals = []
+    for rect, num_path_segments in get_drawing_clusters(page):
+        if rect.width * rect.height > MAX_PROPOSAL_FRACTION * page.rect.width * page.rect.height:
+            return None
+        if num_path_segments >= min_path_segments:
+            proposals.append((rect + (-PROPOSAL_MARGIN, -PROPOSAL_MARGIN, PROPOSAL_MARGIN, PROPOSAL_MARGIN)) & page.rect)
+    proposals = merge_overlapping(proposals)
+    return sorted(proposals, key=lambda rect: (rect.y0, rect.x0)) or None
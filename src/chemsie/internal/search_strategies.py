@@ -0,0 +1,171 @@
+from math import ceil
+
+
+class SearchResult:
+    """Outcome of a sweep search: the chosen option and how much of the grid it took to find it."""
+    def __init__(self, strategy, best_option, best_result, num_evaluated, evaluation_cost, num_options):
+        self.strategy = strategy
+        self.best_option = best_option
+        self.best_result = best_result
+        self.num_evaluated = num_evaluated
+        self.evaluation_cost = evaluation_cost
+        self.num_options = num_options
+
+    def __repr__(self):
+        return (f'SearchResult - strategy: {self.strategy}, best option: {self.best_option}, matched segments: {self.best_result}, '
+                f'evaluated: {self.num_evaluated}/{self.num_options}, cost: {round(self.evaluation_cost, 2)}')
+
+
+class BudgetTracker:
+    """Counts option evaluations against a budget given in full-document evaluations."""
+    def __init__(self, document_sweep, mol_pic_clusters, eval_budget=None):
+        self.document_sweep = document_sweep
+        self.mol_pic_clusters = mol_pic_clusters
+        self.eval_budget = eval_budget
+        self.max_result = len(mol_pic_clusters) if mol_pic_clusters else None
+        self.num_evaluated = 0
+        self.cost = 0.0
+        self.results = dict() # option index -> number of matched segments (full document)
+
+    def remaining(self):
+        if self.eval_budget is None:
+            return float('inf')
+        return self.eval_budget - self.cost
+
+    def can_afford(self, num_options, line_fraction=1.0):
+        return num_options*line_fraction <= self.remaining() + 1e-9
+
+    def evaluate(self, optimize_options, option_indices, line_fraction=1.0):
+        """Evaluates the requested options (skipping known full-document results) within the budget."""
+        if line_fraction>=1.0:
+            option_indices = [option_idx for option_idx in option_indices if option_idx not in self.results]
+        affordable = int((self.remaining() + 1e-9)//line_fraction) if self.eval_budget is not None else len(option_indices)
+        option_indices = option_indices[:max(affordable, 0)]
+        if not option_indices:
+            return dict()
+        results = self.document_sweep.evaluate_options([optimize_options[option_idx] for option_idx in option_indices],
+                                                       self.mol_pic_clusters, line_fraction)
+        self.num_evaluated += len(option_indices)
+        self.cost += len(option_indices)*min(line_fraction, 1.0)
+        evaluated = dict(zip(option_indices, results))
+        if line_fraction>=1.0:
+            self.results.update(evaluated)
+        return evaluated
+
+    def get_best(self):
+        """Best full-document result so far; ties go to the earlier option, as in the exhaustive sweep."""
+        best_idx, best_result = None, -1
+        for option_idx in sorted(self.results):
+            if self.results[option_idx]>best_result:
+                best_idx, best_result = option_idx, self.results[option_idx]
+        return best_idx, best_result
+
+    def is_saturated(self):
+        # every picture cluster is already matched, no option can do better
+        _, best_result = self.get_best()
+        return self.max_result is not None and best_result>=self.max_result
+
+
+def get_start_idx(optimize_options, start_option=None):
+    if start_option is not None:
+        for option_idx, opt_option in enumerate(optimize_options):
+            if opt_option.get('tokens')==start_option.get('tokens') and opt_option.get('spaces')==start_option.get('spaces'):
+                return option_idx
+        distances = [abs(opt_option.get('tokens')-start_option.get('tokens')) + abs(opt_option.get('spaces')-start_option.get('spaces'))
+                     for opt_option in optimize_options]
+        return distances.index(min(distances))
+    tokens_values = sorted({opt_option.get('tokens') for opt_option in optimize_options})
+    spaces_values = sorted({opt_option.get('spaces') for opt_option in optimize_options})
+    center = {'tokens': tokens_values[len(tokens_values)//2], 'spaces': spaces_values[len(spaces_values)//2]}
+    return get_start_idx(optimize_options, center)
+
+def grid_search(tracker, optimize_options, start_option=None, **kwargs):
+    """Exhaustive sweep in option order (stops early only if the budget runs out or every cluster is matched)."""
+    for option_idx in range(len(optimize_options)):
+        if tracker.is_saturated() or not tracker.can_afford(1):
+            break
+        tracker.evaluate(optimize_options, [option_idx])
+    return tracker.get_best()
+
+def plateau_search(tracker, optimize_options, start_option=None, patience=8, **kwargs):
+    """Walks the options outward from the start option and stops once the best count stops improving."""
+    start = optimize_options[get_start_idx(optimize_options, start_option)]
+    option_order = sorted(range(len(optimize_options)), key=lambda option_idx: (
+        abs(optimize_options[option_idx].get('tokens')-start.get('tokens')) + abs(optimize_options[option_idx].get('spaces')-start.get('spaces')),
+        option_idx))
+    since_improvement = 0
+    for option_idx in option_order:
+        if tracker.is_saturated() or not tracker.can_afford(1) or since_improvement>=patience:
+            break
+        _, previous_best = tracker.get_best()
+        evaluated = tracker.evaluate(optimize_options, [option_idx])
+        since_improvement = 0 if evaluated.get(option_idx, -1)>previous_best else since_improvement + 1
+    return tracker.get_best()
+
+def coordinate_descent_search(tracker, optimize_options, start_option=None, max_cycles=5, **kwargs):
+    """Alternately sweeps the tokens and the spaces axis through the current best option."""
+    current_idx = get_start_idx(optimize_options, start_option)
+    tracker.evaluate(optimize_options, [current_idx])
+    if current_idx not in tracker.results: # a budget of less than one evaluation
+        return tracker.get_best()
+    for _ in range(max_cycles):
+        moved = False
+        for fixed_axis in ('spaces', 'tokens'): # move along tokens first, then along spaces
+            if tracker.is_saturated() or not tracker.can_afford(1):
+                return tracker.get_best()
+            fixed_value = optimize_options[current_idx].get(fixed_axis)
+            line_indices = [option_idx for option_idx, opt_option in enumerate(optimize_options) if opt_option.get(fixed_axis)==fixed_value]
+            tracker.evaluate(optimize_options, line_indices)
+            line_results = [(option_idx, tracker.results[option_idx]) for option_idx in line_indices if option_idx in tracker.results]
+            best_line_idx, best_line_result = max(line_results, key=lambda x: (x[1], -x[0]))
+            if best_line_result>tracker.results[current_idx]:
+                current_idx = best_line_idx
+                moved = True
+        if not moved:
+            break
+    return tracker.get_best()
+
+def successive_halving_search(tracker, optimize_options, start_option=None, reduction_factor=3, **kwargs):
+    """
+    Scores all options on a short part of the document, keeps the best 1/reduction_factor and
+    re-scores them on a reduction_factor times longer part, until the survivors run on the full document.
+    """
+    candidates = list(range(len(optimize_options)))
+    num_rungs = 1
+    while reduction_factor**num_rungs<len(candidates):
+        num_rungs += 1
+    for rung in range(num_rungs):
+        line_fraction = min(1.0, reduction_factor**(rung - num_rungs + 1))
+        if not tracker.can_afford(len(candidates), line_fraction):
+            if rung==0:
+                candidates = candidates[:max(1, int(tracker.remaining()//line_fraction))]
+            else:
+                break
+        evaluated = tracker.evaluate(optimize_options, candidates, line_fraction)
+        if line_fraction>=1.0:
+            break
+        ranked = sorted(candidates, key=lambda option_idx: (-evaluated.get(option_idx, -1), option_idx))
+        candidates = ranked[:max(1, ceil(len(ranked)/reduction_factor))]
+    # make sure the survivors have a full-document result
+    if tracker.can_afford(len(candidates)):
+        tracker.evaluate(optimize_options, candidates)
+    elif not tracker.results:
+        tracker.evaluate(optimize_options, candidates[:1])
+    return tracker.get_best()
+
+
+SEARCH_STRATEGIES = {'grid': grid_search,
+                     'plateau': plateau_search,
+                     'coordinate_descent': coordinate_descent_search,
+                     'successive_halving': successive_halving_search,
+                     }
+WARM_START_STRATEGIES = {'plateau', 'coordinate_descent'} # the strategies that begin their walk at start_option
+
+def run_search_strategy(document_sweep, mol_pic_clusters, optimize_options, search_strategy='grid', eval_budget=None, start_option=None, **strategy_kwargs):
+    if search_strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f'Unknown search strategy: {search_strategy}, choose from {list(SEARCH_STRATEGIES)}')
+    tracker = BudgetTracker(document_sweep, mol_pic_clusters, eval_budget)
+    best_idx, best_result = SEARCH_STRATEGIES[search_strategy](tracker, optimize_options, start_option=start_option, **strategy_kwargs)
+    # Fallback to first option if nothing was evaluated
+    best_option = optimize_options[best_idx] if best_idx is not None else optimize_options[0]
+    return SearchResult(search_strategy, best_option, best_result, tracker.num_evaluated, tracker.cost, len(optimize_options))
@@ -1,6 +1,7 @@
 from math import floor, ceil
 from .sequences2segments import count_occurences, search_molecule_segment_for_text_lines, process_all_test_list, get_molecule_segments_statsitics, assign_molecule_segment_size # , assign_molecule_segment_name
 from .molecule_segment_obj import MoleculeSegment
+from .text_processing.document_lines import join_lines
 
 def get_problematic_molecule_segment_idx_list(molecule_segments):
     incomplete_molecule_segments_idx_list, zero_size_molecule_segments_idx_list = [], []
@@ -61,13 +62,11 @@ def locate_molecule_segment_to_be_merged(molecule_segments, common_sequence, ire
         final_dict = dict()
     return final_dict
 
-def merge_segments(molecule_segments, idx_tuple):
-    new_segment_lines = []
-    for inner_idx in idx_tuple:
-        new_segment_lines += molecule_segments[inner_idx].segment_lines
+def merge_segments(molecule_segments, idx_tuple, segment_cache=None):
+    new_segment_lines = join_lines([molecule_segments[inner_idx].segment_lines for inner_idx in idx_tuple])
     new_molecule_segment = MoleculeSegment(new_segment_lines)
-    search_molecule_segment_for_text_lines(new_molecule_segment)
-    process_all_test_list(new_molecule_segment)   
+    search_molecule_segment_for_text_lines(new_molecule_segment, segment_cache)
+    process_all_test_list(new_molecule_segment, segment_cache)
     return new_molecule_segment
 
 def sort_molecule_segments(molecule_segments):
@@ -75,31 +74,31 @@ def sort_molecule_segments(molecule_segments):
     sort_2 = sorted(sort_1, key = lambda x: x.start_page)
     return sort_2
 
-def handle_incomplete_molecule_segments(incomplete_molecule_segments_dict, molecule_segments):
+def handle_incomplete_molecule_segments(incomplete_molecule_segments_dict, molecule_segments, segment_cache=None):
     new_molecule_segments = []
     if incomplete_molecule_segments_dict:
         for idx_tuple, common_count in incomplete_molecule_segments_dict.items():
             if common_count==1.0:
-                new_segment = merge_segments(molecule_segments, idx_tuple)
+                new_segment = merge_segments(molecule_segments, idx_tuple, segment_cache)
                 new_molecule_segments.append(new_segment)
     return new_molecule_segments    
 
-def handle_size_molecule_segments(zero_size_molecule_segments_idx_list, molecule_segments):
+def handle_size_molecule_segments(zero_size_molecule_segments_idx_list, molecule_segments, segment_cache=None):
     new_molecule_segments = []
     zero_size_molecule_segments_indices_list = merge_adjcent_numbers(zero_size_molecule_segments_idx_list)
     for idx_list in zero_size_molecule_segments_indices_list:
         if idx_list[-1]<len(molecule_segments)-1:
             full_idx_list = idx_list + [idx_list[-1]+1]
-            new_segment = merge_segments(molecule_segments, full_idx_list)
+            new_segment = merge_segments(molecule_segments, full_idx_list, segment_cache)
             new_molecule_segments.append(new_segment)
         elif len(idx_list)>1:
-            new_segment = merge_segments(molecule_segments, idx_list)
+            new_segment = merge_segments(molecule_segments, idx_list, segment_cache)
             new_molecule_segments.append(new_segment)
         else:
             new_molecule_segments.append(molecule_segments[full_idx_list[0]])
     return new_molecule_segments
 
-def adjust_molecule_segments_by_common_sequence(molecule_segments):
+def adjust_molecule_segments_by_common_sequence(molecule_segments, segment_cache=None):
     mean_number_of_tests, sequence_counter = get_molecule_segments_statsitics(molecule_segments)
     if sequence_counter:
         most_common_sequence = sequence_counter.most_common(1)[0][0]
@@ -110,9 +109,9 @@ def adjust_molecule_segments_by_common_sequence(molecule_segments):
             for idx_tuple in incomplete_molecule_segments_dict.keys():
                 all_problematic_idx+=list(idx_tuple)
             new_molecule_segments = [molecule_segments[segment_idx] for segment_idx in range(len(molecule_segments)) if segment_idx not in all_problematic_idx]
-            new_molecule_segments.extend(handle_incomplete_molecule_segments(incomplete_molecule_segments_dict, molecule_segments))
+            new_molecule_segments.extend(handle_incomplete_molecule_segments(incomplete_molecule_segments_dict, molecule_segments, segment_cache))
             if zero_size_molecule_segments_idx_list:
-                new_molecule_segments.extend(handle_size_molecule_segments(zero_size_molecule_segments_idx_list, molecule_segments))
+                new_molecule_segments.extend(handle_size_molecule_segments(zero_size_molecule_segments_idx_list, molecule_segments, segment_cache))
             new_molecule_segments = sort_molecule_segments(new_molecule_segments)
         else:
             new_molecule_segments = molecule_segments
@@ -0,0 +1,56 @@
+from collections import Counter
+
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+
+
+class SegmentCache:
+    """
+    Per-document cache of test-line results, keyed by the line range of a molecule segment.
+    Sweep options that cut the document at the same boundary lines rebuild identical
+    segments; the cache lets them (and the final re-run) reuse the Spectra and
+    TestTextSequence objects found the first time.
+    An optional DocumentTestLineScanner of the document gives the test lines of segments not seen before.
+    """
+    def __init__(self, test_line_scanner=None):
+        self.test_line_scanner = test_line_scanner
+        self.spectra_cache = dict()
+        self.sequences_cache = dict()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def __repr__(self):
+        return f'SegmentCache - {self.get_stats()}'
+
+    @staticmethod
+    def get_segment_key(segment_lines):
+        if isinstance(segment_lines, DocumentLines):
+            return segment_lines.get_segment_key()
+        return tuple(multi_idx for multi_idx, *_ in segment_lines)
+
+    def _lookup(self, cache, kind, key):
+        if key in cache:
+            self.hits[kind] += 1
+            return cache[key]
+        self.misses[kind] += 1
+        return None
+
+    def get_spectra(self, segment_lines):
+        return self._lookup(self.spectra_cache, 'spectra', self.get_segment_key(segment_lines))
+
+    def store_spectra(self, segment_lines, spectra):
+        self.spectra_cache[self.get_segment_key(segment_lines)] = spectra
+
+    def get_test_text_sequences(self, segment_lines, num_spectra):
+        # the spectra count is part of the key, merged segments are searched twice and carry duplicates
+        return self._lookup(self.sequences_cache, 'sequences', (self.get_segment_key(segment_lines), num_spectra))
+
+    def store_test_text_sequences(self, segment_lines, num_spectra, test_text_sequences):
+        self.sequences_cache[(self.get_segment_key(segment_lines), num_spectra)] = test_text_sequences
+
+    def get_stats(self):
+        stats = dict()
+        for kind in ('spectra', 'sequences'):
+            hits, misses = self.hits[kind], self.misses[kind]
+            lookups = hits + misses
+            stats[kind] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits/lookups, 3) if lookups else 0.0}
+        return stats
@@ -2,22 +2,30 @@ import numpy as np
 import logging
 
 from .molecule_segment_obj import MoleculeSegment
-from src.chemsie.internal.tokenizer.molecule_name import get_molecule_name_probability
+from .text_processing.document_lines import DocumentLines
+from src.chemsie.internal.tokenizer.molecule_name import get_molecule_name_probability, get_molecule_name_scorer
 
 logger = logging.getLogger(__name__)
 
 def get_line_statistics(page_lines_with_multi_idx, token_patterns=None, debugging=False):
-    tokens_percentages, num_of_spaces_list, suspected_lines = [], [], []
-    for actual_idx, (_, line_text, _) in enumerate(page_lines_with_multi_idx):
+    num_of_spaces_list, suspected_lines, suspected_texts = [], [], []
+    if isinstance(page_lines_with_multi_idx, DocumentLines):
+        line_texts = page_lines_with_multi_idx.get_texts()
+    else:
+        line_texts = [line_text for _, line_text, _ in page_lines_with_multi_idx]
+    for actual_idx, line_text in enumerate(line_texts):
         edited_line_text = line_text.replace('Experimental','').replace('experimental', '').replace('10.09.08.07.06.05.04.03.02.01.00.0-1.0', '')
         len_line = len(edited_line_text.replace(' ', ''))
         num_of_spaces = edited_line_text.count(' ')
         if len_line>10:
             if not line_text.startswith('Rf') and not line_text.startswith('mp'):
-                line_molecule_name_probability = get_molecule_name_probability(edited_line_text, token_patterns)
-                tokens_percentages.append(line_molecule_name_probability)
+                suspected_texts.append(edited_line_text)
                 num_of_spaces_list.append(num_of_spaces)
                 suspected_lines.append(actual_idx)
+    if debugging:
+        tokens_percentages = [get_molecule_name_probability(line_text, token_patterns, debugging) for line_text in suspected_texts]
+    else:
+        tokens_percentages = get_molecule_name_scorer(token_patterns).score_lines(suspected_texts)
     return tokens_percentages, num_of_spaces_list, suspected_lines
 
 def get_lines_based_on_percentile(tokens_percentages, num_of_spaces_list, suspected_lines, tokens_mark=80, spaces_mark=35):
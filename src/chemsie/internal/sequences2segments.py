@@ -1,8 +1,8 @@
 import numpy as np
 from collections import Counter
 from math import ceil
-from src.chemsie.internal.test_text_line import extract_test_text_lines
-from src.chemsie.utils.general import get_actual_idx_from_multi_idx
+from src.chemsie.internal.test_text_line import extract_test_text_lines, load_default_test_names
+from src.chemsie.utils.general import get_actual_idx_from_multi_idx, LineIndex
 from src.chemsie.internal.test_text_sequence import sort_test_lines_to_sequences
 from .molecule_segment_obj import MoleculeSegment, Spectra
 from .segments_creation import locate_molecule_segments
@@ -12,12 +12,24 @@ def sort_test_list(test_list):
     second_sort = sorted(first_sort, key=lambda x: x.start_page)
     return second_sort
 
-def search_molecule_segment_for_text_lines(molecule_segment):
-    test_names = {'NMR': [r'NMR'], 'IR': [r'IR'], 'Rf': [r'Rf'], 'HRMS': [r'HRMS']}
-    for test_type, test_patterns in test_names.items():
-        text_lines = extract_test_text_lines(molecule_segment.segment_lines, test_names=test_patterns)
-        if text_lines:
-            molecule_segment.spectra.append(Spectra(test_type, text_lines))
+def search_molecule_segment_for_text_lines(molecule_segment, segment_cache=None):
+    if segment_cache is not None:
+        cached_spectra = segment_cache.get_spectra(molecule_segment.segment_lines)
+        if cached_spectra is not None:
+            molecule_segment.spectra.extend(Spectra(spectrum.type, spectrum.text_lines) for spectrum in cached_spectra)
+            return
+    test_line_scanner = segment_cache.test_line_scanner if segment_cache is not None else None
+    if test_line_scanner is not None and test_line_scanner.covers(molecule_segment.segment_lines):
+        found_spectra = [Spectra(test_type, text_lines) for test_type, text_lines in test_line_scanner.get_segment_test_lines(molecule_segment.segment_lines)]
+    else:
+        found_spectra = []
+        for test_type, test_patterns in load_default_test_names().items():
+            text_lines = extract_test_text_lines(molecule_segment.segment_lines, test_names=test_patterns)
+            if text_lines:
+                found_spectra.append(Spectra(test_type, text_lines))
+    molecule_segment.spectra.extend(found_spectra)
+    if segment_cache is not None:
+        segment_cache.store_spectra(molecule_segment.segment_lines, found_spectra)
 
 def get_all_test_list(molecule_segment):
     all_tests = []
@@ -57,24 +69,30 @@ def assign_molecule_segment_size(molecule_segments, common_sequence):
             molecule_segment.max_molecule_count = 0
             molecule_segment.min_molecule_count = 0
 
-def process_all_test_list(molecule_segment):
-    search_molecule_segment_for_text_lines(molecule_segment)
+def process_all_test_list(molecule_segment, segment_cache=None):
+    search_molecule_segment_for_text_lines(molecule_segment, segment_cache)
+    if segment_cache is not None:
+        cached_sequences = segment_cache.get_test_text_sequences(molecule_segment.segment_lines, len(molecule_segment.spectra))
+        if cached_sequences is not None:
+            return list(cached_sequences)
     all_test_list = get_all_test_list(molecule_segment)
     sorted_test_list = sort_test_list(all_test_list)
     if sorted_test_list:
-        multi_idx_list = [item[0] for item in molecule_segment.segment_lines] 
-        test_text_sequence_list = sort_test_lines_to_sequences(sorted_test_list, multi_idx_list)
+        test_text_sequence_list = sort_test_lines_to_sequences(sorted_test_list, LineIndex(molecule_segment.segment_lines))
     else:
         test_text_sequence_list = []
-    return test_text_sequence_list
+    if segment_cache is not None:
+        segment_cache.store_test_text_sequences(molecule_segment.segment_lines, len(molecule_segment.spectra), test_text_sequence_list)
+    return list(test_text_sequence_list)
 
-def spilt_molecule_segment_by_test_sequences(molecule_segment, test_text_sequences):
+def spilt_molecule_segment_by_test_sequences(molecule_segment, test_text_sequences, segment_cache=None):
     segment_lines = molecule_segment.segment_lines
+    line_index = LineIndex(segment_lines)
     last_idx = False
     new_molecule_segments = []
     for test_text_sequence in test_text_sequences:
         end_multi_idx = test_text_sequence.end_multi_idx
-        actual_end_idx = get_actual_idx_from_multi_idx(segment_lines, end_multi_idx)
+        actual_end_idx = get_actual_idx_from_multi_idx(line_index, end_multi_idx)
         if last_idx:
             reducted_lines = segment_lines[last_idx:actual_end_idx]
         else:
@@ -82,7 +100,7 @@ def spilt_molecule_segment_by_test_sequences(molecule_segment, test_text_sequenc
         last_idx = actual_end_idx
         if reducted_lines:
             new_molecule_segment = MoleculeSegment(reducted_lines)
-            search_molecule_segment_for_text_lines(new_molecule_segment)
+            search_molecule_segment_for_text_lines(new_molecule_segment, segment_cache)
             new_molecule_segment.has_test_text_sequence = True
             new_molecule_segment.test_text_sequence = test_text_sequence
             new_molecule_segments.append(new_molecule_segment)
@@ -170,9 +188,9 @@ def smooth_bbox_molecule_segments(molecule_segments):
                 new_test_text_lines.append(new_test_line)
         molecule_segment.test_text_sequence.test_text_lines = new_test_text_lines
 
-def process_molecule_segment_text(molecule_segments, cut_init_segments=False):
+def process_molecule_segment_text(molecule_segments, cut_init_segments=False, segment_cache=None):
     edited_molecule_segments = molecule_segments
-    test_text_sequence_list = [process_all_test_list(molecule_segment) for molecule_segment in edited_molecule_segments]
+    test_text_sequence_list = [process_all_test_list(molecule_segment, segment_cache) for molecule_segment in edited_molecule_segments]
     final_molecule_segments = []
     for test_text_sequences, molecule_segment in zip(test_text_sequence_list, edited_molecule_segments):
         if len(test_text_sequences)==1:
@@ -180,7 +198,7 @@ def process_molecule_segment_text(molecule_segments, cut_init_segments=False):
             molecule_segment.test_text_sequence = test_text_sequences[0]
             final_molecule_segments.append(molecule_segment)
         elif len(test_text_sequences)>1:
-            new_molecule_segments = spilt_molecule_segment_by_test_sequences(molecule_segment, test_text_sequences)
+            new_molecule_segments = spilt_molecule_segment_by_test_sequences(molecule_segment, test_text_sequences, segment_cache)
             final_molecule_segments+=new_molecule_segments
         else:
             final_molecule_segments.append(molecule_segment)
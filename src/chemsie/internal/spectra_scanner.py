@@ -0,0 +1,102 @@
+from bisect import bisect_left
+
+from src.chemsie.internal.text_processing.document_lines import DocumentLines, as_document_lines
+from src.chemsie.internal.text_cleaning.normalizer import get_text_normalizer
+from src.chemsie.internal.test_text_line import (load_default_test_names, extract_test_line_from_segmented_lines,
+                                                 get_final_test_lines, apply_nmr_hotfix)
+
+# the window around a test line, as in segment_text_by_multi_idx
+PAD_BEFORE, PAD_AFTER = -1, 20
+
+
+class DocumentTestLineScanner:
+    """
+    Finds the test-name lines (NMR, IR, Rf, HRMS) of a whole document in one pass, so segments
+    look their test lines up by line range instead of rescanning their lines per test type.
+
+    A segment gets exactly what extract_test_text_lines would give on its lines: the test text
+    window of every hit is cut at the segment bounds as before, and each distinct window is
+    extracted once and shared by every segment (and split or merged segment) that contains it.
+    """
+    def __init__(self, document_lines, test_names=None, text_enders=None, clean_patterns=None, replacement_patterns=None, replacement_dict=None):
+        self.document_lines = as_document_lines(document_lines)
+        self.test_names = load_default_test_names(test_names)
+        self.text_enders = text_enders
+        self.clean_patterns = clean_patterns
+        self.replacement_patterns, self.replacement_dict = replacement_patterns, replacement_dict
+        self.text_normalizer = get_text_normalizer(clean_patterns, replacement_patterns, replacement_dict, text_enders)
+        self.hits = self.scan()
+        self.window_results = dict() # (test type, window start, window end) -> final test lines of the window
+        self.num_lookups = 0
+
+    def __repr__(self):
+        num_hits = {test_type: sum(map(len, name_hits)) for test_type, name_hits in self.hits.items()}
+        return f'DocumentTestLineScanner - hits: {num_hits}, windows: {len(self.window_results)}, lookups: {self.num_lookups}'
+
+    def scan(self):
+        """Document positions of the lines containing every test name, per test type, in line order."""
+        hits = {test_type: [[] for _ in test_patterns] for test_type, test_patterns in self.test_names.items()}
+        checks = [(test_name, hits[test_type][name_idx]) for test_type, test_patterns in self.test_names.items()
+                  for name_idx, test_name in enumerate(test_patterns)]
+        for position, line_text in enumerate(self.document_lines.get_texts()):
+            for test_name, positions in checks:
+                if test_name in line_text:
+                    positions.append(position)
+        return hits
+
+    def covers(self, segment_lines):
+        return isinstance(segment_lines, DocumentLines) and self.document_lines.is_same_document(segment_lines)
+
+    def get_window_test_lines(self, test_type, window_start, window_end):
+        window_key = (test_type, window_start, window_end)
+        if window_key not in self.window_results:
+            segmented_lines = self.document_lines[window_start:window_end]
+            test_line = extract_test_line_from_segmented_lines(segmented_lines, self.test_names[test_type], self.text_enders, self.clean_patterns,
+                                                               self.replacement_patterns, self.replacement_dict, self.text_normalizer)
+            self.window_results[window_key] = get_final_test_lines([test_line] if test_line else [])
+        return self.window_results[window_key]
+
+    def get_test_text_lines(self, test_type, start, end):
+        """extract_test_text_lines(document_lines[start:end], test_names[test_type]) from the scanned hits."""
+        self.num_lookups += 1
+        hit_positions = dict()
+        test_lines = []
+        for positions in self.hits[test_type]:
+            for position in positions[bisect_left(positions, start):bisect_left(positions, end)]:
+                multi_idx = self.document_lines.get_multi_idx_at(position)
+                hit_positions[multi_idx] = position
+                test_lines.append(multi_idx)
+        final_lines = []
+        window = None
+        # same (set) order of the test lines as extract_test_text_lines, the NMR hotfix depends on it
+        for multi_idx in list(set(test_lines)):
+            position = hit_positions[multi_idx]
+            window = (max(position + PAD_BEFORE, start), min(position + PAD_AFTER, end))
+            final_lines += self.get_window_test_lines(test_type, *window)
+        if final_lines:
+            final_lines = apply_nmr_hotfix(final_lines, self.document_lines[window[0]:window[1]])
+        return final_lines
+
+    def get_segment_test_lines(self, segment_lines):
+        """(test type, test lines) of every test type found in a segment that is a view of the scanned document."""
+        found_test_lines = []
+        for test_type in self.test_names:
+            text_lines = self.get_test_text_lines(test_type, segment_lines.start, segment_lines.stop)
+            if text_lines:
+                found_test_lines.append((test_type, text_lines))
+        return found_test_lines
+
+    def get_test_pages(self):
+        """The pages (sorted) holding a line with a test name, as found by the scan."""
+        positions = [position for name_hits in self.hits.values() for hit_positions in name_hits for position in hit_positions]
+        return sorted(set(self.document_lines.pages[positions].tolist()))
+
+    def get_test_line_counts(self):
+        """{page_num: {test_type: number of lines with one of its test names}} of the pages with a test line."""
+        test_line_counts = dict()
+        for test_type, name_hits in self.hits.items():
+            positions = sorted({position for hit_positions in name_hits for position in hit_positions})
+            for page_num in self.document_lines.pages[positions].tolist():
+                page_counts = test_line_counts.setdefault(page_num, dict())
+                page_counts[test_type] = page_counts.get(test_type, 0) + 1
+        return test_line_counts
@@ -1,8 +1,9 @@
+from bisect import bisect_left
 from collections import defaultdict
-from src.chemsie.utils.general import get_page_num_and_line_num_from_multi_idx, get_actual_idx_from_multi_idx
-from src.chemsie.internal.text_cleaning.clean_patterns import clean_text_by_tokens, load_default_clean_tokens
-from src.chemsie.internal.text_cleaning.replacement import replace_text_by_tokens, load_default_replacement_tokens
+from src.chemsie.utils.general import get_page_num_and_line_num_from_multi_idx, get_actual_idx_from_multi_idx, LineIndex
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
 from src.chemsie.internal.text_cleaning.test_enders import cut_text_by_enders, load_default_end_tokens
+from src.chemsie.internal.text_cleaning.normalizer import get_text_normalizer
 
 class TestTextLine:
     def __init__(self, start_multi_idx, end_multi_idx, bbox_list, test_type, text):
@@ -21,16 +22,19 @@ class TestTextLine:
         return f'Starting page: {self.start_page}, Starting line: {self.start_line}, Ending page: {self.end_page}, Ending line: {self.end_line}, Test type: {self.test_type}, Text: {self.text}'
 
 def get_word_line_idx(enumerated_lines, word):
+    if isinstance(enumerated_lines, DocumentLines):
+        return enumerated_lines.find_lines_containing(word)
     word_line_idx = []
     for line_idx, line, _ in enumerated_lines:
         if word in line:
             word_line_idx.append(line_idx)
     return word_line_idx
 
-def segment_text_by_multi_idx(pdf_lines_with_idx, requested_multi_idx, pad_before=-1, pad_after=20):
+def segment_text_by_multi_idx(pdf_lines_with_idx, requested_multi_idx, pad_before=-1, pad_after=20, line_index=None):
     segmented_text = []
-    multi_idx_list = [multi_idx for multi_idx, *_ in pdf_lines_with_idx]
-    requested_actual_idx = get_actual_idx_from_multi_idx(multi_idx_list, requested_multi_idx)
+    if line_index is None:
+        line_index = LineIndex(pdf_lines_with_idx)
+    requested_actual_idx = get_actual_idx_from_multi_idx(line_index, requested_multi_idx)
     segmented_text = pdf_lines_with_idx[max(requested_actual_idx+pad_before, 0):min(requested_actual_idx+pad_after, len(pdf_lines_with_idx))]
     return segmented_text
 
@@ -52,15 +56,19 @@ def check_termination_by_another_test(text, test_name):
     reducted_text = text[:text_end]
     return reducted_text
 
-def extract_test_text_from_text(text, text_enders, test_names):
-    text_enders = load_default_end_tokens(text_enders)
-    for test_name in test_names:
-        if test_name in text_enders:
-            text_enders.remove(test_name)
+def extract_test_text_from_text(text, text_enders, test_names, text_normalizer=None):
+    if text_normalizer is None:
+        text_enders = load_default_end_tokens(text_enders)
+        for test_name in test_names:
+            if test_name in text_enders:
+                text_enders.remove(test_name)
     edited_text = text
     for test_name in test_names:
         edited_text = check_termination_by_another_test(edited_text, test_name=test_name)
-    edited_text = cut_text_by_enders(edited_text, text_enders)
+    if text_normalizer is None:
+        edited_text = cut_text_by_enders(edited_text, text_enders)
+    else:
+        edited_text = text_normalizer.cut_by_enders(edited_text, test_names)
     edited_text = segment_text_by_its_end(edited_text)
     return edited_text    
 
@@ -76,24 +84,58 @@ def segment_text_by_its_end(text):
     else:
         return final_text
 
+class TextTracker:
+    """
+    Maps a piece of the concatenated text of some lines back to the line it ends on.
+
+    Keeps the cumulative end offset of every line instead of a copy of every prefix: the first
+    prefix that contains a text is the one reaching the end of its first occurrence, found by bisect.
+    """
+    def __init__(self, full_text, multi_idx_list, text_ends):
+        self.full_text = full_text
+        self.multi_idx_list = multi_idx_list
+        self.text_ends = text_ends
+
+    def __len__(self):
+        return len(self.multi_idx_list)
+
+    def __repr__(self):
+        return f'TextTracker - lines: {len(self)}, text length: {len(self.full_text)}'
+
+    def find_end_multi_idx(self, reduced_text):
+        """multi_idx of the first line whose prefix contains reduced_text, or None."""
+        location = self.full_text.find(reduced_text)
+        if location<0:
+            return None
+        line_idx = bisect_left(self.text_ends, location + len(reduced_text))
+        return self.multi_idx_list[line_idx] if line_idx<len(self) else None
+
 def concatenate_and_track(segmented_lines):
-    full_text = ''
-    text_tracker = []
+    if isinstance(segmented_lines, DocumentLines):
+        full_text = segmented_lines.get_text()
+        return full_text, TextTracker(full_text, segmented_lines.get_multi_idx_list(), segmented_lines.get_text_ends())
+    line_texts = []
+    multi_idx_list = []
+    text_ends = []
+    text_end = 0
     for multi_idx, line_text, _ in segmented_lines:
-        full_text += line_text
-        text_tracker.append((multi_idx, full_text))
-    return full_text, text_tracker
+        line_texts.append(line_text)
+        multi_idx_list.append(multi_idx)
+        text_end += len(line_text)
+        text_ends.append(text_end)
+    full_text = ''.join(line_texts)
+    return full_text, TextTracker(full_text, multi_idx_list, text_ends)
 
 def find_end_index_in_tracker(reduced_text, text_tracker):
-    for multi_idx, text in text_tracker:
-        if reduced_text in text:
-            return multi_idx
-    return None
-
-def get_text_bbox_list(segmented_lines, start_multi_idx, end_multi_idx):
-    multi_idx_list = [multi_idx for multi_idx, *_ in segmented_lines]
-    actual_start_idx = get_actual_idx_from_multi_idx(multi_idx_list, start_multi_idx)
-    actual_end_idx = get_actual_idx_from_multi_idx(multi_idx_list, end_multi_idx) 
+    return text_tracker.find_end_multi_idx(reduced_text)
+
+def get_text_bbox_list(segmented_lines, start_multi_idx, end_multi_idx, line_index=None):
+    if line_index is None:
+        line_index = LineIndex(segmented_lines)
+    actual_start_idx = get_actual_idx_from_multi_idx(line_index, start_multi_idx)
+    actual_end_idx = get_actual_idx_from_multi_idx(line_index, end_multi_idx)
+    if isinstance(segmented_lines, DocumentLines):
+        return segmented_lines[actual_start_idx:actual_end_idx].get_bbox_by_page()
     bbox_tracker = defaultdict(list)
     for multi_idx, text, bbox in segmented_lines[actual_start_idx:actual_end_idx]: # (y_0, x_0, y_1, x_1)
         page_num, _ = get_page_num_and_line_num_from_multi_idx(multi_idx)
@@ -124,25 +166,25 @@ def trim_left_junk(text):
         text = text[init_loc+1:]
     return text
 
-def extract_test_line_from_segmented_lines(segmented_lines, test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict):
+def extract_test_line_from_segmented_lines(segmented_lines, test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict, text_normalizer=None):
+    if text_normalizer is None:
+        text_normalizer = get_text_normalizer(clean_patterns, replacement_patterns, replacement_dict, text_enders)
 
     full_text, text_tracker = concatenate_and_track(segmented_lines) 
     start_multi_idx, start_location = find_test_start(full_text, segmented_lines, test_name=test_names[-1])
 
     if start_location is False:
         return False
-    edited_text = extract_test_text_from_text(full_text[start_location:], text_enders, test_names=test_names)
+    edited_text = extract_test_text_from_text(full_text[start_location:], text_enders, test_names=test_names, text_normalizer=text_normalizer)
 
     end_multi_idx = find_end_index_in_tracker(edited_text, text_tracker)
     bbox_list = get_text_bbox_list(segmented_lines, start_multi_idx, end_multi_idx)
-    edited_text = clean_text_by_tokens(edited_text, clean_patterns)
-
-    edited_text = replace_text_by_tokens(edited_text, replacement_patterns, replacement_dict)
+    edited_text = text_normalizer.normalize(edited_text)
 
     edited_text = trim_left_junk(edited_text)
  
     if edited_text.strip() == '' and len(segmented_lines)>1:
-        return extract_test_line_from_segmented_lines(segmented_lines[1:], test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict)
+        return extract_test_line_from_segmented_lines(segmented_lines[1:], test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict, text_normalizer)
     if 'spectrum' in edited_text or 'Spectra' in edited_text: # figure caption
         return False 
     if 'NMR' in test_names[-1]:
@@ -160,24 +202,19 @@ def extract_test_line_from_segmented_lines(segmented_lines, test_names, text_end
 
 ## BULID MORE False cases
 
-def extract_test_text_lines(pdf_text_with_idx, test_names, text_enders=None, clean_patterns=None, replacement_patterns=None, replacement_dict=None):
-    clean_patterns = load_default_clean_tokens(clean_patterns)
-    replacement_patterns, replacement_dict = load_default_replacement_tokens(replacement_patterns, replacement_dict)
-    test_lines = []
-    for test_name in test_names:
-        test_lines+=get_word_line_idx(pdf_text_with_idx, word=test_name)
-    test_lines = list(set(test_lines))
-    segemented_text = [segment_text_by_multi_idx(pdf_text_with_idx, test_line) for test_line in test_lines]
-    test_text_lines = []
-    for segmented_lines in segemented_text:
-        test_line = extract_test_line_from_segmented_lines(segmented_lines, test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict)
-        if test_line:
-            test_text_lines.append(test_line)
+def load_default_test_names(test_names=None):
+    if test_names is None:
+        test_names = {'NMR': [r'NMR'], 'IR': [r'IR'], 'Rf': [r'Rf'], 'HRMS': [r'HRMS']}
+    return test_names
+
+def get_final_test_lines(test_text_lines):
     final_lines = []
     for start_multi_idx, end_multi_idx, bbox_list, test_type, text in test_text_lines:
         if len(test_type.strip())>0 and len(text.strip())>0:
             final_lines.append(TestTextLine(start_multi_idx, end_multi_idx, bbox_list, test_type, text))
-    # NMR hot fix
+    return final_lines
+
+def apply_nmr_hotfix(final_lines, segmented_lines):
     all_test_types = [line.test_type for line in final_lines]
     if '13C NMR' in all_test_types and '1H NMR' not in all_test_types:
         possible_h_nmr_line = hotfix_h_nmr_line_capture(segmented_lines)
@@ -189,6 +226,23 @@ def extract_test_text_lines(pdf_text_with_idx, test_names, text_enders=None, cle
             final_lines.append(possible_c_nmr_line)
     return final_lines
 
+def extract_test_text_lines(pdf_text_with_idx, test_names, text_enders=None, clean_patterns=None, replacement_patterns=None, replacement_dict=None):
+    text_normalizer = get_text_normalizer(clean_patterns, replacement_patterns, replacement_dict, text_enders)
+    test_lines = []
+    for test_name in test_names:
+        test_lines+=get_word_line_idx(pdf_text_with_idx, word=test_name)
+    test_lines = list(set(test_lines))
+    line_index = LineIndex(pdf_text_with_idx)
+    segemented_text = [segment_text_by_multi_idx(pdf_text_with_idx, test_line, line_index=line_index) for test_line in test_lines]
+    test_text_lines = []
+    for segmented_lines in segemented_text:
+        test_line = extract_test_line_from_segmented_lines(segmented_lines, test_names, text_enders, clean_patterns, replacement_patterns, replacement_dict, text_normalizer)
+        if test_line:
+            test_text_lines.append(test_line)
+    final_lines = get_final_test_lines(test_text_lines)
+    # NMR hot fix, on the last window
+    return apply_nmr_hotfix(final_lines, segmented_lines) if final_lines else final_lines
+
 def hotfix_h_nmr_line_capture(segmented_lines):
     full_text, text_tracker = concatenate_and_track(segmented_lines)
     start_location = full_text.find('1H NMR')
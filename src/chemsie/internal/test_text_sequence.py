@@ -1,5 +1,5 @@
 import os
-from src.chemsie.utils.general import get_actual_idx_from_multi_idx
+from src.chemsie.utils.general import get_actual_idx_from_multi_idx, LineIndex
 from experiments.label_studio_wrappers.image_transformers import save_text_to_image
 class TestTextSequence:
     def __init__(self, test_text_lines):
@@ -22,6 +22,8 @@ def check_matching_of_lines(multi_idx_1, multi_idx_2, multi_idx_list, allowed_di
     return abs(actual_idx_1-actual_idx_2)<=allowed_diff
 
 def sort_test_lines_to_sequences(test_lines, multi_idx_list, allowed_diff=4):
+    if not isinstance(multi_idx_list, LineIndex):
+        multi_idx_list = LineIndex(multi_idx_list)
     sequences = []
     current_sequence = []   
     for idx, line in enumerate(test_lines):
@@ -0,0 +1,103 @@
+import re
+from functools import lru_cache
+
+from .clean_patterns import load_default_clean_tokens
+from .replacement import load_default_replacement_tokens
+from .test_enders import load_default_end_tokens
+
+
+def compile_named_alternation(token_patterns):
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_patterns))
+
+class TextNormalizer:
+    """
+    The clean, replacement and ender rule packs of the test texts, compiled once.
+
+    clean() and replace() give exactly what clean_text_by_tokens and replace_text_by_tokens give:
+    one scan of the text with the compiled alternation finds the matches, texts without any
+    (most of them) are returned as they are, and matches are then applied in the same order and
+    with the same replace-every-occurrence semantics. normalize() (clean, then replace) is memoised,
+    as the same test texts come back for every segmentation option of a document.
+    cut_by_enders() is cut_text_by_enders with the ender list (minus the test names) compiled once
+    per set of test names. The normalizer pickles as its rule packs, so it can be shared by a whole
+    batch and by workers.
+    """
+    def __init__(self, clean_patterns=None, replacement_patterns=None, replacement_dict=None, text_enders=None, cache_size=100000):
+        self.cache_size = cache_size
+        self.clean_patterns = load_default_clean_tokens(clean_patterns)
+        self.replacement_patterns, self.replacement_dict = load_default_replacement_tokens(replacement_patterns, replacement_dict)
+        self.text_enders = list(load_default_end_tokens(text_enders))
+        self._compile()
+
+    def _compile(self):
+        self.clean_regex = compile_named_alternation(self.clean_patterns)
+        self.replacement_regex = compile_named_alternation(self.replacement_patterns)
+        self.ender_regexes = dict() # test names -> compiled enders, filled on first use
+        self.normalize = lru_cache(maxsize=self.cache_size)(self._normalize)
+
+    def __getstate__(self):
+        return {'clean_patterns': self.clean_patterns, 'replacement_patterns': self.replacement_patterns,
+                'replacement_dict': self.replacement_dict, 'text_enders': self.text_enders, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
+
+    def __repr__(self):
+        return (f'TextNormalizer - clean: {[name for name, _ in self.clean_patterns]}, '
+                f'replacement: {[name for name, _ in self.replacement_patterns]}, enders: {len(self.text_enders)}')
+
+    def clean(self, text):
+        matches = [match.group() for match in self.clean_regex.finditer(text)]
+        for value in matches:
+            text = text.replace(value, '')
+        return text
+
+    def replace(self, text):
+        replacements = []
+        for match in self.replacement_regex.finditer(text):
+            kind = match.lastgroup
+            value = match.group()
+            if kind == 'UPPERCASE_MULTIPLICITY':
+                new_value = value.lower()
+                new_value = new_value.replace('j', 'J')
+            else:
+                new_value = self.replacement_dict.get(kind)
+            replacements.append((value, new_value))
+        for value, new_value in replacements:
+            text = text.replace(value, new_value)
+        return text
+
+    def _normalize(self, text):
+        return self.replace(self.clean(text))
+
+    def get_ender_regexes(self, test_names=()):
+        test_names = tuple(test_names)
+        if test_names not in self.ender_regexes:
+            text_enders = list(self.text_enders)
+            for test_name in test_names:
+                if test_name in text_enders:
+                    text_enders.remove(test_name)
+            self.ender_regexes[test_names] = [re.compile(pattern) for pattern in text_enders]
+        return self.ender_regexes[test_names]
+
+    def cut_by_enders(self, text, test_names=()):
+        for ender_regex in self.get_ender_regexes(test_names):
+            match = ender_regex.search(text)
+            if match:
+                return text[:match.start()].rstrip() # stop after the first matching ender
+        return text
+
+
+_NORMALIZERS = dict()
+
+def get_text_normalizer(clean_patterns=None, replacement_patterns=None, replacement_dict=None, text_enders=None):
+    """Returns the shared normalizer for these rule packs, building it on first use."""
+    key = (None if clean_patterns is None else tuple(map(tuple, clean_patterns)),
+           None if replacement_patterns is None else tuple(map(tuple, replacement_patterns)),
+           None if replacement_dict is None else tuple(sorted(replacement_dict.items())),
+           None if text_enders is None else tuple(text_enders))
+    text_normalizer = _NORMALIZERS.get(key)
+    if text_normalizer is None:
+        text_normalizer = _NORMALIZERS.setdefault(key, TextNormalizer(clean_patterns, replacement_patterns, replacement_dict, text_enders))
+    return text_normalizer
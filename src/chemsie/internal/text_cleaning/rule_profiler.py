@@ -0,0 +1,127 @@
+import re
+import time
+import random
+
+import regex
+
+from .clean_patterns import load_default_clean_tokens
+from .replacement import load_default_replacement_tokens
+from .test_enders import load_default_end_tokens
+
+ADVERSARIAL_SIZES = (1000, 10000)
+
+
+def load_rule_packs(clean_patterns=None, replacement_patterns=None, text_enders=None):
+    """(pack, rule name, pattern) of every named rule group of the clean, replacement and ender packs."""
+    replacement_patterns, _ = load_default_replacement_tokens(replacement_patterns)
+    rules = [('clean', name, pattern) for name, pattern in load_default_clean_tokens(clean_patterns)]
+    rules += [('replacement', name, pattern) for name, pattern in replacement_patterns]
+    rules += [('ender', pattern, pattern) for pattern in load_default_end_tokens(text_enders)]
+    return rules
+
+def get_near_miss(pattern):
+    """The literal characters of a pattern minus its last one, a text the rule starts on but cannot finish."""
+    skeleton = re.sub(r'\\[sdwSDW]|\\(.)|[\^\$\*\+\?\(\)\[\]\{\}]', lambda match: match.group(1) or '', pattern.split('|')[0])
+    return skeleton[:-1]
+
+def make_adversarial_texts(rules, sizes=ADVERSARIAL_SIZES, seed=0):
+    """
+    (label, text) inputs built to make backtracking rules slow: long runs of the characters the
+    rules repeat (whitespace, digits, ')' and '.'), near misses of every rule repeated, and
+    seeded random texts over the characters of the rules.
+    """
+    rng = random.Random(seed)
+    alphabet = sorted(set(''.join(pattern for _, _, pattern in rules)) | set(' \n0123456789'))
+    texts = []
+    for size in sizes:
+        texts += [(f'spaces x{size}', ' '*size + 'x'),
+                  (f'digits x{size}', '1'*size + '%'),
+                  (f'brackets x{size}', ')'*(size//2) + '.'*(size//2) + '1H NM'),
+                  (f'newlines x{size}', ' \n'*(size//2) + 'CHAPTER'),
+                  (f'random x{size}', ''.join(rng.choice(alphabet) for _ in range(size)))]
+        for pack, name, pattern in rules:
+            near_miss = get_near_miss(pattern)
+            if near_miss:
+                texts.append((f'near miss {pack}/{name} x{size}', (near_miss + ' ')*(size//(len(near_miss) + 1) + 1)))
+    return texts
+
+
+class RuleProfile:
+    """Hit counts and matching cost of one rule over a set of texts."""
+    def __init__(self, pack, name, pattern):
+        self.pack = pack
+        self.name = name
+        self.pattern = pattern
+        self.hits = 0
+        self.texts_hit = 0
+        self.seconds = 0.0
+        self.worst_seconds = 0.0
+        self.worst_label = None
+        self.timeouts = []
+
+    def __repr__(self):
+        return (f'RuleProfile - {self.pack}/{self.name}, hits: {self.hits}, seconds: {self.seconds:.4f}, '
+                f'worst: {self.worst_seconds:.4f} ({self.worst_label}), timeouts: {len(self.timeouts)}')
+
+    def add(self, label, num_hits, seconds, timed_out=False):
+        self.hits += num_hits
+        self.texts_hit += num_hits>0
+        self.seconds += seconds
+        if seconds>self.worst_seconds:
+            self.worst_seconds, self.worst_label = seconds, label
+        if timed_out:
+            self.timeouts.append(label)
+
+    def to_dict(self):
+        return {'pack': self.pack, 'name': self.name, 'hits': self.hits, 'texts_hit': self.texts_hit,
+                'seconds': round(self.seconds, 6), 'worst_seconds': round(self.worst_seconds, 6),
+                'worst_label': self.worst_label, 'timeouts': self.timeouts}
+
+def profile_rule(pack, name, pattern, labeled_texts, time_budget=None):
+    """
+    Times finditer of one rule over every (label, text). Without a time budget the rule runs on re,
+    as in the pipeline; with one it runs on the regex package, which stops a match after time_budget
+    seconds, so a catastrophic rule is reported as a timeout instead of stalling the run.
+    """
+    rule_profile = RuleProfile(pack, name, pattern)
+    compiled = re.compile(pattern) if time_budget is None else regex.compile(pattern)
+    for label, text in labeled_texts:
+        start = time.perf_counter()
+        try:
+            if time_budget is None:
+                num_hits = sum(1 for _ in compiled.finditer(text))
+            else:
+                num_hits = sum(1 for _ in compiled.finditer(text, timeout=time_budget))
+            timed_out = False
+        except TimeoutError:
+            num_hits, timed_out = 0, True
+        rule_profile.add(label, num_hits, time.perf_counter() - start, timed_out)
+    return rule_profile
+
+def profile_rules(texts, rules=None, adversarial_texts=None, time_budget=None):
+    """
+    Profiles every rule on the corpus texts and on the adversarial texts (generated from the
+    rules when not given). Returns {rule (pack, name): {'corpus': RuleProfile, 'adversarial': RuleProfile}},
+    the costliest rules first.
+    """
+    rules = load_rule_packs() if rules is None else rules
+    if adversarial_texts is None:
+        adversarial_texts = make_adversarial_texts(rules)
+    corpus_texts = [(f'corpus {text_idx}', text) for text_idx, text in enumerate(texts)]
+    profiles = dict()
+    for pack, name, pattern in rules:
+        profiles[(pack, name)] = {'corpus': profile_rule(pack, name, pattern, corpus_texts, time_budget),
+                                  'adversarial': profile_rule(pack, name, pattern, adversarial_texts, time_budget)}
+    return dict(sorted(profiles.items(), key=lambda item: -(item[1]['corpus'].seconds + item[1]['adversarial'].seconds)))
+
+def format_report(profiles, time_budget=None):
+    lines = [f"{'rule':<36} {'hits':>6} {'texts':>6} {'corpus s':>9} {'advers. s':>10} {'worst s':>8}  worst input"]
+    for (pack, name), rule_profiles in profiles.items():
+        corpus, adversarial = rule_profiles['corpus'], rule_profiles['adversarial']
+        worst = max([corpus, adversarial], key=lambda rule_profile: rule_profile.worst_seconds)
+        flag = ''
+        if time_budget is not None and (corpus.timeouts or adversarial.timeouts):
+            flag = f'  OVER BUDGET ({len(corpus.timeouts) + len(adversarial.timeouts)} timeouts)'
+        lines.append(f"{pack + '/' + name[:24]:<36} {corpus.hits:>6} {corpus.texts_hit:>6} {corpus.seconds:>9.4f} "
+                     f"{adversarial.seconds:>10.4f} {worst.worst_seconds:>8.4f}  {worst.worst_label}{flag}")
+    return '\n'.join(lines)
@@ -0,0 +1,185 @@
+import numpy as np
+
+from src.chemsie.utils.general import get_line_key
+
+ITER_CHUNK_SIZE = 1024
+
+
+class DocumentLines:
+    """
+    Columnar store of the (multi_idx, text, norm_bbox) lines of a document.
+
+    Pages, line numbers and bboxes are NumPy arrays and the texts are one concatenated
+    buffer with offsets. Slicing returns a view over the same columns (no copy), and
+    indexing or iterating gives the usual (multi_idx, text, bbox) tuples, so a DocumentLines
+    can stand in for the list of tuples anywhere in the pipeline. All views of a document
+    share one (page, line) -> position index for O(1) lookups.
+    """
+    def __init__(self, pages, line_nums, bboxes, text_buffer, offsets, start=0, stop=None, positions=None):
+        self.pages = pages
+        self.line_nums = line_nums
+        self.bboxes = bboxes
+        self.text_buffer = text_buffer
+        self.offsets = offsets
+        self.start = start
+        self.stop = len(pages) if stop is None else stop
+        self.positions = dict() if positions is None else positions # shared by all views, filled on first lookup
+
+    @classmethod
+    def from_tuples(cls, lines_with_multi_idx):
+        """Adapter from the list of (multi_idx, text, bbox) tuples (any iterable of them)."""
+        pages, line_nums, bboxes, texts = [], [], [], []
+        for multi_idx, text, bbox in lines_with_multi_idx:
+            page_num, line_num = multi_idx.split('_') # not get_line_key, its memo would keep every line of the document
+            pages.append(int(page_num))
+            line_nums.append(int(line_num))
+            bboxes.append(bbox)
+            texts.append(text)
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return cls(np.array(pages, dtype=np.int32), np.array(line_nums, dtype=np.int32),
+                   np.array(bboxes, dtype=np.float64).reshape(-1, 4), ''.join(texts), offsets)
+
+    def to_tuples(self):
+        return list(self)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __repr__(self):
+        return f'DocumentLines - lines: {len(self)}, span: {self.start}:{self.stop} of {len(self.pages)}'
+
+    def get_multi_idx_at(self, position):
+        """multi_idx of a document position (not a position in the view)."""
+        return f'{self.pages.item(position)}_{self.line_nums.item(position)}'
+
+    def _get_line(self, position):
+        text = self.text_buffer[self.offsets.item(position):self.offsets.item(position + 1)]
+        return self.get_multi_idx_at(position), text, tuple(self.bboxes[position].tolist())
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step!=1:
+                return [self[line_idx] for line_idx in range(start, stop, step)]
+            stop = max(start, stop)
+            return DocumentLines(self.pages, self.line_nums, self.bboxes, self.text_buffer, self.offsets,
+                                 self.start + start, self.start + stop, self.positions)
+        line_idx = item + len(self) if item<0 else item
+        if not 0<=line_idx<len(self):
+            raise IndexError('DocumentLines index out of range')
+        return self._get_line(self.start + line_idx)
+
+    def __iter__(self):
+        # converted in chunks, so iterating a whole document does not build all of its tuples at once
+        text_buffer = self.text_buffer
+        for chunk_start in range(self.start, self.stop, ITER_CHUNK_SIZE):
+            chunk_stop = min(chunk_start + ITER_CHUNK_SIZE, self.stop)
+            pages = self.pages[chunk_start:chunk_stop].tolist()
+            line_nums = self.line_nums[chunk_start:chunk_stop].tolist()
+            bboxes = self.bboxes[chunk_start:chunk_stop].tolist()
+            offsets = self.offsets[chunk_start:chunk_stop + 1].tolist()
+            for line_idx, (page_num, line_num, bbox) in enumerate(zip(pages, line_nums, bboxes)):
+                yield f'{page_num}_{line_num}', text_buffer[offsets[line_idx]:offsets[line_idx + 1]], tuple(bbox)
+
+    def __getstate__(self):
+        # pickle only the lines of the view, not the whole document behind it
+        return {'pages': self.pages[self.start:self.stop].copy(),
+                'line_nums': self.line_nums[self.start:self.stop].copy(),
+                'bboxes': self.bboxes[self.start:self.stop].copy(),
+                'text_buffer': self.get_text(),
+                'offsets': self.offsets[self.start:self.stop + 1] - self.offsets[self.start]}
+
+    def __setstate__(self, state):
+        self.__init__(state['pages'], state['line_nums'], state['bboxes'], state['text_buffer'], state['offsets'])
+
+    def is_same_document(self, other):
+        return isinstance(other, DocumentLines) and other.pages is self.pages and other.text_buffer is self.text_buffer
+
+    def get_text(self):
+        return self.text_buffer[self.offsets.item(self.start):self.offsets.item(self.stop)]
+
+    def get_texts(self):
+        offsets = self.offsets[self.start:self.stop + 1].tolist()
+        return [self.text_buffer[offsets[line_idx]:offsets[line_idx + 1]] for line_idx in range(len(self))]
+
+    def get_text_ends(self):
+        """End of every line in get_text()."""
+        return (self.offsets[self.start + 1:self.stop + 1] - self.offsets[self.start]).tolist()
+
+    def get_multi_idx_list(self):
+        return [f'{page_num}_{line_num}' for page_num, line_num in
+                zip(self.pages[self.start:self.stop].tolist(), self.line_nums[self.start:self.stop].tolist())]
+
+    def get_bounds(self):
+        """(start multi_idx, end multi_idx, upper y, lower y) of the view, without building its lines."""
+        if not len(self):
+            raise IndexError('DocumentLines index out of range')
+        return (self.get_multi_idx_at(self.start), self.get_multi_idx_at(self.stop - 1),
+                self.bboxes.item(self.start, 0), self.bboxes.item(self.stop - 1, 2))
+
+    def get_segment_key(self):
+        """Identifies the view within its document (first line, last line, length)."""
+        if not len(self):
+            return ()
+        return (self.get_multi_idx_at(self.start), self.get_multi_idx_at(self.stop - 1), len(self))
+
+    def get_position(self, requested_multi_idx):
+        """Position of a line in this view, or False if it is not in it (as get_actual_idx_from_multi_idx)."""
+        if not self.positions and len(self.pages):
+            for position, line_key in enumerate(zip(self.pages.tolist(), self.line_nums.tolist())):
+                self.positions.setdefault(line_key, position)
+        position = self.positions.get(get_line_key(requested_multi_idx))
+        if position is None or not self.start<=position<self.stop:
+            return False
+        return position - self.start
+
+    def find_lines_containing(self, word):
+        """multi_idx of every line that contains word, in line order (searches the text buffer directly)."""
+        found = []
+        if not word or not len(self):
+            return found
+        end = self.offsets.item(self.stop)
+        location = self.text_buffer.find(word, self.offsets.item(self.start), end)
+        while location>-1:
+            position = int(np.searchsorted(self.offsets, location, side='right')) - 1
+            line_end = self.offsets.item(position + 1)
+            if location + len(word)<=line_end:
+                found.append(self.get_multi_idx_at(position))
+                location = self.text_buffer.find(word, line_end, end)
+            else: # the match runs into the next line
+                location = self.text_buffer.find(word, location + 1, end)
+        return found
+
+    def get_bbox_by_page(self):
+        """(page_num, (x, y, width, height)) enclosing the lines of every page in the view, as in get_text_bbox_list."""
+        bbox_tracker = dict()
+        for page_num, bbox in zip(self.pages[self.start:self.stop].tolist(), self.bboxes[self.start:self.stop].tolist()):
+            bbox_tracker.setdefault(page_num, []).append(bbox) # (y_0, x_0, y_1, x_1)
+        final_results = []
+        for page_num, bbox_list in bbox_tracker.items():
+            min_y, min_x, _, _ = map(min, zip(*bbox_list))
+            _, _, max_y, max_x = map(max, zip(*bbox_list))
+            x = round(min_x, 2)
+            y = round(min_y, 2)
+            final_results.append((page_num, (x, y, round(max_x - x, 2), round(max_y - y, 2))))
+        return final_results
+
+def as_document_lines(lines_with_multi_idx):
+    if isinstance(lines_with_multi_idx, DocumentLines):
+        return lines_with_multi_idx
+    return DocumentLines.from_tuples(lines_with_multi_idx)
+
+def join_lines(lines_list):
+    """Concatenates segment lines; adjacent views of one document stay a view, anything else becomes a list of tuples."""
+    if lines_list and all(isinstance(lines, DocumentLines) for lines in lines_list):
+        first = lines_list[0]
+        contiguous = all(first.is_same_document(lines) and lines.start==previous.stop
+                         for previous, lines in zip(lines_list, lines_list[1:]))
+        if contiguous:
+            return DocumentLines(first.pages, first.line_nums, first.bboxes, first.text_buffer, first.offsets,
+                                 first.start, lines_list[-1].stop, first.positions)
+    joined_lines = []
+    for lines in lines_list:
+        joined_lines += lines
+    return joined_lines
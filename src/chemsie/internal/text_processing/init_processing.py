@@ -2,6 +2,8 @@ import fitz
 import re
 import textwrap
 
+from .document_lines import DocumentLines
+
 def clean_text(text):
     edited_text = text.replace('\n', ' ').replace('', ' ').replace(';', ' ').rstrip()
     pattern = r'(\b\d+[A-Z])\s*\(([^)]*MHz[^)]*)\)'
@@ -20,7 +22,15 @@ def get_norm_bbox(bbox, max_height, max_width): # adjust to (x, y, width, height
     return norm_bbox
 
 
-def get_page_text(pdf_page, page_num, max_width=250, dpi=200):
+def get_page_pixel_size(pdf_page, matrix, layout_only=True):
+    # layout_only takes the size mupdf would give the pixmap (rounded page rect) without rendering it
+    if layout_only:
+        page_irect = (pdf_page.rect * matrix).irect
+        return page_irect.width, page_irect.height
+    pix = pdf_page.get_pixmap(matrix=matrix)
+    return pix.width, pix.height
+
+def get_page_text(pdf_page, page_num, max_width=250, dpi=200, layout_only=True):
     output_list = []
     text_page = pdf_page.get_textpage()
     page_blocks = text_page.extractBLOCKS()
@@ -28,8 +38,7 @@ def get_page_text(pdf_page, page_num, max_width=250, dpi=200):
     zoom = dpi / 72.0
     mat = fitz.Matrix(zoom, zoom)
 
-    pix = pdf_page.get_pixmap(matrix=mat)
-    page_w, page_h = pix.width, pix.height
+    page_w, page_h = get_page_pixel_size(pdf_page, mat, layout_only)
 
     for x0, y0, x1, y1, line_text, line_num, _ in page_blocks:
         x0 *= zoom
@@ -109,11 +118,17 @@ def get_page_text(pdf_page, page_num, max_width=250, dpi=200):
 #     final_output_list = [(get_multi_idx(page_num, new_line_num), text, bbox) for new_line_num, (multi_idx, text, bbox) in enumerate(temp_output_list)]
 #     return final_output_list
 
-def extract_text_with_multi_idx(pdf_path):
+def iter_text_with_multi_idx(pdf_path, layout_only=True):
     document = fitz.open(pdf_path)
-    text_page_num = []
-    for page_num in range(len(document)):
-        page = document.load_page(page_num)
-        page_lines_with_multi_idx = get_page_text(page, page_num)
-        text_page_num.extend(page_lines_with_multi_idx)
-    return text_page_num
\ No newline at end of file
+    try:
+        for page_num in range(len(document)):
+            yield from get_page_text(document.load_page(page_num), page_num, layout_only=layout_only)
+    finally:
+        document.close()
+
+def extract_text_with_multi_idx(pdf_path, layout_only=True):
+    return list(iter_text_with_multi_idx(pdf_path, layout_only))
+
+def extract_document_lines(pdf_path, layout_only=True):
+    """Same lines as extract_text_with_multi_idx in a columnar DocumentLines, built page by page."""
+    return DocumentLines.from_tuples(iter_text_with_multi_idx(pdf_path, layout_only))
\ No newline at end of file
@@ -1,5 +1,8 @@
 import re
 
+def compile_token_regex(token_patterns):
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_patterns))
+
 def tokenize(text, token_patterns, debugging=False):
     regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_patterns)
     tokens = []
@@ -10,4 +13,4 @@ def tokenize(text, token_patterns, debugging=False):
             tokens.append((kind, value))
     if debugging:
         print("Tokens:", tokens)
-    return tokens
\ No newline at end of file
+    return tokens
@@ -1,4 +1,5 @@
-from .base_tokenize import tokenize
+from functools import lru_cache
+from .base_tokenize import tokenize, compile_token_regex
 
 def load_default_molecule_name_tokens(molecule_name_token_patterns=None):
     if molecule_name_token_patterns is None:
@@ -25,12 +26,63 @@ def load_default_molecule_name_tokens(molecule_name_token_patterns=None):
         token_patterns = molecule_name_token_patterns
     return token_patterns
 
+class MoleculeNameScorer:
+    """
+    Molecule-name probability of text lines with the token regex compiled once.
+    Scores of repeated lines (headers, footers) are memoised. The scorer pickles as its
+    patterns only, so it can be sent to worker processes and is rebuilt there.
+    """
+    def __init__(self, molecule_name_token_patterns=None, cache_size=100000):
+        self.token_patterns = load_default_molecule_name_tokens(molecule_name_token_patterns)
+        self.cache_size = cache_size
+        self._compile()
+
+    def _compile(self):
+        self.regex = compile_token_regex(self.token_patterns)
+        self.score = lru_cache(maxsize=self.cache_size)(self._score)
+
+    def __getstate__(self):
+        return {'token_patterns': self.token_patterns, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
+
+    def __repr__(self):
+        return f'MoleculeNameScorer - patterns: {[name for name, _ in self.token_patterns]}, cache: {self.score.cache_info()}'
+
+    def _score(self, word):
+        if not word:
+            return 0
+        num_tokens = 0
+        for match in self.regex.finditer(word):
+            if match.lastgroup != 'WHITESPACE':
+                num_tokens += 1
+        # each token used to be a (kind, value) pair summed by its len, i.e. 2 per token
+        return 100*2*num_tokens/len(word)
+
+    def score_lines(self, line_texts):
+        score = self.score
+        return [score(line_text) for line_text in line_texts]
+
+_SCORERS = dict()
+
+def get_molecule_name_scorer(molecule_name_token_patterns=None):
+    """Returns the shared scorer for this pattern set, building it on first use."""
+    key = None if molecule_name_token_patterns is None else tuple(tuple(token_pattern) for token_pattern in molecule_name_token_patterns)
+    scorer = _SCORERS.get(key)
+    if scorer is None:
+        scorer = _SCORERS.setdefault(key, MoleculeNameScorer(molecule_name_token_patterns))
+    return scorer
+
 def get_molecule_name_probability(word, molecule_name_token_patterns=None, debugging=False):
     if word:
-        molecule_name_token_patterns = load_default_molecule_name_tokens(molecule_name_token_patterns)
-        word_tokens = tokenize(word, molecule_name_token_patterns, debugging)
-        len_tokens = sum(map(len, word_tokens))
-        word_prob = 100*len_tokens/len(word)
+        if debugging:
+            molecule_name_token_patterns = load_default_molecule_name_tokens(molecule_name_token_patterns)
+            word_tokens = tokenize(word, molecule_name_token_patterns, debugging)
+            len_tokens = sum(map(len, word_tokens))
+            return 100*len_tokens/len(word)
+        word_prob = get_molecule_name_scorer(molecule_name_token_patterns).score(word)
     else:
         word_prob = 0
     return word_prob
\ No newline at end of file
@@ -3,7 +3,9 @@ from tqdm import tqdm
 
 from collections import defaultdict
 from src.chemsie.utils.metadata import extract_metadata_from_raw_pdf
-from src.chemsie.internal.full_process import process_doc_text_first, process_doc_pics_first
+from src.chemsie.internal.full_process import (process_doc_text_first, process_doc_pics_first, process_pic_doc_list, get_candidate_pages,
+                                               YODE_BATCH_SIZE, MAX_IN_FLIGHT_PAGES, CANDIDATE_PAGE_NEIGHBOURHOOD)
+from src.chemsie.internal.text_processing.init_processing import extract_document_lines
 from src.chemsie.legacy.storage import ProccessedPdf, ProccessedPdfPictures, ProccessedMoleculeSegments, save_object, load_mol_pic_clusters_dict, load_molecule_segments_dict
 from src.chemsie.internal.post_processing import get_filled_matched_molecule_segments
 
@@ -48,18 +50,39 @@ def process_doc_list_text_first(input_dir, save_dir=None, verbose=True, **kawrgs
     return results_dict
 
 
-def process_doc_list_pics_first(input_dir, pre_pics_dict=None, save_dir=None, verbose=True, **kawrgs):
+def process_doc_list_pics_first(input_dir, pre_pics_dict=None, save_dir=None, verbose=True, batch_across_docs=False, page_stats=None, **kawrgs):
+    # page_stats, when given, gets the skipped, structure-free and missed page counts of the whole run
     pdf_files = [f for f in os.listdir(input_dir) if f.endswith('pdf')]
     results_dict = dict()
+    lines_by_path = dict() # text-only pre-pass lines, reused by the sweep of each document
     if pre_pics_dict is None:
         pre_pics_dict = dict()
+    if batch_across_docs and kawrgs.get('backend', 'yode')=='yode':
+        # structures of all documents first, the pages of consecutive documents share batches
+        pdf_files_to_detect = [pdf_file for pdf_file in pdf_files if pre_pics_dict.get(pdf_file) is None]
+        pdf_paths = [os.path.join(input_dir, pdf_file) for pdf_file in pdf_files_to_detect]
+        pages_by_path = None
+        if kawrgs.get('pages') is not None:
+            pages_by_path = {pdf_path: kawrgs['pages'] for pdf_path in pdf_paths}
+        elif kawrgs.get('candidate_pages'):
+            page_neighbourhood = kawrgs.get('page_neighbourhood', CANDIDATE_PAGE_NEIGHBOURHOOD)
+            lines_by_path = {pdf_path: extract_document_lines(pdf_path) for pdf_path in pdf_paths}
+            pages_by_path = {pdf_path: get_candidate_pages(lines, page_neighbourhood) for pdf_path, lines in lines_by_path.items()}
+        detected_pics_dict = process_pic_doc_list(pdf_paths,
+                                                  batch_size=kawrgs.get('batch_size', YODE_BATCH_SIZE),
+                                                  max_in_flight_pages=kawrgs.get('max_in_flight_pages', MAX_IN_FLIGHT_PAGES),
+                                                  pages_by_path=pages_by_path,
+                                                  page_filter=kawrgs.get('page_filter', 'skip'),
+                                                  page_stats=page_stats)
+        pre_pics_dict = {**pre_pics_dict, **{pdf_file: detected_pics_dict[os.path.join(input_dir, pdf_file)] for pdf_file in pdf_files_to_detect}}
     for file_idx, pdf_file in enumerate(pdf_files):
         if verbose:
             print(file_idx, pdf_file)
         pdf_path = os.path.join(input_dir, pdf_file)
         # try:
         metadata = extract_metadata_from_raw_pdf(pdf_path)
-        molecule_segments, mol_pic_clusters = process_doc_pics_first(pdf_path, pre_taken_pics=pre_pics_dict.get(pdf_file), **kawrgs)
+        molecule_segments, mol_pic_clusters = process_doc_pics_first(pdf_path, pre_taken_pics=pre_pics_dict.get(pdf_file), page_stats=page_stats,
+                                                                     page_lines_with_multi_idx=lines_by_path.get(pdf_path), **kawrgs)
         results_dict[pdf_file] = (molecule_segments, mol_pic_clusters)
         if save_dir:
             store_in_pkl(save_dir, 'full', pdf_file, metadata, molecule_segments, mol_pic_clusters)
@@ -16,8 +16,8 @@ The schema is designed with the following principles:
     Molecules, Reactions, and Spectra, which can be linked by unique IDs rather
     than being nested in a monolithic object.
 """
-from typing import List, Tuple, Optional, Union, Literal, Any
-from pydantic import BaseModel, Field
+from typing import List, Dict, Tuple, Optional, Union, Literal, Any, Annotated
+from pydantic import BaseModel, Field, model_validator
 
 # ==============================================================================
 # 1. Core Foundational Models
@@ -26,7 +26,7 @@ from pydantic import BaseModel, Field
 class BoundingBox(BaseModel):
     """
     Defines a bounding box on a page.
-    Coordinates are in standard PDF coordinate space (origin at bottom-left).
+    Coordinates are in standard PDF coordinate space (points, origin at bottom-left).
     """
     x0: float
     y0: float
@@ -95,19 +95,88 @@ class NMRPeak(BaseModel):
     coupling_constants: Optional[List[float]] = Field(None, description="List of J-values in Hz.")
     provenance: Provenance
 
+class NMRPeakColumns(BaseModel):
+    """
+    Columnar form of a list of NMRPeak: parallel arrays with one entry per peak, and the
+    distinct provenances referenced by index instead of repeated in every peak.
+    The J values of peak i are coupling_constants[coupling_offsets[i]:coupling_offsets[i+1]],
+    or None if i is in missing_coupling.
+    """
+    shift: List[float]
+    multiplicity: List[Optional[str]]
+    integration: List[Optional[float]]
+    coupling_offsets: List[int] = Field(..., description="One offset per peak plus the end of the last one.")
+    coupling_constants: List[float] = Field([], description="The J-values in Hz of all peaks, in peak order.")
+    missing_coupling: List[int] = Field([], description="Peaks without coupling constants (None rather than []).")
+    provenance_index: List[int] = Field(..., description="Index of the provenance of every peak in provenances.")
+    provenances: List[Provenance]
+
+    @classmethod
+    def from_peaks(cls, peaks: List[NMRPeak]) -> "NMRPeakColumns":
+        coupling_offsets, coupling_constants, missing_coupling = [0], [], []
+        provenance_index, provenances, provenance_keys = [], [], dict()
+        for peak_idx, peak in enumerate(peaks):
+            if peak.coupling_constants is None:
+                missing_coupling.append(peak_idx)
+            else:
+                coupling_constants += peak.coupling_constants
+            coupling_offsets.append(len(coupling_constants))
+            # peaks parsed from one text share their provenance, keep it once
+            provenance_key = peak.provenance.model_dump_json()
+            if provenance_key not in provenance_keys:
+                provenance_keys[provenance_key] = len(provenances)
+                provenances.append(peak.provenance)
+            provenance_index.append(provenance_keys[provenance_key])
+        return cls.model_construct(shift=[peak.shift for peak in peaks],
+                                   multiplicity=[peak.multiplicity for peak in peaks],
+                                   integration=[peak.integration for peak in peaks],
+                                   coupling_offsets=coupling_offsets, coupling_constants=coupling_constants,
+                                   missing_coupling=missing_coupling, provenance_index=provenance_index, provenances=provenances)
+
+    def to_peaks(self) -> List[NMRPeak]:
+        missing_coupling = set(self.missing_coupling)
+        return [NMRPeak.model_construct(shift=self.shift[peak_idx],
+                                        multiplicity=self.multiplicity[peak_idx],
+                                        integration=self.integration[peak_idx],
+                                        coupling_constants=None if peak_idx in missing_coupling else
+                                        self.coupling_constants[self.coupling_offsets[peak_idx]:self.coupling_offsets[peak_idx + 1]],
+                                        provenance=self.provenances[self.provenance_index[peak_idx]])
+                for peak_idx in range(len(self.shift))]
+
 class NMRData(BaseModel):
     """
     Represents extracted Nuclear Magnetic Resonance data.
+    The peaks are either a list of NMRPeak or, in the compact form, peak_columns.
     """
     id: str = Field(..., description="A unique identifier for this spectral dataset.")
     molecule_id: str = Field(..., description="The ID of the molecule this data characterizes.")
     nucleus: str = Field(..., description="The nucleus, e.g., '1H', '13C'.")
     solvent: Optional[str] = Field(None)
     frequency: Optional[str] = Field(None, description="e.g., '400 MHz'.")
-    peaks: List[NMRPeak]
+    peaks: List[NMRPeak] = Field([], description="The peaks, empty when they are stored in peak_columns.")
+    peak_columns: Optional[NMRPeakColumns] = Field(None, description="Columnar peaks, an alternative to peaks.")
     raw_text: str = Field(..., description="The raw text from which the NMR data was parsed.")
     provenance: Provenance
 
+    @model_validator(mode='after')
+    def check_peak_form(self) -> "NMRData":
+        # exactly one form; peaks=[] with no peak_columns is a spectrum without peaks
+        if self.peak_columns is not None and self.peaks:
+            raise ValueError('give either peaks or peak_columns, not both')
+        if self.peak_columns is None and 'peaks' not in self.model_fields_set:
+            raise ValueError('give either peaks or peak_columns')
+        return self
+
+    def to_columnar(self) -> "NMRData":
+        if self.peak_columns is not None:
+            return self
+        return self.model_copy(update={'peaks': [], 'peak_columns': NMRPeakColumns.from_peaks(self.peaks)})
+
+    def to_rows(self) -> "NMRData":
+        if self.peak_columns is None:
+            return self
+        return self.model_copy(update={'peaks': self.peak_columns.to_peaks(), 'peak_columns': None})
+
 class Spectrum(BaseModel):
     """
     Generic spectrum model to bridge legacy data.
@@ -116,8 +185,26 @@ class Spectrum(BaseModel):
     molecule_id: Optional[str] = Field(None, description="The ID of the molecule this data characterizes.")
     text_representation: Optional[str] = Field(None, description="Raw text representation.")
     peaks: Optional[List[Any]] = Field(None, description="List of peaks.")
+    peak_columns: Optional[Dict[str, List[Any]]] = Field(None, description="Dict peaks as one list per key, an alternative to peaks.")
     provenance: Optional[Provenance] = None
 
+    def to_columnar(self) -> "Spectrum":
+        """Stores dict peaks (as the 1H and IR parsers give) column by column; other peaks are already flat."""
+        if not self.peaks or not all(isinstance(peak, dict) for peak in self.peaks):
+            return self
+        keys = list(self.peaks[0])
+        if any(list(peak)!=keys for peak in self.peaks):
+            return self
+        peak_columns = {key: [peak[key] for peak in self.peaks] for key in keys}
+        return self.model_copy(update={'peaks': None, 'peak_columns': peak_columns})
+
+    def to_rows(self) -> "Spectrum":
+        if self.peak_columns is None:
+            return self
+        keys = list(self.peak_columns)
+        peaks = [dict(zip(keys, values)) for values in zip(*self.peak_columns.values())]
+        return self.model_copy(update={'peaks': peaks, 'peak_columns': None})
+
 # Add other spectral data models here as needed (e.g., IRData, MSData) following
 # the NMRData pattern.
 
@@ -163,6 +250,14 @@ class ExtractedData(BaseModel):
     spectra: List[Union[NMRData, Spectrum]] # This can be expanded with IRData, MSData, etc.
     errors: List[str] = Field([], description="A list of errors encountered during processing.")
 
+    def to_columnar(self) -> "ExtractedData":
+        """The same data with the peaks of every spectrum in columnar form (smaller JSON, faster to validate)."""
+        return self.model_copy(update={'spectra': [spectrum.to_columnar() for spectrum in self.spectra]})
+
+    def to_rows(self) -> "ExtractedData":
+        """The same data with the peaks of every spectrum as one entry per peak."""
+        return self.model_copy(update={'spectra': [spectrum.to_rows() for spectrum in self.spectra]})
+
     class Config:
         title = "ChemSIE Extracted Chemical Data"
         anystr_strip_whitespace = True
@@ -192,3 +287,29 @@ class ExtractedData(BaseModel):
                 "errors": []
             }
         }
+
+# ==============================================================================
+# 6. Streaming (NDJSON) Output Records
+# ==============================================================================
+
+class ExtractionHeader(BaseModel):
+    """The first line of an NDJSON extraction file."""
+    record: Literal["header"] = "header"
+    source_filename: str
+
+class MoleculeRecord(BaseModel):
+    """One line of an NDJSON extraction file: a molecule with the spectra that characterize it."""
+    record: Literal["molecule"] = "molecule"
+    molecule: Molecule
+    spectra: List[Union[NMRData, Spectrum]] = Field([], description="The spectra of this molecule.")
+
+class ExtractionFooter(BaseModel):
+    """
+    The last line of an NDJSON extraction file, written once the document is done.
+    A file without it was cut short.
+    """
+    record: Literal["footer"] = "footer"
+    reactions: List[Reaction] = Field([], description="The reactions, written once all molecules are known.")
+    errors: List[str] = Field([], description="A list of errors encountered during processing.")
+
+ExtractionRecord = Annotated[Union[ExtractionHeader, MoleculeRecord, ExtractionFooter], Field(discriminator="record")]
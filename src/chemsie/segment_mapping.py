@@ -0,0 +1,142 @@
+"""
+segment_mapping.py
+--------------------
+Direct mapping of MoleculeSegment objects to the Molecule and Spectrum schemas.
+
+The segments are read as they are: the structure images (mol_pics[*].pic) are never touched,
+the peaks of all test lines of a document are parsed in one batch per spectrum kind through the
+shared parse cache (so texts parsed before are reused), and the IDs are derived from the content
+of the segment, so the same document always maps to the same output.
+
+"""
+
+import uuid
+
+from src.chemsie.schemas import Molecule, Spectrum, Provenance, BoundingBox, MoleculeProvenance, ExtractionMethod
+from src.parsing.spectra import parse_peaks_many, get_spectrum_kind
+
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'chemsie/molecule-segment')
+
+TEXT_METHOD = {"algorithm": "legacy_parser", "version": "1.0", "confidence": 0.8}
+IMAGE_METHOD = {"algorithm": "yode", "version": "1.0", "confidence": 0.9}
+IMAGE_CONFIDENCE = 0.9 # Placeholder confidence
+
+
+def get_test_text_lines(molecule_segment):
+    if not getattr(molecule_segment, 'test_text_sequence', None):
+        return []
+    return molecule_segment.test_text_sequence.test_text_lines
+
+def normalize_test_type(test_type):
+    # as ExtractedTest, every 13C NMR variant ('13C-NMR', '13C{1H} NMR') is one test type
+    if isinstance(test_type, str) and '13C' in test_type and 'NMR' in test_type:
+        return '13C NMR'
+    return test_type
+
+def get_molecule_id(file_name, molecule_segment):
+    """'mol-{uuid5}' of the document, the position of the segment in it, its name and its test texts."""
+    content = '\x1f'.join([str(file_name), str(molecule_segment.start_multi_idx), str(molecule_segment.end_multi_idx),
+                           molecule_segment.molecule_name or ''] + [line.text for line in get_test_text_lines(molecule_segment)])
+    return f"mol-{uuid.uuid5(ID_NAMESPACE, content)}"
+
+def get_spectrum_peaks(test_type, parsed_peaks):
+    """The peak list of a parse result; 1H NMR gives a dict holding the peaks next to the frequency."""
+    if get_spectrum_kind(test_type)=='proton':
+        return parsed_peaks['peaks']
+    return parsed_peaks
+
+def get_pdf_bbox(bbox, page_size):
+    """
+    The bbox in PDF coordinates (points, origin at the bottom-left of the page) of a (x, y, width,
+    height) box in percent of the (width, height) of its page in points, y from the top, the form
+    of the text line (get_norm_bbox) and MolPic bboxes.
+    """
+    x, y, width, height = bbox
+    page_width, page_height = page_size
+    return {"x0": round(x*page_width/100, 2), "y0": round((100 - y - height)*page_height/100, 2),
+            "x1": round((x + width)*page_width/100, 2), "y1": round((100 - y)*page_height/100, 2)}
+
+def get_text_bbox(test_text_line, page_sizes):
+    """
+    The bbox (PDF coordinates, see get_pdf_bbox) of the test text on its first page, from the
+    (page, (x, y, width, height)) bbox_list, an empty box when the size of the page is not in page_sizes.
+    """
+    for page_num, bbox in test_text_line.bbox_list or []:
+        if page_num==test_text_line.start_page and page_num in page_sizes:
+            return get_pdf_bbox(bbox, page_sizes[page_num])
+    return {"x0": 0.0, "y0": 0.0, "x1": 0.0, "y1": 0.0}
+
+def get_image_provenance(molecule_segment, page_sizes):
+    """
+    The provenance of the structure image matched to the segment, None without one, or when the
+    size of its page is not in page_sizes ({page_num: (width, height)} in points): the MolPic bbox
+    is in percent of the page, and the provenance bboxes are in PDF coordinates.
+    """
+    if not molecule_segment.mol_pics:
+        return None
+    mol_pic = molecule_segment.mol_pics[0]
+    if mol_pic.page_num not in page_sizes:
+        return None
+    return {"page_number": mol_pic.page_num,
+            "bbox": get_pdf_bbox(mol_pic.bbox, page_sizes[mol_pic.page_num]),
+            "source": "image",
+            "span": None,
+            "method": IMAGE_METHOD,
+            "confidence": IMAGE_CONFIDENCE,
+            "role": "structure_image"}
+
+
+def map_segments_to_records(molecule_segments, file_name, page_sizes=None):
+    """
+    Yields (molecule, spectra) per segment as plain dicts shaped like the Molecule and Spectrum
+    schemas (all fields, in schema order). Nothing is validated, this is the trusted form the NDJSON
+    writer serializes as it is; map_segments_to_models gives the validated models.
+    The peaks of all segments are parsed before the first one is yielded. The provenance bboxes
+    are in PDF coordinates on the pages of page_sizes ({page_num: (width, height)} in points):
+    elsewhere the test texts get an empty box and the structure images no provenance.
+    """
+    page_sizes = page_sizes or dict()
+    test_lines = [get_test_text_lines(molecule_segment) for molecule_segment in molecule_segments]
+    test_types = [normalize_test_type(line.test_type) for lines in test_lines for line in lines]
+    parsed_peaks = iter(parse_peaks_many([line.text for lines in test_lines for line in lines], test_types))
+    test_types = iter(test_types)
+
+    for molecule_segment, lines in zip(molecule_segments, test_lines):
+        mol_id = get_molecule_id(file_name, molecule_segment)
+        spectra = []
+        for test_text_line in lines:
+            test_type = next(test_types)
+            spectra.append({
+                "type": test_type,
+                "molecule_id": mol_id,
+                "text_representation": test_text_line.text,
+                "peaks": get_spectrum_peaks(test_type, next(parsed_peaks)),
+                "peak_columns": None,
+                "provenance": {
+                    "page_number": test_text_line.start_page,
+                    "bbox": get_text_bbox(test_text_line, page_sizes),
+                    "source": "text",
+                    "span": None,
+                    "method": TEXT_METHOD,
+                    "confidence": None
+                }
+            })
+        image_provenance = get_image_provenance(molecule_segment, page_sizes)
+        molecule = {
+            "id": mol_id,
+            "smiles": molecule_segment.mol_pic_smiles or None, # Prioritizing image-based smiles
+            "inchi": None,
+            "label": molecule_segment.molecule_name or None,
+            "provenance": [image_provenance] if image_provenance else []
+        }
+        yield molecule, spectra
+
+def _to_provenance(model, provenance):
+    return model(**{**provenance, "bbox": BoundingBox(**provenance["bbox"]), "method": ExtractionMethod(**provenance["method"])})
+
+def map_segments_to_models(molecule_segments, file_name, page_sizes=None):
+    """Yields (Molecule, [Spectrum]) per segment, validated; the models of map_segments_to_records."""
+    for molecule, spectra in map_segments_to_records(molecule_segments, file_name, page_sizes):
+        provenance = [_to_provenance(MoleculeProvenance, image_provenance) for image_provenance in molecule["provenance"]]
+        yield (Molecule(**{**molecule, "provenance": provenance}),
+               [Spectrum(**{**spectrum, "provenance": _to_provenance(Provenance, spectrum["provenance"])}) for spectrum in spectra])
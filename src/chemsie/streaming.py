@@ -0,0 +1,107 @@
+"""
+streaming.py
+--------------------
+NDJSON form of ExtractedData: a header line, one MoleculeRecord line per molecule (with its
+spectra) written as soon as it is mapped, and a footer line with the reactions and errors.
+A document is never held in memory as a whole, neither when writing nor when reading.
+
+"""
+
+import json
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.chemsie.schemas import ExtractedData, ExtractionHeader, MoleculeRecord, ExtractionFooter, ExtractionRecord
+
+TRUNCATED_ERROR = "The extraction output ended before its footer line, it is incomplete."
+
+_RECORD_ADAPTER = TypeAdapter(ExtractionRecord)
+
+
+class NDJSONExtractionWriter:
+    """
+    Writes an extraction to an NDJSON file, one line per record.
+
+    Molecules and spectra are given as schema models, or as plain dicts shaped like them
+    (trusted data, written with json.dumps without building any model). With strict, every
+    molecule record is validated against MoleculeRecord before it is written.
+    """
+    def __init__(self, output_path, source_filename, strict=False):
+        self.output_path = output_path
+        self.strict = strict
+        self.num_molecules = 0
+        self.file = open(output_path, 'w', encoding='utf-8')
+        self._write(ExtractionHeader(source_filename=source_filename))
+
+    def __repr__(self):
+        return f'NDJSONExtractionWriter - {self.output_path}, molecules: {self.num_molecules}'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # an exception leaves the file without footer, so readers can tell it is incomplete
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    def _write(self, record):
+        self.file.write(record.model_dump_json())
+        self.file.write('\n')
+
+    def write_molecule(self, molecule, spectra):
+        record = {'record': 'molecule', 'molecule': molecule, 'spectra': list(spectra)}
+        if self.strict:
+            self._write(MoleculeRecord.model_validate(record))
+        elif isinstance(molecule, BaseModel):
+            self._write(MoleculeRecord.model_construct(**record))
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            self.file.write('\n')
+        # flushed per molecule, so a crash or a reader following the file sees every finished molecule
+        self.file.flush()
+        self.num_molecules += 1
+
+    def close(self, reactions=None, errors=None):
+        if self.file.closed:
+            return
+        self._write(ExtractionFooter.model_construct(reactions=reactions or [], errors=errors or []))
+        self.file.close()
+
+
+def iter_extraction_records(ndjson_path):
+    """Yields the validated records of an NDJSON extraction file line by line. A ValueError names the bad line."""
+    with open(ndjson_path, encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield _RECORD_ADAPTER.validate_json(line)
+            except ValidationError as e:
+                raise ValueError(f'{ndjson_path}, line {line_number}: {e}') from e
+
+
+def iter_extracted_molecules(ndjson_path):
+    """Yields (molecule, spectra) from an NDJSON extraction file, one line at a time."""
+    for record in iter_extraction_records(ndjson_path):
+        if isinstance(record, MoleculeRecord):
+            yield record.molecule, record.spectra
+
+
+def read_extracted_data(ndjson_path):
+    """The whole ExtractedData of an NDJSON extraction file; a file cut short gets TRUNCATED_ERROR in errors."""
+    header, footer, molecules, spectra = None, None, [], []
+    for record in iter_extraction_records(ndjson_path):
+        if isinstance(record, ExtractionHeader):
+            header = record
+        elif isinstance(record, MoleculeRecord):
+            molecules.append(record.molecule)
+            spectra.extend(record.spectra)
+        else:
+            footer = record
+    if header is None:
+        raise ValueError(f'{ndjson_path} has no header line, it is not an NDJSON extraction file')
+    reactions, errors = (footer.reactions, footer.errors) if footer is not None else ([], [TRUNCATED_ERROR])
+    return ExtractedData.model_construct(source_filename=header.source_filename, molecules=molecules, reactions=reactions,
+                                         spectra=spectra, errors=errors)
@@ -1,9 +1,46 @@
+from functools import lru_cache
 from pypdf import PdfReader, PdfWriter
 
+@lru_cache(maxsize=2**18)
+def get_line_key(multi_idx):
+    # integer (page, line) key of a '{page}_{line}' multi_idx, parsed once per distinct string
+    page_num, line_num = multi_idx.split('_')
+    return int(page_num), int(line_num)
+
 def get_page_num_and_line_num_from_multi_idx(multi_idx):
-    return map(int, multi_idx.split('_'))
+    return get_line_key(multi_idx)
+
+class LineIndex:
+    """
+    Position of every line of a line list by its (page, line) key, so repeated lookups are O(1)
+    instead of a scan of the list. Accepts a list of multi_idx strings or of (multi_idx, text, bbox) lines.
+    """
+    def __init__(self, lines):
+        self.positions = dict()
+        # columnar DocumentLines views keep one document-wide index, no need to build another one
+        self.document_lines = lines if hasattr(lines, 'get_position') else None
+        if self.document_lines is not None:
+            return
+        for actual_idx, line in enumerate(lines):
+            multi_idx = line if isinstance(line, str) else line[0]
+            self.positions.setdefault(get_line_key(multi_idx), actual_idx) # first occurrence, as the scan did
+
+    def __len__(self):
+        return len(self.document_lines) if self.document_lines is not None else len(self.positions)
+
+    def __repr__(self):
+        return f'LineIndex - lines: {len(self)}'
+
+    def get_actual_idx(self, requested_multi_idx):
+        if requested_multi_idx is None:
+            return False
+        if self.document_lines is not None:
+            return self.document_lines.get_position(requested_multi_idx)
+        return self.positions.get(get_line_key(requested_multi_idx), False)
 
 def get_actual_idx_from_multi_idx(multi_idx_list, requested_multi_idx):
+    if isinstance(multi_idx_list, LineIndex):
+        return multi_idx_list.get_actual_idx(requested_multi_idx)
     for actual_idx, multi_idx in enumerate(multi_idx_list):
         if requested_multi_idx == multi_idx:
             return actual_idx
@@ -15,4 +52,4 @@ def minimize_pdf_to_relavent_pages(input_pdf_path, output_pdf_path, page_numbers
     for page_num in page_numbers:
         writer.add_page(reader.pages[page_num])
     with open(output_pdf_path, "wb") as output_pdf:
-        writer.write(output_pdf)
\ No newline at end of file
+        writer.write(output_pdf)
@@ -11,19 +11,23 @@ from yolov5.models.yolo import Model
 _YODE_MODEL = None
 _YODE_DEVICE = None
 _YODE_STRIDE = 32  # will be overwritten after model load
+YODE_BATCH_SIZE = 4  # pages per forward pass, raise it with more CPU threads or on GPU
+YODE_IMGSZ = 640  # model input size
 
 torch.serialization.add_safe_globals([Model])
 
-def _get_yolo_model(device_str="", dnn=False, half=False, data=None):
+def _get_yolo_model(device_str="", dnn=False, half=False, data=None, weights=None):
     """
     Load (or return cached) YOLOv5 model for inference.
+    weights defaults to best.pt next to this file.
     """
     global _YODE_MODEL, _YODE_DEVICE, _YODE_STRIDE
     if _YODE_MODEL is not None:
         return _YODE_MODEL, _YODE_DEVICE, _YODE_STRIDE
     
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    weights = os.path.join(current_dir, 'best.pt')
+    if weights is None:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        weights = os.path.join(current_dir, 'best.pt')
 
     device = select_device(device_str)  # '' -> auto CUDA/CPU
     model = DetectMultiBackend(weights, device=device, dnn=dnn, data=data, fp16=half)
@@ -37,71 +41,51 @@ def _get_yolo_model(device_str="", dnn=False, half=False, data=None):
     return _YODE_MODEL, _YODE_DEVICE, _YODE_STRIDE
 
 
-@torch.no_grad()
-def segment_chemical_structures_yode(
-    image_np: np.ndarray,
-    *,
-    data: str = None,
-    imgsz: int = 640,
-    conf_thres: float = 0.25,
-    iou_thres: float = 0.45,
-    max_det: int = 1000,
-    agnostic_nms: bool = False,
-    classes=None,            # e.g., [0] if you want only class 0
-    device: str = "",        # e.g., "0" for CUDA:0, "" for auto
-    use_half: bool = False,  # fp16 on supported GPUs
-) -> tuple[list[np.ndarray], list[tuple[int, int, int, int]]]:
-    """
-    Run YOLOv5 on a single numpy image and return (segments, bboxes).
-    - image_np: BGR np.ndarray (H, W, 3). Accepts any resolution.
-    - Returns:
-        segments: list of cropped np.ndarray images (from original)
-        bboxes:   list of (x1, y1, x2, y2) in original image coordinates
-    """
+def _check_image(image_np):
     assert isinstance(image_np, np.ndarray) and image_np.ndim == 3 and image_np.shape[2] == 3, \
         "image_np must be a HxWx3 BGR uint8 NumPy array"
 
-    model, device_obj, stride = _get_yolo_model(device_str=device, dnn=False, half=use_half, data=data)
-    # Keep a copy of the original for cropping/coordinate space
-    im0 = np.ascontiguousarray(image_np)
-    h0, w0 = im0.shape[:2]
-
-    # Letterbox resize to imgsz with stride alignment (like detect.py)
-    # Returns: resized_img, (ratio_w, ratio_h), (pad_w, pad_h)
-    lb_img, _, _ = letterbox(im0, new_shape=imgsz, stride=stride, auto=True)
-
-    # Convert to model input: HWC BGR -> CHW RGB, float32/16, [0,1]
-    img = lb_img.transpose((2, 0, 1))[::-1]  # BGR -> RGB, to CHW
-    img = np.ascontiguousarray(img)
-    img_t = torch.from_numpy(img).to(device_obj)
-    img_t = img_t.half() if (use_half and model.fp16) else img_t.float()
-    img_t /= 255.0
-    if img_t.ndim == 3:
-        img_t = img_t.unsqueeze(0)  # (1,3,H,W)
-
-    # Inference
-    pred = model(img_t, augment=False, visualize=False)
-
-    # NMS
-    det_list = non_max_suppression(
-        pred,
-        conf_thres=conf_thres,
-        iou_thres=iou_thres,
-        classes=classes,
-        agnostic=agnostic_nms,
-        max_det=max_det,
-    )
-
-    segments: list[np.ndarray] = []
+
+def get_letterbox_size(shape, imgsz=YODE_IMGSZ):
+    """(height, width) letterbox resizes an image of shape (height, width) to, before padding."""
+    r = min(imgsz / shape[0], imgsz / shape[1])
+    return int(round(shape[0] * r)), int(round(shape[1] * r))
+
+
+def _to_model_input(im0, imgsz, stride, scaleup=True):
+    """
+    Letterbox resize to imgsz with stride alignment (like detect.py), HWC BGR -> CHW RGB uint8, and
+    the (ratio, pad) of the letterbox, which maps boxes on the input back to im0.
+    """
+    lb_img, ratio, pad = letterbox(im0, new_shape=imgsz, stride=stride, auto=True, scaleup=scaleup)
+    return np.ascontiguousarray(lb_img.transpose((2, 0, 1))[::-1]), (ratio, pad)
+
+
+def _get_page_ratio_pad(ratio_pad, image_shape, page_shape):
+    """
+    The (ratio, pad) of the letterbox of an image (a rendering of the page at a smaller zoom, or
+    the page itself) as a letterbox of the page, for scale_coords to map boxes into page_shape.
+    The shapes alone do not give it: images smaller than the model input are only padded, not
+    enlarged, without scaleup.
+    """
+    (gain, _), pad = ratio_pad
+    gain *= min(image_shape[0] / page_shape[0], image_shape[1] / page_shape[1])
+    return (gain, gain), pad
+
+
+def _get_boxes(det, input_shape, page_shape, ratio_pad, confidences=None):
+    """
+    The (x1, y1, x2, y2) boxes of one page from its NMS output, scaled back from input_shape to
+    page_shape with the (ratio, pad) of the page letterbox (_get_page_ratio_pad). The confidence
+    of each box is appended to confidences when given.
+    """
+    h0, w0 = page_shape[:2]
     bboxes: list[tuple[int, int, int, int]] = []
 
-    # Process single image predictions
-    det = det_list[0]
     if det is not None and len(det):
         # Scale boxes from letterboxed image shape back to the original image shape
-        det[:, :4] = scale_coords(img_t.shape[2:], det[:, :4], im0.shape).round()
+        det[:, :4] = scale_coords(input_shape, det[:, :4], page_shape, ratio_pad).round()
 
-        # Extract crops and boxes
         for *xyxy, conf, cls in det.tolist():
             x1, y1, x2, y2 = map(int, xyxy)
             # Clip just in case
@@ -111,10 +95,131 @@ def segment_chemical_structures_yode(
             y2 = max(0, min(y2, h0 - 1))
             if x2 <= x1 or y2 <= y1:
                 continue  # skip degenerate/empty boxes
-
-            crop = im0[y1:y2, x1:x2].copy()
-            segments.append(crop)
             bboxes.append((x1, y1, x2, y2))
+            if confidences is not None:
+                confidences.append(conf)
+
+    return bboxes
 
-    return [segments, bboxes]
 
+def _detect_batch(batch, model, device_obj, stride, imgsz, use_half, nms_options, scaleup=True, confidences=None):
+    """
+    (key, [segments, bboxes]) for a batch of (key, image, page_shape), in order. Pages that letterbox
+    to the same shape (all pages of a document, as a rule) go through one forward and one NMS pass.
+    The box confidences of each page go to confidences[key] when given.
+    """
+    inputs, ratio_pads = zip(*[_to_model_input(im0, imgsz, stride, scaleup) for _, im0, _ in batch])
+    shape_groups = dict()
+    for page_idx, img in enumerate(inputs):
+        shape_groups.setdefault(img.shape, []).append(page_idx)
+
+    results = [None]*len(batch)
+    for input_shape, page_idxs in shape_groups.items():
+        img_t = torch.from_numpy(np.stack([inputs[page_idx] for page_idx in page_idxs])).to(device_obj)
+        img_t = img_t.half() if (use_half and model.fp16) else img_t.float()
+        img_t /= 255.0
+
+        # Inference
+        pred = model(img_t, augment=False, visualize=False)
+
+        # NMS
+        det_list = non_max_suppression(pred, **nms_options)
+
+        for page_idx, det in zip(page_idxs, det_list):
+            key, im0, page_shape = batch[page_idx]
+            box_confidences = None if confidences is None else confidences.setdefault(key, [])
+            if page_shape is None:
+                bboxes = _get_boxes(det, input_shape[1:], im0.shape, ratio_pads[page_idx], box_confidences)
+                results[page_idx] = [[im0[y1:y2, x1:x2].copy() for x1, y1, x2, y2 in bboxes], bboxes]
+            else:
+                ratio_pad = _get_page_ratio_pad(ratio_pads[page_idx], im0.shape, page_shape)
+                results[page_idx] = [None, _get_boxes(det, input_shape[1:], page_shape, ratio_pad, box_confidences)]
+    return [(key, result) for (key, _, _), result in zip(batch, results)]
+
+
+@torch.no_grad()
+def iter_detect_chemical_structures_yode(
+    keyed_pages,
+    *,
+    batch_size: int = YODE_BATCH_SIZE,
+    data: str = None,
+    imgsz: int = YODE_IMGSZ,
+    conf_thres: float = 0.25,
+    iou_thres: float = 0.45,
+    max_det: int = 1000,
+    agnostic_nms: bool = False,
+    classes=None,            # e.g., [0] if you want only class 0
+    device: str = "",        # e.g., "0" for CUDA:0, "" for auto
+    use_half: bool = False,  # fp16 on supported GPUs
+    weights: str = None,     # best.pt next to this file by default
+    scaleup: bool = True,    # False: images smaller than imgsz are padded, not enlarged
+    confidences: dict = None,  # {key: box confidences}, filled when given
+):
+    """
+    Run YOLOv5 on an iterable of (key, image, page_shape) and yield (key, [segments, bboxes]) per
+    page, in order.
+    - image: BGR np.ndarray (H, W, 3), the page as the model is to see it.
+    - page_shape: None when image is the page at full resolution: the boxes are in its pixels and
+      segments are the crops. Otherwise the (height, width) of the page at full resolution, which
+      the boxes are scaled to; image is then a smaller rendering of the same page (e.g. at the
+      get_letterbox_size of page_shape, so it is not resized again) and segments is None.
+    - Pages are taken batch_size at a time: letterboxed, stacked into one tensor, one forward and
+      one NMS pass, the boxes mapped back to each page. Keys are passed through as they are, so
+      pages of several documents may share a batch (e.g. key = (pdf_file, page_num)).
+    - At most batch_size images are held at once, each dropped before its result is yielded; the
+      iterable may be a generator.
+    - scaleup=False keeps images smaller than imgsz at their scale (e.g. parts of a page at the
+      scale the model sees whole pages at), only padded to the stride.
+    - confidences: when given, confidences[key] is set to the confidences of the boxes of the
+      page, in the order of its bboxes, before the page is yielded.
+    """
+    model, device_obj, stride = _get_yolo_model(device_str=device, dnn=False, half=use_half, data=data, weights=weights)
+    nms_options = dict(conf_thres=conf_thres, iou_thres=iou_thres, classes=classes, agnostic=agnostic_nms, max_det=max_det)
+
+    batch = []
+    for key, image_np, page_shape in keyed_pages:
+        _check_image(image_np)
+        # Keep a copy of the original for cropping/coordinate space
+        batch.append((key, np.ascontiguousarray(image_np), page_shape))
+        del image_np
+        if len(batch) >= batch_size:
+            results = _detect_batch(batch, model, device_obj, stride, imgsz, use_half, nms_options, scaleup, confidences)
+            batch = []  # the pages are dropped before their crops are handed out
+            yield from results
+    if batch:
+        results = _detect_batch(batch, model, device_obj, stride, imgsz, use_half, nms_options, scaleup, confidences)
+        batch = []
+        yield from results
+
+
+def iter_segment_chemical_structures_yode(keyed_images, **kwargs):
+    """
+    iter_detect_chemical_structures_yode for (key, image) pairs of full resolution pages: yields
+    (key, [segments, bboxes]) per image, in order, as segment_chemical_structures_yode gives them.
+    """
+    # map keeps no reference to the pages it has passed on
+    return iter_detect_chemical_structures_yode(map(lambda key_image: (*key_image, None), keyed_images), **kwargs)
+
+
+def segment_chemical_structures_yode_batch(images: list[np.ndarray], **kwargs) -> list:
+    """
+    segment_chemical_structures_yode for a list of images, batch_size (default YODE_BATCH_SIZE)
+    per forward pass. Returns one [segments, bboxes] per image, in order.
+    """
+    return [result for _, result in iter_segment_chemical_structures_yode(enumerate(images), **kwargs)]
+
+
+def segment_chemical_structures_yode(
+    image_np: np.ndarray,
+    **kwargs,
+) -> tuple[list[np.ndarray], list[tuple[int, int, int, int]]]:
+    """
+    Run YOLOv5 on a single numpy image and return (segments, bboxes).
+    - image_np: BGR np.ndarray (H, W, 3). Accepts any resolution.
+    - kwargs: the options of iter_detect_chemical_structures_yode.
+    - Returns:
+        segments: list of cropped np.ndarray images (from original)
+        bboxes:   list of (x1, y1, x2, y2) in original image coordinates
+    """
+    _check_image(image_np)
+    return segment_chemical_structures_yode_batch([image_np], **{**kwargs, 'batch_size': 1})[0]
@@ -0,0 +1,158 @@
+"""
+parse_cache.py
+--------------------
+Content-keyed cache of parsed spectra texts.
+
+"""
+
+import pickle
+import sqlite3
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 100000
+COMMIT_EVERY = 256
+
+
+def normalize_cache_text(text):
+    """The text part of the cache key; the parsers strip their input, so surrounding whitespace does not change a result."""
+    return text.strip()
+
+class ParseCache:
+    """
+    Bounded LRU of parse results keyed by (parser version, kind, normalised text), optionally backed
+    by a local SQLite file so export, scoring and plotting runs in other processes reuse it.
+
+    Results are kept pickled and every hit returns a fresh copy, so callers may change what they
+    get without touching the cache. Hits, disk hits and misses are counted for get_stats().
+    """
+    def __init__(self, parser_version, max_size=DEFAULT_CACHE_SIZE, db_path=None):
+        self.parser_version = parser_version
+        self.max_size = max_size
+        self.db_path = db_path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.connection = None
+        self.pending_writes = 0
+        if db_path is not None:
+            self.connection = sqlite3.connect(db_path)
+            self.create_tables()
+
+    def __repr__(self):
+        return f'ParseCache - version: {self.parser_version}, {self.get_stats()}'
+
+    def create_tables(self):
+        with self.connection:
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS parse_cache (
+                                        parser_version TEXT, kind TEXT, text TEXT, result BLOB,
+                                        PRIMARY KEY (parser_version, kind, text))''')
+
+    def flush(self):
+        if self.connection is not None and self.pending_writes:
+            self.connection.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    def _load(self, kind, text):
+        if self.connection is None:
+            return None
+        row = self.connection.execute('SELECT result FROM parse_cache WHERE parser_version=? AND kind=? AND text=?',
+                                      (self.parser_version, kind, text)).fetchone()
+        return row[0] if row else None
+
+    def _remember(self, kind, text, result):
+        self.entries[(kind, text)] = result
+        if len(self.entries)>self.max_size:
+            self.entries.popitem(last=False)
+
+    def _store(self, kind, text, result):
+        self._remember(kind, text, result)
+        if self.connection is not None:
+            # committed in batches, a commit per parsed text would cost more than the parse
+            self.connection.execute('INSERT OR REPLACE INTO parse_cache (parser_version, kind, text, result) VALUES (?, ?, ?, ?)',
+                                    (self.parser_version, kind, text, result))
+            self.pending_writes += 1
+            if self.pending_writes>=COMMIT_EVERY:
+                self.flush()
+
+    def get_or_parse(self, kind, text, parser):
+        """parser(kind, text), from the cache when this text was parsed before. Non-string texts are not cached."""
+        if not isinstance(text, str):
+            return parser(kind, text)
+        text = normalize_cache_text(text)
+        result = self.entries.get((kind, text))
+        if result is not None:
+            self.hits += 1
+            self.entries.move_to_end((kind, text))
+            return pickle.loads(result)
+        result = self._load(kind, text)
+        if result is not None:
+            self.disk_hits += 1
+            self._remember(kind, text, result)
+            return pickle.loads(result)
+        self.misses += 1
+        parsed = parser(kind, text)
+        self._store(kind, text, pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL))
+        return parsed
+
+    def get_or_parse_many(self, kind, texts, batch_parser):
+        """
+        get_or_parse for a list of texts: the ones not cached (in memory or on disk) are parsed
+        together by batch_parser(kind, texts), which returns one result per text.
+        """
+        results = [None]*len(texts)
+        missing = dict() # normalised text: positions, every distinct text is parsed once
+        uncached = []
+        for text_idx, text in enumerate(texts):
+            if not isinstance(text, str):
+                uncached.append(text_idx)
+                continue
+            text = normalize_cache_text(text)
+            result = self.entries.get((kind, text))
+            if result is not None:
+                self.hits += 1
+                self.entries.move_to_end((kind, text))
+            elif text not in missing:
+                result = self._load(kind, text)
+                if result is not None:
+                    self.disk_hits += 1
+                    self._remember(kind, text, result)
+            if result is not None:
+                results[text_idx] = pickle.loads(result)
+            else:
+                if text in missing:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                missing.setdefault(text, []).append(text_idx)
+        if uncached:
+            for text_idx, parsed in zip(uncached, batch_parser(kind, [texts[text_idx] for text_idx in uncached])):
+                results[text_idx] = parsed
+        if missing:
+            for text, parsed in zip(missing, batch_parser(kind, list(missing))):
+                result = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+                self._store(kind, text, result)
+                positions = missing[text]
+                results[positions[0]] = parsed
+                for text_idx in positions[1:]:
+                    results[text_idx] = pickle.loads(result)
+        return results
+
+    def clear(self):
+        self.entries.clear()
+        self.hits, self.disk_hits, self.misses = 0, 0, 0
+
+    def get_stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {'lookups': lookups,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits)/lookups, 3) if lookups else 0.0,
+                'size': len(self.entries)}
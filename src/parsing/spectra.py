@@ -4,28 +4,91 @@ spectra.py
 --------------------
 Parse textual descriptions of 1H NMR, 13C NMR, IR, and MS data.
 
+parse_spectra_batch() parses a whole batch of texts of one test type into a PeakTable of
+NumPy columns; the per-string parsers below are thin wrappers over it that give the
+usual dicts, lists and tuples, served from a content-keyed ParseCache (get_parse_cache()).
+
 """
 
 import re
+import atexit
+from functools import lru_cache
+from multiprocessing import Pool
 from typing import List, Dict, Tuple, Optional
 
 import numpy as np
 
-def parse_peaks(test_text, test_type):
-    parser = None
-    parsed_peaks = []
+from src.parsing.parse_cache import ParseCache, DEFAULT_CACHE_SIZE
+
+# bump whenever a parser gives different peaks, so cached results of the old parsers are not reused
+PARSER_VERSION = '2'
+BATCH_CHUNK_SIZE = 2000
+PARSE_CACHE_SIZE = 100000
+
+def get_spectrum_kind(test_type):
+    """'proton', 'carbon', 'ms' or 'ir' for the test types parse_peaks knows, otherwise None."""
+    if not isinstance(test_type, str):
+        return None
     if '1H NMR' in test_type:
-        parsed_peaks = parse_proton_nmr
+        return 'proton'
     elif '13C NMR' in test_type:
-        parser = parse_carbon_nmr
+        return 'carbon'
     elif test_type == 'MS':
-        parser = parse_ms
-        # parsed_peaks = run_hrms_checker_full_rot(test_text)
+        return 'ms'
     elif test_type =='IR':
-        parser = parse_ir
-    if parser:
-        parsed_peaks = parser(test_text)
-    return parsed_peaks
+        return 'ir'
+    return None
+
+def parse_peaks(test_text, test_type):
+    spectrum_kind = get_spectrum_kind(test_type)
+    if spectrum_kind is None:
+        return []
+    return _parse_cached(spectrum_kind, test_text)
+
+def parse_peaks_many(test_texts, test_types):
+    """
+    parse_peaks of every (test text, test type) pair. The texts that are not in the shared cache
+    are parsed together, in one parse_spectra_batch call per spectrum kind.
+    """
+    texts_by_kind = dict()
+    for text_idx, (test_text, test_type) in enumerate(zip(test_texts, test_types)):
+        texts_by_kind.setdefault(get_spectrum_kind(test_type), []).append(text_idx)
+    results = [[] for _ in test_texts]
+    for spectrum_kind, text_indices in texts_by_kind.items():
+        if spectrum_kind is None:
+            continue
+        parsed = _PARSE_CACHE.get_or_parse_many(spectrum_kind, [test_texts[text_idx] for text_idx in text_indices], _parse_batch)
+        for text_idx, peaks in zip(text_indices, parsed):
+            results[text_idx] = peaks
+    return results
+
+_PARSE_CACHE = ParseCache(PARSER_VERSION)
+
+def _close_parse_cache():
+    _PARSE_CACHE.close() # commit the last parsed texts
+
+atexit.register(_close_parse_cache) # once, closes whichever cache is shared at exit
+
+def get_parse_cache():
+    """The cache shared by parse_peaks and the per-string parsers."""
+    return _PARSE_CACHE
+
+def configure_parse_cache(max_size=DEFAULT_CACHE_SIZE, db_path=None):
+    """Replaces the shared cache, e.g. with one kept on disk for export and scoring runs."""
+    global _PARSE_CACHE
+    _PARSE_CACHE.close()
+    _PARSE_CACHE = ParseCache(PARSER_VERSION, max_size=max_size, db_path=db_path)
+    return _PARSE_CACHE
+
+def _parse_single(spectrum_kind, text):
+    return BATCH_PARSERS[spectrum_kind]([text]).to_records(0)
+
+def _parse_batch(spectrum_kind, texts):
+    peak_table = BATCH_PARSERS[spectrum_kind](texts)
+    return [peak_table.to_records(text_idx) for text_idx in range(len(texts))]
+
+def _parse_cached(spectrum_kind, text):
+    return _PARSE_CACHE.get_or_parse(spectrum_kind, text, _parse_single)
 
 
 
@@ -64,10 +127,220 @@ def _safe_float(x: str, default: Optional[float] = None) -> Optional[float]:
 def _center_of_range(a: float, b: float) -> float:
     return (a + b) / 2.0
 
+def _is_blank(text) -> bool:
+    return not isinstance(text, str) or not text.strip()
+
+def _nan_to_none(value):
+    return None if value!=value else value
+
+# -------------------------------
+# Peak tables
+# -------------------------------
+
+MULTIPLICITY_NAMES = ('dd', 'dt', 'td', 'dq', 'qt', 'tt', 's', 'd', 't', 'q', 'quin', 'quint', 'sext', 'sept', 'hept', 'm')
+# code 0 is no multiplicity, broad ones ('br s') come after the plain ones
+MULTIPLICITIES = (None,) + MULTIPLICITY_NAMES + tuple('br ' + mult for mult in MULTIPLICITY_NAMES)
+MULTIPLICITY_CODES = {mult: code for code, mult in enumerate(MULTIPLICITIES)}
+
+# 'text' is the index of the text a peak comes from; NaN stands for a missing range or integration
+PEAK_DTYPES = {
+    'proton': np.dtype([('text', np.int32), ('shift', np.float64), ('range_lo', np.float64), ('range_hi', np.float64),
+                        ('mult', np.int16), ('int', np.float64), ('j_start', np.int32), ('j_stop', np.int32)]),
+    'carbon': np.dtype([('text', np.int32), ('shift', np.float64)]),
+    'ir': np.dtype([('text', np.int32), ('wn', np.float64), ('intensity', np.float64), ('broad', np.bool_)]),
+    'ms': np.dtype([('text', np.int32), ('mz', np.float64), ('intensity', np.float64)]),
+}
+
+class PeakTable:
+    """
+    The peaks of a batch of texts of one spectrum kind as a structured NumPy array, in text order.
+
+    The peaks of text i are peaks[text_offsets[i]:text_offsets[i+1]]. Labels (the 1H peak info,
+    the IR token, the MS annotation) are a list aligned with the peaks; 1H J values are one flat
+    array indexed by the j_start/j_stop columns, and 1H frequencies one value per text.
+    """
+    def __init__(self, spectrum_kind, peaks, text_offsets, labels=None, j_values=None, frequencies=None):
+        self.spectrum_kind = spectrum_kind
+        self.peaks = peaks
+        self.text_offsets = text_offsets
+        self.labels = labels
+        self.j_values = j_values
+        self.frequencies = frequencies
+
+    def __len__(self):
+        return len(self.text_offsets) - 1
+
+    def __repr__(self):
+        return f'PeakTable - {self.spectrum_kind}, texts: {len(self)}, peaks: {len(self.peaks)}'
+
+    @classmethod
+    def from_columns(cls, spectrum_kind, rows, peaks_per_text, labels=None, j_values=None, frequencies=None):
+        text_offsets = np.zeros(len(peaks_per_text) + 1, dtype=np.int64)
+        np.cumsum(peaks_per_text, out=text_offsets[1:])
+        peaks = np.array(rows, dtype=PEAK_DTYPES[spectrum_kind]) if rows else np.zeros(0, dtype=PEAK_DTYPES[spectrum_kind])
+        if spectrum_kind=='proton':
+            j_values = np.array(j_values, dtype=np.float64)
+            frequencies = np.array(frequencies, dtype=np.float64)
+        return cls(spectrum_kind, peaks, text_offsets, labels, j_values, frequencies)
+
+    @classmethod
+    def concatenate(cls, tables):
+        """One table from the tables of consecutive chunks of a batch."""
+        spectrum_kind = tables[0].spectrum_kind
+        peaks_list, labels, j_values = [], [], []
+        num_texts, num_j_values = 0, 0
+        for table in tables:
+            peaks = table.peaks.copy()
+            peaks['text'] += num_texts
+            if spectrum_kind=='proton':
+                peaks['j_start'] += num_j_values
+                peaks['j_stop'] += num_j_values
+                j_values.append(table.j_values)
+                num_j_values += len(table.j_values)
+            peaks_list.append(peaks)
+            if table.labels is not None:
+                labels += table.labels
+            num_texts += len(table)
+        peaks_per_text = np.concatenate([np.diff(table.text_offsets) for table in tables])
+        text_offsets = np.zeros(num_texts + 1, dtype=np.int64)
+        np.cumsum(peaks_per_text, out=text_offsets[1:])
+        return cls(spectrum_kind, np.concatenate(peaks_list), text_offsets,
+                   labels if tables[0].labels is not None else None,
+                   np.concatenate(j_values) if spectrum_kind=='proton' else None,
+                   np.concatenate([table.frequencies for table in tables]) if spectrum_kind=='proton' else None)
+
+    def get_peaks(self, text_idx):
+        return self.peaks[self.text_offsets[text_idx]:self.text_offsets[text_idx + 1]]
+
+    def to_records(self, text_idx):
+        """The peaks of one text in the format of the per-string parser of the spectrum kind."""
+        start, stop = int(self.text_offsets[text_idx]), int(self.text_offsets[text_idx + 1])
+        rows = self.peaks[start:stop].tolist()
+        labels = self.labels[start:stop] if self.labels is not None else None
+        if self.spectrum_kind=='proton':
+            peaks = [{"shift": shift,
+                      "range": None if range_lo!=range_lo else (range_lo, range_hi),
+                      "mult": MULTIPLICITIES[mult],
+                      "J": self.j_values[j_start:j_stop].tolist(),
+                      "int": _nan_to_none(integ),
+                      "label": label}
+                     for (_, shift, range_lo, range_hi, mult, integ, j_start, j_stop), label in zip(rows, labels)]
+            return {"frequency_mhz": self.frequencies.item(text_idx), "peaks": peaks}
+        elif self.spectrum_kind=='carbon':
+            return [shift for _, shift in rows]
+        elif self.spectrum_kind=='ir':
+            return [{"wn": wn, "intensity": intensity, "broad": broad, "raw": raw}
+                    for (_, wn, intensity, broad), raw in zip(rows, labels)]
+        return [(mz, intensity, annotation) for (_, mz, intensity), annotation in zip(rows, labels)]
+
+def _parse_chunk(chunk):
+    spectrum_kind, texts = chunk
+    return BATCH_PARSERS[spectrum_kind](texts)
+
+def parse_spectra_batch(test_texts, spectrum_kind, num_workers=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Parses a batch of texts of one kind ('proton', 'carbon', 'ir', 'ms', or a test type such as
+    '1H NMR') into a PeakTable. With num_workers, batches larger than chunk_size are parsed in
+    chunks by a process pool.
+    """
+    if spectrum_kind not in BATCH_PARSERS:
+        spectrum_kind = get_spectrum_kind(spectrum_kind)
+        if spectrum_kind is None:
+            raise ValueError(f'No spectra parser for {spectrum_kind!r}')
+    test_texts = list(test_texts)
+    if not num_workers or num_workers<2 or len(test_texts)<=chunk_size:
+        return BATCH_PARSERS[spectrum_kind](test_texts)
+    chunks = [(spectrum_kind, test_texts[chunk_start:chunk_start + chunk_size]) for chunk_start in range(0, len(test_texts), chunk_size)]
+    with Pool(num_workers) as pool:
+        tables = pool.map(_parse_chunk, chunks)
+    return PeakTable.concatenate(tables)
+
 # -------------------------------
 # 1H NMR parsing
 # -------------------------------
 
+# Match sequences like: 7.26 (d, J = 8.4 Hz, 2H) or 7.52–7.40 (m, 3H)
+# Capture a number or range; optionally parentheses info that follows
+PROTON_PEAK_REGEX = re.compile(
+    r"(?P<shift>\d{1,2}(?:\.\d+)?(?:\s*[–-]\s*\d{1,2}(?:\.\d+)?)?)\s*"
+    r"(?:\((?P<info>[^)]*)\))?"
+)
+PROTON_BROAD_REGEX = re.compile(r"\bbr\b")
+PROTON_MULTIPLICITY_REGEX = re.compile(r"\b(dd|dt|td|dq|qt|tt|s|d|t|q|quin|quint|sext|sept|hept|m)\b")
+PROTON_J_REGEX = re.compile(r"J[^=\d]*=\s*([\d\.]+)")
+PROTON_INTEGRATION_REGEX = re.compile(r"(\d+(?:\.\d+)?)\s*H\b")
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_proton_shift(shift_str):
+    """(shift, range lo, range hi) of a shift or range string, NaN bounds for a single shift, None if out of 0-16 ppm."""
+    # Skip if this is obviously not a chemical shift (too large)
+    # Accept 0–16 ppm for 1H
+    # Handle ranges
+    if "–" in shift_str or "-" in shift_str:
+        parts = re.split(r"[–-]", shift_str)
+        if len(parts) != 2:
+            return None
+        lo = _safe_float(parts[0].strip())
+        hi = _safe_float(parts[1].strip())
+        if lo is None or hi is None:
+            return None
+        if not (0 <= lo <= 16 and 0 <= hi <= 16):
+            return None
+        return float(_center_of_range(lo, hi)), min(lo, hi), max(lo, hi)
+    shift_val = _safe_float(shift_str)
+    if shift_val is None or not (0 <= shift_val <= 16):
+        return None
+    return float(shift_val), np.nan, np.nan
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_proton_info(info_l):
+    """(multiplicity code, J values, integration or NaN) of the lowercased peak info."""
+    # multiplicity (support common cases)
+    mult = None
+    # Look for "br s" first
+    br = PROTON_BROAD_REGEX.search(info_l)
+    m_mult = PROTON_MULTIPLICITY_REGEX.search(info_l)
+    if m_mult:
+        mult = m_mult.group(1)
+        if br and mult != "br":
+            mult = "br " + mult
+
+    # J values in Hz
+    J = []
+    for mj in PROTON_J_REGEX.finditer(info_l):
+        v = _safe_float(mj.group(1))
+        if v is not None:
+            J.append(v)
+
+    # integration
+    integ = np.nan
+    mi = PROTON_INTEGRATION_REGEX.search(info_l)
+    if mi:
+        integ = _safe_float(mi.group(1))
+    return MULTIPLICITY_CODES[mult], tuple(J), integ
+
+def parse_proton_nmr_batch(texts) -> PeakTable:
+    rows, labels, j_values, frequencies, peaks_per_text = [], [], [], [], []
+    for text_idx, text in enumerate(texts):
+        num_peaks = len(rows)
+        if _is_blank(text):
+            frequencies.append(400.0)
+            peaks_per_text.append(0)
+            continue
+        frequencies.append(_parse_mhz(text, default=400.0))
+        for m in PROTON_PEAK_REGEX.finditer(_find_after_delta(text)):
+            shift = _parse_proton_shift(m.group("shift"))
+            if shift is None:
+                continue
+            # label (keep original info for annotation)
+            info = (m.group("info") or "").strip()
+            mult_code, J, integ = _parse_proton_info(info.lower())
+            rows.append((text_idx, *shift, mult_code, integ, len(j_values), len(j_values) + len(J)))
+            j_values += J
+            labels.append(info)
+        peaks_per_text.append(len(rows) - num_peaks)
+    return PeakTable.from_columns('proton', rows, peaks_per_text, labels, j_values, frequencies)
+
 def parse_proton_nmr(text: str) -> Dict:
     """
     Parse 1H NMR textual description.
@@ -80,210 +353,140 @@ def parse_proton_nmr(text: str) -> Dict:
           ]
         }
     """
-    if not isinstance(text, str) or not text.strip():
-        return {"frequency_mhz": 400.0, "peaks": []}
-
-    freq = _parse_mhz(text, default=400.0)
-    s = _find_after_delta(text)
-
-    # Match sequences like: 7.26 (d, J = 8.4 Hz, 2H) or 7.52–7.40 (m, 3H)
-    # Capture a number or range; optionally parentheses info that follows
-    pat = re.compile(
-        r"(?P<shift>\d{1,2}(?:\.\d+)?(?:\s*[–-]\s*\d{1,2}(?:\.\d+)?)?)\s*"
-        r"(?:\((?P<info>[^)]*)\))?"
-    )
-
-    peaks = []
-    for m in pat.finditer(s):
-        shift_str = m.group("shift")
-        info = (m.group("info") or "").strip()
-
-        # Skip if this is obviously not a chemical shift (too large)
-        # Accept 0–16 ppm for 1H
-        # Handle ranges
-        if "–" in shift_str or "-" in shift_str:
-            parts = re.split(r"[–-]", shift_str)
-            if len(parts) == 2:
-                lo = _safe_float(parts[0].strip())
-                hi = _safe_float(parts[1].strip())
-                if lo is None or hi is None:
-                    continue
-                if not (0 <= lo <= 16 and 0 <= hi <= 16):
-                    continue
-                shift_val = _center_of_range(lo, hi)
-                shift_range = (min(lo, hi), max(lo, hi))
-            else:
-                continue
-        else:
-            shift_val = _safe_float(shift_str)
-            if shift_val is None or not (0 <= shift_val <= 16):
-                continue
-            shift_range = None
-
-        info_l = info.lower()
-
-        # multiplicity (support common cases)
-        mult = None
-        # Look for "br s" first
-        br = re.search(r"\bbr\b", info_l)
-        m_mult = re.search(
-            r"\b(dd|dt|td|dq|qt|tt|s|d|t|q|quin|quint|sext|sept|hept|m)\b",
-            info_l
-        )
-        if m_mult:
-            mult = m_mult.group(1)
-            if br and mult != "br":
-                mult = "br " + mult
-
-        # J values in Hz
-        J = []
-        for mj in re.finditer(r"J[^=\d]*=\s*([\d\.]+)", info_l):
-            v = _safe_float(mj.group(1))
-            if v is not None:
-                J.append(v)
-
-        # integration
-        integ = None
-        mi = re.search(r"(\d+(?:\.\d+)?)\s*H\b", info_l)
-        if mi:
-            integ = _safe_float(mi.group(1))
-
-        # label (keep original info for annotation)
-        label = info.strip()
-
-        peaks.append({
-            "shift": float(shift_val),
-            "range": shift_range,
-            "mult": mult,
-            "J": J,
-            "int": integ,
-            "label": label
-        })
-
-    return {"frequency_mhz": freq, "peaks": peaks}
+    return _parse_cached('proton', text)
 
 # -------------------------------
 # 13C NMR parsing
 # -------------------------------
 
+CARBON_SHIFT_REGEX = re.compile(r"(\d{1,3}(?:\.\d+)?)")
+
+def parse_carbon_nmr_batch(texts) -> PeakTable:
+    rows, peaks_per_text = [], []
+    for text_idx, text in enumerate(texts):
+        if _is_blank(text):
+            peaks_per_text.append(0)
+            continue
+        # Extract numbers 0–250 (ppm)
+        vals = sorted(v for v in map(float, CARBON_SHIFT_REGEX.findall(_find_after_delta(text))) if 0 <= v <= 250)
+        # De-duplicate near-identical shifts (e.g., 128.9 and 129.0 from rounding)
+        merged = []
+        for v in vals:
+            if not merged or abs(v - merged[-1]) > 0.05:
+                merged.append(v)
+        rows += [(text_idx, v) for v in merged]
+        peaks_per_text.append(len(merged))
+    return PeakTable.from_columns('carbon', rows, peaks_per_text)
+
 def parse_carbon_nmr(text: str) -> List[float]:
     """
     Parse 13C NMR textual description into a list of shifts (ppm).
     """
-    if not isinstance(text, str) or not text.strip():
-        return []
-
-    s = _find_after_delta(text)
-    # Extract numbers 0–250 (ppm)
-    vals = []
-    for m in re.finditer(r"(\d{1,3}(?:\.\d+)?)", s):
-        v = _safe_float(m.group(1))
-        if v is not None and 0 <= v <= 250:
-            vals.append(v)
-
-    # De-duplicate near-identical shifts (e.g., 128.9 and 129.0 from rounding)
-    vals = sorted(vals)
-    merged = []
-    for v in vals:
-        if not merged or abs(v - merged[-1]) > 0.05:
-            merged.append(v)
-    return merged
+    return _parse_cached('carbon', text)
 
 # -------------------------------
 # IR parsing and plotting
 # -------------------------------
 
+IR_TOKEN_SPLIT_REGEX = re.compile(r"[;,]")
+IR_BROAD_REGEX = re.compile(r"\bbr\b|broad")
+IR_BAND_REGEX = re.compile(r"(\d{3,4}(?:\.\d+)?)(?:\s*[–-]\s*(\d{3,4}(?:\.\d+)?))?")
+# Intensities mapped from tokens, in the order they are looked for
+IR_INTENSITY_REGEXES = [(re.compile(r"(?<![a-z])vs(?![a-z])"), 1.0),
+                        (re.compile(r"(?<![a-z])vw(?![a-z])"), 0.2),
+                        (re.compile(r"(?<![a-z])s(?![a-z])"), 0.8),
+                        (re.compile(r"(?<![a-z])m(?![a-z])"), 0.55),
+                        (re.compile(r"(?<![a-z])w(?![a-z])"), 0.3)]
+
+def _get_ir_intensity(tok: str) -> float:
+    for intensity_regex, intensity in IR_INTENSITY_REGEXES:
+        if intensity_regex.search(tok):
+            return intensity
+    return 0.5
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_ir_token(tok):
+    """(wn, intensity, broad) of every band of a stripped, lowercased IR token."""
+    broad = bool(IR_BROAD_REGEX.search(tok))
+    bands = []
+    # Find all single numbers or ranges in cm^-1
+    for m in IR_BAND_REGEX.finditer(tok):
+        a = _safe_float(m.group(1))
+        b = _safe_float(m.group(2)) if m.group(2) else None
+        if a is not None and 400 <= a <= 4000:
+            inten = _get_ir_intensity(tok)
+            if b is not None and 400 <= b <= 4000:
+                lo, hi = sorted([a, b])
+                # Represent a broad band by sampling the center
+                bands.append(((lo + hi) / 2.0, inten, True))
+            else:
+                bands.append((a, inten, broad))
+    return tuple(bands)
+
+def parse_ir_batch(texts) -> PeakTable:
+    rows, labels, peaks_per_text = [], [], []
+    for text_idx, text in enumerate(texts):
+        num_peaks = len(rows)
+        if not _is_blank(text):
+            for tok in IR_TOKEN_SPLIT_REGEX.split(_clean_text(text).lower()):
+                tok = tok.strip()
+                if not tok:
+                    continue
+                for wn, inten, broad in _parse_ir_token(tok):
+                    rows.append((text_idx, wn, inten, broad))
+                    labels.append(tok)
+        peaks_per_text.append(len(rows) - num_peaks)
+    return PeakTable.from_columns('ir', rows, peaks_per_text, labels)
+
 def parse_ir(text: str) -> List[Dict]:
     """
     Parse IR textual description.
     Returns a list of dicts: {"wn": float, "intensity": float, "broad": bool, "raw": str}
     Intensities mapped from tokens: vs/s/m/w/vw -> 1.0/0.8/0.55/0.3/0.2. Default 0.5.
     """
-    if not isinstance(text, str) or not text.strip():
-        return []
-
-    s = _clean_text(text).lower()
-    tokens = re.split(r"[;,]", s)
-
-    def intensity_from_token(tok: str) -> float:
-        m = re.search(r"(?<![a-z])vs(?![a-z])", tok)
-        if m:
-            return 1.0
-        m = re.search(r"(?<![a-z])vw(?![a-z])", tok)
-        if m:
-            return 0.2
-        m = re.search(r"(?<![a-z])s(?![a-z])", tok)
-        if m:
-            return 0.8
-        m = re.search(r"(?<![a-z])m(?![a-z])", tok)
-        if m:
-            return 0.55
-        m = re.search(r"(?<![a-z])w(?![a-z])", tok)
-        if m:
-            return 0.3
-        return 0.5
-
-    entries = []
-    for tok in tokens:
-        tok = tok.strip()
-        if not tok:
-            continue
-        broad = bool(re.search(r"\bbr\b|broad", tok))
-        # Find all single numbers or ranges in cm^-1
-        for m in re.finditer(r"(\d{3,4}(?:\.\d+)?)(?:\s*[–-]\s*(\d{3,4}(?:\.\d+)?))?", tok):
-            a = _safe_float(m.group(1))
-            b = _safe_float(m.group(2)) if m.group(2) else None
-            if a is not None and 400 <= a <= 4000:
-                inten = intensity_from_token(tok)
-                if b is not None and 400 <= b <= 4000:
-                    lo, hi = sorted([a, b])
-                    # Represent a broad band by sampling the center
-                    wn = (lo + hi) / 2.0
-                    entries.append({"wn": wn, "intensity": inten, "broad": True, "raw": tok})
-                else:
-                    entries.append({"wn": a, "intensity": inten, "broad": broad, "raw": tok})
-    return entries
+    return _parse_cached('ir', text)
 
 # -------------------------------
 # MS parsing
 # -------------------------------
 
+MS_PAIR_REGEX = re.compile(r"(\d{2,5}(?:\.\d+)?)\s*\(\s*(\d{1,3})\s*\)")
+MS_MZ_REGEX = re.compile(r"(\d{2,5}(?:\.\d+)?)")
+
+def parse_ms_batch(texts) -> PeakTable:
+    rows, base_intensities, labels, peaks_per_text = [], [], [], []
+    for text_idx, text in enumerate(texts):
+        if _is_blank(text):
+            peaks_per_text.append(0)
+            continue
+        s = _clean_text(text)
+        # Find pairs like: 273 (100), 275 (34), ...
+        pairs = [(mz, inten) for mz, inten in ((float(mz), float(inten)) for mz, inten in MS_PAIR_REGEX.findall(s)) if 10 <= mz <= 5000]
+        if not pairs:
+            # If no explicit intensities, collect m/z values and set equal intensities
+            mzs = sorted(set(mz for mz in map(float, MS_MZ_REGEX.findall(s)) if 10 <= mz <= 5000))
+            pairs = [(mz, 100.0) for mz in mzs]
+        base_intensity = max([inten for _, inten in pairs], default=0.0)
+        rows += [(text_idx, mz, inten) for mz, inten in pairs]
+        base_intensities += [base_intensity]*len(pairs)
+        labels += [""]*len(pairs)
+        peaks_per_text.append(len(pairs))
+    peak_table = PeakTable.from_columns('ms', rows, peaks_per_text, labels)
+    # Normalize to base peak = 100, all texts at once (a text without any m/z gives no peaks)
+    base_intensities = np.array(base_intensities, dtype=np.float64)
+    has_base = base_intensities > 0
+    peak_table.peaks['intensity'][has_base] = 100.0 * peak_table.peaks['intensity'][has_base] / base_intensities[has_base]
+    return peak_table
+
 def parse_ms(text: str) -> List[Tuple[float, float, str]]:
     """
     Parse MS text. Returns list of (mz, rel_intensity, annotation).
     If intensities (%) are present in parentheses after an m/z, they are used.
     Otherwise, equal intensities are assigned.
     """
-    if not isinstance(text, str) or not text.strip():
-        return []
-
-    s = _clean_text(text)
+    return _parse_cached('ms', text)
 
-    # Find pairs like: 273 (100), 275 (34), ...
-    pairs = []
-    for m in re.finditer(r"(\d{2,5}(?:\.\d+)?)\s*\(\s*(\d{1,3})\s*\)", s):
-        mz = _safe_float(m.group(1))
-        inten = _safe_float(m.group(2))
-        if mz is not None and 10 <= mz <= 5000 and inten is not None:
-            pairs.append((mz, inten, ""))
-
-    if not pairs:
-        # If no explicit intensities, collect m/z values and set equal intensities
-        mzs = []
-        for m in re.finditer(r"(\d{2,5}(?:\.\d+)?)", s):
-            mz = _safe_float(m.group(1))
-            if mz is not None and 10 <= mz <= 5000:
-                mzs.append(mz)
-        mzs = sorted(set(mzs))
-        pairs = [(mz, 100.0, "") for mz in mzs]
-
-    # Normalize to base peak = 100
-    intensities = np.array([p[1] for p in pairs], dtype=float)
-    if intensities.max() > 0:
-        intensities = 100.0 * intensities / intensities.max()
-
-    result = []
-    for (p, new_i) in zip(pairs, intensities):
-        result.append((p[0], float(new_i), p[2]))
-
-    return result
+BATCH_PARSERS = {'proton': parse_proton_nmr_batch,
+                 'carbon': parse_carbon_nmr_batch,
+                 'ir': parse_ir_batch,
+                 'ms': parse_ms_batch}
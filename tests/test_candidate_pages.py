@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    sys.modules.setdefault(name, MagicMock())
+
+import pymupdf
+
+from src.chemsie.internal import wrappers
+from src.chemsie.internal.full_process import get_candidate_pages
+from src.chemsie.internal.mol_pic import get_selected_pages, iter_rendered_pages, render_page_images
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+
+def make_document_lines(test_pages, num_pages=10):
+    lines = []
+    for page_num in range(num_pages):
+        lines.append((f'{page_num}_0', 'The reaction was run overnight.', (0.1, 0.1, 0.2, 0.9)))
+        if page_num in test_pages:
+            lines.append((f'{page_num}_1', '1H NMR (400 MHz, CDCl3) δ 7.26 (s, 1H).', (0.3, 0.1, 0.4, 0.9)))
+    return DocumentLines.from_tuples(lines)
+
+class TestCandidatePages(unittest.TestCase):
+
+    def test_candidate_pages(self):
+        """Pages with a test line and their neighbours; none without test lines."""
+        self.assertEqual(get_candidate_pages(make_document_lines({0, 4, 8}), 1), [0, 1, 3, 4, 5, 7, 8, 9])
+        self.assertEqual(get_candidate_pages(make_document_lines({4}), 0), [4])
+        self.assertEqual(get_candidate_pages(make_document_lines(set())), [])
+
+    def test_selected_pages(self):
+        """Only the requested pages are rendered, in page order; no pages means all of them."""
+        self.assertEqual(get_selected_pages(5, [4, 7, -1, 2, 2]), [2, 4])
+        self.assertEqual(get_selected_pages(3, []), [0, 1, 2])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = os.path.join(tmp_dir, 'doc.pdf')
+            pdf_document = pymupdf.open()
+            for _ in range(6):
+                pdf_document.new_page(width=36, height=36)
+            pdf_document.save(pdf_path)
+            pdf_document.close()
+            rendered = [page_num for page_num, _, _ in iter_rendered_pages(pdf_path, threading.Semaphore(6), pages=[5, 1, 1, 9])]
+            self.assertEqual(rendered, [1, 5])
+            page_images = render_page_images(pdf_path, pages=[2])
+            self.assertEqual([page_image is not None for page_image in page_images], [False, False, True, False, False, False])
+
+    @patch.object(wrappers, 'extract_metadata_from_raw_pdf', MagicMock())
+    def test_batched_doc_list(self):
+        """Across documents, the candidate pages come from one text pass whose lines reach the sweep, pages
+        wins over them, and the page counts of the run are kept."""
+        def fake_pic_doc_list(pdf_paths, pages_by_path=None, page_stats=None, **kwargs):
+            page_stats['skipped_pages'] = page_stats.get('skipped_pages', 0) + len(pdf_paths)
+            detected_pages.append(pages_by_path)
+            return {pdf_path: [] for pdf_path in pdf_paths}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_paths = [os.path.join(tmp_dir, pdf_file) for pdf_file in ('a.pdf', 'b.pdf')]
+            for pdf_path in pdf_paths:
+                open(pdf_path, 'wb').close()
+            lines_by_path = {pdf_paths[0]: make_document_lines({4}), pdf_paths[1]: make_document_lines(set())}
+            for pages, expected_pages in ((None, {pdf_paths[0]: [3, 4, 5], pdf_paths[1]: []}), ([0, 2], dict.fromkeys(pdf_paths, [0, 2]))):
+                detected_pages, page_stats = [], dict()
+                with patch.object(wrappers, 'extract_document_lines', MagicMock(side_effect=lines_by_path.get)) as extract_lines, \
+                     patch.object(wrappers, 'process_pic_doc_list', fake_pic_doc_list), \
+                     patch.object(wrappers, 'process_doc_pics_first', MagicMock(return_value=([], []))) as doc_pics_first:
+                    wrappers.process_doc_list_pics_first(tmp_dir, verbose=False, batch_across_docs=True, page_stats=page_stats,
+                                                         candidate_pages=True, page_neighbourhood=1, pages=pages)
+                self.assertEqual(detected_pages, [expected_pages])
+                self.assertEqual(page_stats, {'skipped_pages': 2})
+                self.assertEqual(extract_lines.call_count, 0 if pages else 2)
+                for call in doc_pics_first.call_args_list:
+                    pdf_path = call.args[0]
+                    self.assertIs(call.kwargs['page_stats'], page_stats)
+                    self.assertIs(call.kwargs['page_lines_with_multi_idx'], None if pages else lines_by_path[pdf_path])
+
+if __name__ == '__main__':
+    unittest.main()
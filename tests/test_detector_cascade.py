@@ -0,0 +1,86 @@
+import unittest
+import os
+import math
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import dark_pixel_boxes, stretch_coords, patch_yode
+
+import pymupdf
+
+from src.chemsie.internal.detector_cascade import get_expected_structures, get_escalation_reasons
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf
+
+def draw_ring(page, center=(300, 300), radius=20, color=(0, 0, 0)):
+    page.draw_polyline([(center[0] + radius*math.cos(k*math.pi/3), center[1] + radius*math.sin(k*math.pi/3)) for k in range(7)],
+                       color=color, width=2)
+
+def make_document():
+    """Pages: a ring, a grey ring (borderline), a ring in a paragraph, a ring where the text expects two."""
+    pdf_document = pymupdf.open()
+    draw_ring(pdf_document.new_page())
+    draw_ring(pdf_document.new_page(), color=(0.3, 0.3, 0.3))
+    page = pdf_document.new_page()
+    for line in range(15):
+        page.insert_text((200, 250 + 10*line), 'The mixture was stirred at room temperature for 2 h.', fontsize=9)
+    draw_ring(page, (300, 320), radius=10)
+    draw_ring(pdf_document.new_page())
+    return pdf_document
+
+def fake_segment_page_decimer(im):
+    return [[im[100:200, 100:200].copy()], [(100, 100, 200, 200)]]
+
+class TestDetectorCascade(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, 'doc.pdf')
+        with make_document() as pdf_document:
+            pdf_document.save(self.pdf_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_expected_structures(self):
+        """One structure per 1H and 13C NMR line pair, per line of the other tests, the most of any test."""
+        self.assertEqual(get_expected_structures({3: {'NMR': 4, 'HRMS': 1}, 4: {'NMR': 1}, 5: {'NMR': 2, 'HRMS': 3}}),
+                         {3: 2, 4: 1, 5: 3})
+
+    def test_escalation_reasons(self):
+        """Borderline confidences, boxes over text and fewer boxes than expected."""
+        page_shape = (3508, 2480, 3)
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            ring_box = (round(275*300/72), round(275*300/72), round(325*300/72), round(325*300/72))
+            self.assertEqual(get_escalation_reasons(pdf_document[0], [ring_box], [0.9], page_shape), [])
+            self.assertEqual(get_escalation_reasons(pdf_document[0], [ring_box], [0.3], page_shape), ['borderline'])
+            text_box = (round(200*300/72), round(240*300/72), round(420*300/72), round(400*300/72))
+            self.assertEqual(get_escalation_reasons(pdf_document[2], [text_box], [0.9], page_shape), ['text_overlap'])
+            self.assertEqual(get_escalation_reasons(pdf_document[3], [], [], page_shape, expected_structures=1), ['missing'])
+
+    @patch_yode(dark_pixel_boxes, stretch_coords)
+    def test_cascade(self):
+        """DECIMER on the uncertain pages only, the backend of every page recorded."""
+        page_stats, page_backends = dict(), dict()
+        with patch.object(mol_pic, 'segment_page_decimer', MagicMock(side_effect=fake_segment_page_decimer)) as segment_page_decimer:
+            mol_pics = extract_pics_from_pdf(self.pdf_path, backend='cascade', page_stats=page_stats, expected_structures={3: 2},
+                                             page_backends=page_backends)
+        self.assertEqual(segment_page_decimer.call_count, 3)
+        self.assertEqual(page_backends, {0: 'yode', 1: 'decimer', 2: 'decimer', 3: 'decimer'})
+        self.assertEqual([mol_pic.page_num for mol_pic in mol_pics], [0, 1, 2, 3])
+        self.assertEqual({key: page_stats[key] for key in ('escalated_pages', 'borderline_pages', 'text_overlap_pages', 'missing_pages')},
+                         {'escalated_pages': 3, 'borderline_pages': 1, 'text_overlap_pages': 1, 'missing_pages': 1})
+        self.assertTrue(np.allclose(mol_pics[1].bbox, (100*100/2480, 100*100/3508, 100*100/2480, 100*100/3508), atol=0.01))
+        with self.assertRaises(ValueError):
+            extract_pics_from_pdf(self.pdf_path, backend='fast')
+
+if __name__ == '__main__':
+    unittest.main()
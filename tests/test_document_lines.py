@@ -0,0 +1,58 @@
+import unittest
+import pickle
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.text_processing.document_lines import DocumentLines, join_lines
+from src.chemsie.internal.test_text_line import get_word_line_idx, get_text_bbox_list
+from src.chemsie.internal.test_text_line import extract_test_text_lines, load_default_test_names
+from src.chemsie.internal.spectra_scanner import DocumentTestLineScanner
+from src.chemsie.utils.general import LineIndex
+
+def make_page_lines():
+    texts = ['methyl 4-methoxybenzoate (3a)', '1H NMR (400 MHz, CDCl3) δ 7.99 (d, 2H)', 'ethyl acetate was added',
+             '13C NMR (101 MHz, CDCl3) δ 166.9', 'N', 'MR of the crude']
+    return [(f'{line_idx//4}_{line_idx%4}', text, (10.0*line_idx, 5.0, 10.0*line_idx + 8.5, 90.0 - line_idx))
+            for line_idx, text in enumerate(texts)]
+
+class TestDocumentLines(unittest.TestCase):
+
+    def test_views_behave_like_tuple_lists(self):
+        """Indexing, slicing and the columnar fast paths must give what the tuple list gives."""
+        page_lines = make_page_lines()
+        document_lines = DocumentLines.from_tuples(page_lines)
+        self.assertEqual(document_lines.to_tuples(), page_lines)
+        self.assertEqual(document_lines[-1], page_lines[-1])
+        for start, stop in [(0, 6), (1, 5), (2, 2), (3, 10)]:
+            view = document_lines[start:stop]
+            self.assertEqual(list(view), page_lines[start:stop])
+            self.assertEqual(get_word_line_idx(view, 'NMR'), get_word_line_idx(page_lines[start:stop], 'NMR'))
+            self.assertEqual(LineIndex(view).get_actual_idx('1_0'), LineIndex(page_lines[start:stop]).get_actual_idx('1_0'))
+        self.assertEqual(get_text_bbox_list(document_lines, '0_1', '1_1'), get_text_bbox_list(page_lines, '0_1', '1_1'))
+        self.assertEqual(list(join_lines([document_lines[:2], document_lines[2:5]])), page_lines[:5])
+        unpickled_view = pickle.loads(pickle.dumps(document_lines[1:3]))
+        self.assertEqual(list(unpickled_view), page_lines[1:3])
+        self.assertEqual(len(unpickled_view.text_buffer), len(page_lines[1][1]) + len(page_lines[2][1]))
+
+    def test_scanner_matches_segment_extraction(self):
+        """Scanner lookups by line range must give what extract_test_text_lines gives on those lines."""
+        texts = ['methyl 4-methoxybenzoate (3a)', 'Rf = 0.4 (hexane)', '1H NMR (400 MHz, CDCl3) δ 7.99 (d, J = 8.8 Hz, 2H), 3.89 (s, 3H).',
+                 '13C NMR (101 MHz, CDCl3) δ 166.9, 163.3, 131.6.', 'IR (neat) 1715, 1605 cm-1.',
+                 'HRMS (ESI) calcd for C9H10O3 [M+H]+ 167.0703, found 167.0701.']*3
+        document_lines = DocumentLines.from_tuples([(f'{line_idx//7}_{line_idx%7}', text, (5.0*(line_idx%7), 5.0, 5.0*(line_idx%7) + 4.0, 90.0))
+                                                    for line_idx, text in enumerate(texts)])
+        scanner = DocumentTestLineScanner(document_lines)
+        for start, end in [(0, 18), (0, 6), (3, 9), (6, 18), (12, 13)]:
+            for test_type, test_patterns in load_default_test_names().items():
+                expected = extract_test_text_lines(document_lines[start:end], test_names=test_patterns)
+                found = scanner.get_test_text_lines(test_type, start, end)
+                self.assertEqual(sorted(map(repr, found)), sorted(map(repr, expected)))
+        # seven lines a page
+        self.assertEqual(scanner.get_test_line_counts(), {0: {'NMR': 2, 'IR': 1, 'Rf': 1, 'HRMS': 1}, 1: {'NMR': 2, 'IR': 1, 'Rf': 2, 'HRMS': 1},
+                                                          2: {'NMR': 2, 'IR': 1, 'HRMS': 1}})
+
+if __name__ == '__main__':
+    unittest.main()
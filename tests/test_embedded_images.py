@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import dark_pixel_boxes, stretch_coords, patch_yode
+
+import pymupdf
+
+from src.chemsie.internal.embedded_images import get_placed_images, get_embedded_image_pages
+from src.chemsie.internal.mol_pic import extract_pics_from_pdf, iter_page_segments_yode
+
+def make_structure_pixmap():
+    # 400x300 px, a black 150x100 px block at (150, 100)
+    samples = np.full((300, 400, 3), 255, dtype=np.uint8)
+    samples[100:200, 150:300] = 0
+    return pymupdf.Pixmap(pymupdf.csRGB, 400, 300, samples.tobytes(), False)
+
+def make_document():
+    """Pages: an image (144 dpi), an image with a caption, an image over a ring, a rotated image, text."""
+    pdf_document = pymupdf.open()
+    pdf_document.new_page().insert_image(pymupdf.Rect(100, 100, 300, 250), pixmap=make_structure_pixmap())
+    page = pdf_document.new_page()
+    page.insert_image(pymupdf.Rect(100, 100, 300, 250), pixmap=make_structure_pixmap())
+    page.insert_text((100, 270), 'Compound 3a')
+    page = pdf_document.new_page()
+    page.insert_image(pymupdf.Rect(100, 100, 300, 250), pixmap=make_structure_pixmap())
+    page.draw_polyline([(400, 100), (420, 110), (420, 130), (400, 140), (380, 130), (380, 110), (400, 100)])
+    pdf_document.new_page().insert_image(pymupdf.Rect(100, 100, 250, 300), pixmap=make_structure_pixmap(), rotate=90)
+    pdf_document.new_page().insert_text((72, 72), 'General procedure')
+    return pdf_document
+
+@patch_yode(dark_pixel_boxes, stretch_coords)
+class TestEmbeddedImages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, 'doc.pdf')
+        with make_document() as pdf_document:
+            pdf_document.save(self.pdf_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_placed_images(self):
+        """Upright images on pages without drawings; not with a drawn ring, a rotated image or no image."""
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            placed_images = get_placed_images(pdf_document, 0)
+            self.assertEqual(len(placed_images), 1)
+            self.assertEqual(placed_images[0][1], pymupdf.Rect(100, 100, 300, 250))
+            self.assertEqual(list(get_embedded_image_pages(pdf_document, range(pdf_document.page_count))), [0, 1])
+
+    def test_native_crops(self):
+        """Crops come at the native resolution of the image, the boxes are the ones of the rendered page."""
+        page_stats = dict()
+        (_, embedded_shape, (embedded_segments, embedded_bboxes)), = iter_page_segments_yode(
+            [self.pdf_path], pages_by_file={self.pdf_path: [0]}, page_stats=page_stats)
+        (_, rendered_shape, (_, rendered_bboxes)), = iter_page_segments_yode(
+            [self.pdf_path], pages_by_file={self.pdf_path: [0]}, embedded_images=False)
+        self.assertEqual(page_stats['embedded_image_pages'], 1)
+        self.assertEqual(embedded_shape, rendered_shape)
+        # the 100x150 px block, to the pixel the detection size allows
+        self.assertTrue(np.allclose(embedded_segments[0].shape, (100, 150, 3), atol=1))
+        self.assertLess(embedded_segments[0].mean(), 5)
+        self.assertTrue(np.allclose(embedded_bboxes[0], rendered_bboxes[0], atol=8)) # 300 dpi pixels
+
+    def test_mol_pic_bboxes(self):
+        """The same page-percent bboxes with and without the embedded image path."""
+        embedded = extract_pics_from_pdf(self.pdf_path, backend='yode', pages=[0, 1])
+        rendered = extract_pics_from_pdf(self.pdf_path, backend='yode', pages=[0], embedded_images=False)
+        self.assertEqual([mol_pic.page_num for mol_pic in embedded], [0, 1])
+        self.assertTrue(np.allclose(embedded[0].bbox, rendered[0].bbox, atol=0.5))
+        self.assertTrue(np.allclose(embedded[0].bbox, (100*175/595, 100*150/842, 100*75/595, 100*50/842), atol=0.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.utils.general import LineIndex, get_actual_idx_from_multi_idx, get_page_num_and_line_num_from_multi_idx
+
+class TestLineIndex(unittest.TestCase):
+
+    def test_index_matches_scan(self):
+        """LineIndex lookups must give the positions (and False for missing lines) of the linear scan."""
+        page_lines = [(f'{page_num}_{line_num}', 'text', (0, 0, 1, 1)) for page_num in range(3) for line_num in range(12)]
+        multi_idx_list = [multi_idx for multi_idx, *_ in page_lines]
+        segment_lines = page_lines[5:20]
+        for requested_multi_idx in ['0_0', '0_11', '1_0', '2_11', '3_0', '1_100']:
+            self.assertEqual(get_actual_idx_from_multi_idx(LineIndex(page_lines), requested_multi_idx),
+                             get_actual_idx_from_multi_idx(multi_idx_list, requested_multi_idx))
+            self.assertEqual(LineIndex(segment_lines).get_actual_idx(requested_multi_idx),
+                             get_actual_idx_from_multi_idx(multi_idx_list[5:20], requested_multi_idx))
+        self.assertEqual(tuple(get_page_num_and_line_num_from_multi_idx('12_3')), (12, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import pickle
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.tokenizer.base_tokenize import tokenize
+from src.chemsie.internal.tokenizer.molecule_name import load_default_molecule_name_tokens, MoleculeNameScorer, get_molecule_name_probability
+
+class TestMoleculeNameScorer(unittest.TestCase):
+
+    def test_scores_match_tokenize(self):
+        """The compiled scorer must give the scores of the tokenize path, also after pickling."""
+        lines = ['tert-butyl 4-(2-fluorophenyl)piperazine-1-carboxylate (3b)',
+                 '(2S)-2-methoxy-1-phenylpropan-1-ol',
+                 'The mixture was stirred for two hours',
+                 '']
+        token_patterns = load_default_molecule_name_tokens()
+        expected = [100*sum(map(len, tokenize(line, token_patterns)))/len(line) if line else 0 for line in lines]
+        scorer = MoleculeNameScorer()
+        self.assertEqual(scorer.score_lines(lines), expected)
+        self.assertEqual(pickle.loads(pickle.dumps(scorer)).score_lines(lines), expected)
+        self.assertEqual([get_molecule_name_probability(line) for line in lines], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import math
+import tempfile
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import fixed_boxes, patch_yode
+
+import pymupdf
+
+from src.chemsie.internal.page_filter import get_page_content, get_structure_free_pages
+from src.chemsie.internal.mol_pic import iter_page_segments_yode
+
+def draw_ring(page, center=(100, 100), radius=20):
+    page.draw_polyline([(center[0] + radius*math.cos(k*math.pi/3), center[1] + radius*math.sin(k*math.pi/3)) for k in range(7)])
+
+def draw_closed_ring(page, center=(100, 100), radius=20, num_bonds=6):
+    # one closed path (m, l for all bonds but the last, h), as PyMuPDF and most exporters write polygons
+    shape = page.new_shape()
+    shape.draw_polyline([(center[0] + radius*math.cos(2*k*math.pi/num_bonds), center[1] + radius*math.sin(2*k*math.pi/num_bonds))
+                         for k in range(num_bonds)])
+    shape.finish(closePath=True)
+    shape.commit()
+
+def make_document():
+    """Pages: text, ring, table, image, underlined text, ring in a form XObject, ring with text."""
+    pdf_document = pymupdf.open()
+    page = pdf_document.new_page()
+    page.insert_text((72, 72), 'General procedure for the synthesis of 3a.')
+    draw_ring(pdf_document.new_page())
+    page = pdf_document.new_page()
+    for row in range(20):
+        page.draw_rect(pymupdf.Rect(72, 72 + 12*row, 540, 84 + 12*row))
+    page = pdf_document.new_page()
+    page.insert_image(pymupdf.Rect(72, 72, 172, 172), pixmap=pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8), False))
+    page = pdf_document.new_page()
+    page.insert_text((72, 72), 'Table S1')
+    page.draw_line((72, 75), (120, 75))
+    with pymupdf.open() as scheme:
+        draw_ring(scheme.new_page(width=200, height=200))
+        pdf_document.new_page().show_pdf_page(pymupdf.Rect(72, 72, 272, 272), scheme, 0)
+    page = pdf_document.new_page()
+    page.insert_text((72, 72), 'Compound 3a')
+    draw_ring(page, (100, 200))
+    return pdf_document
+
+class TestPageFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, 'doc.pdf')
+        with make_document() as pdf_document:
+            pdf_document.save(self.pdf_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_structure_free_pages(self):
+        """Text, boxes and rules only; rings and images are kept, drawn on the page or in a form XObject."""
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            self.assertEqual(get_structure_free_pages(pdf_document, range(pdf_document.page_count)), [0, 2, 4])
+            self.assertEqual(get_structure_free_pages(pdf_document, [1, 2]), [2])
+            self.assertEqual(get_page_content(pdf_document, 3).num_images, 1)
+
+    def test_closed_path_rings(self):
+        """Rings drawn as one closed path are kept: the close-path operator draws their last bond."""
+        with pymupdf.open() as pdf_document:
+            draw_closed_ring(pdf_document.new_page())
+            draw_closed_ring(pdf_document.new_page(), num_bonds=5)
+            page = pdf_document.new_page()
+            page.insert_text((72, 72), 'Table S1')
+            page.draw_rect(pymupdf.Rect(72, 80, 540, 200))
+            self.assertEqual(get_structure_free_pages(pdf_document, range(3)), [2])
+
+    @patch_yode(fixed_boxes)
+    def test_skip_and_check(self):
+        """'skip' leaves the structure-free pages out, 'check' detects on them and counts what it finds as misses."""
+        detected = dict()
+        for page_filter in ('skip', 'check', None):
+            page_stats = dict()
+            detected[page_filter] = [page_num for (_, page_num), _, _ in iter_page_segments_yode([self.pdf_path], page_filter=page_filter,
+                                                                                                page_stats=page_stats, embedded_images=False)]
+            if page_filter == 'skip':
+                self.assertEqual(page_stats, {'inspected_pages': 7, 'structure_free_pages': 3, 'skipped_pages': 3})
+            elif page_filter == 'check':
+                self.assertEqual(page_stats, {'inspected_pages': 7, 'structure_free_pages': 3, 'missed_pages': 3, 'missed_structures': 3})
+            else:
+                self.assertEqual(page_stats, {})
+        self.assertEqual(detected['skip'], [1, 3, 5, 6])
+        self.assertEqual(detected['check'], list(range(7)))
+        self.assertEqual(detected[None], list(range(7)))
+        self.assertEqual(list(iter_page_segments_yode([self.pdf_path], pages_by_file={self.pdf_path: [0, 2]})), [])
+        with self.assertRaises(ValueError):
+            list(iter_page_segments_yode([self.pdf_path], page_filter='fast'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.chemsie.internal import full_process
+from src.chemsie.internal.parameter_priors import ParameterPriorStore, LayoutFingerprint
+from src.chemsie.internal.search_strategies import SearchResult
+
+class TestParameterPriors(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ParameterPriorStore(':memory:', min_similarity=0.7, skip_confidence=0.9, min_support=3)
+        self.template = LayoutFingerprint(595, 842, ['TimesNewRoman', 'Arial', 'Symbol'], {'Text_university': 'University of Oxford'})
+        self.other = LayoutFingerprint(612, 792, ['Calibri', 'Cambria'], {})
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_suggest_nearest_template(self):
+        """Unknown layouts get no prior; a known template warm-starts, and skips once enough documents agree."""
+        self.assertEqual(self.store.suggest(self.template), (None, 0.0, 0.0))
+        self.store.record_result('a.pdf', self.template, {'tokens': 60, 'spaces': 30}, 10, 2.0)
+        option, similarity, confidence = self.store.suggest(self.template)
+        self.assertEqual(option, {'tokens': 60, 'spaces': 30})
+        self.assertEqual(similarity, 1.0)
+        self.assertFalse(self.store.should_skip(confidence))
+        for file_name in ['b.pdf', 'c.pdf']:
+            self.store.record_result(file_name, self.template, {'tokens': 60, 'spaces': 30}, 10, 2.0)
+        _, _, confidence = self.store.suggest(self.template)
+        self.assertTrue(self.store.should_skip(confidence))
+        self.assertEqual(self.store.suggest(self.other)[0], None)
+
+    def test_usage_stats(self):
+        self.store.record_usage('a.pdf', 'cold', 0.0, 0.0, 2.0, 0.0)
+        self.store.record_usage('b.pdf', 'skip', 1.0, 1.0, 0.0, 2.0)
+        stats = self.store.get_usage_stats()
+        self.assertEqual(stats['documents'], 2)
+        self.assertEqual(stats['reuse_rate'], 0.5)
+        self.assertEqual(stats['saved_seconds'], 2.0)
+
+    def test_warm_start_only_where_used(self):
+        """Only the strategies that walk from a start option get the prior; a grid run with a prior counts as cold."""
+        prior_option = {'tokens': 60, 'spaces': 30}
+        self.store.record_result('a.pdf', self.template, prior_option, 10, 2.0)
+        start_options = []
+        def fake_search(document_sweep, mol_pic_clusters, optimize_options, search_strategy, eval_budget, start_option=None):
+            start_options.append(start_option)
+            return SearchResult(search_strategy, prior_option, 10, 1, 1.0, len(optimize_options))
+        with patch.object(full_process, 'get_layout_fingerprint', return_value=self.template), \
+             patch.object(full_process, 'run_search_strategy', fake_search):
+            for file_name, search_strategy in [('b.pdf', 'grid'), ('c.pdf', 'plateau')]:
+                full_process.search_with_prior(MagicMock(), [], [prior_option], search_strategy, None, self.store, file_name)
+        self.assertEqual(start_options, [None, prior_option])
+        stats = self.store.get_usage_stats()
+        self.assertEqual((stats['cold'], stats['warm_started']), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
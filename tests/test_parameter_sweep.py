@@ -0,0 +1,92 @@
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+module_names = [
+    'yolov5',
+    'yolov5.utils',
+    'yolov5.utils.augmentations',
+    'yolov5.utils.general',
+    'yolov5.utils.torch_utils',
+    'yolov5.models',
+    'yolov5.models.common',
+    'yolov5.models.yolo',
+    'decimer_segmentation',
+    'imantics',
+    'DECIMER',
+]
+
+for name in module_names:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.chemsie.internal.parameter_sweep import DocumentSweep
+from src.chemsie.internal.segments_creation import get_line_statistics, get_lines_based_on_percentile
+from src.chemsie.internal.full_process import load_default_optimize_options
+from src.chemsie.internal.search_strategies import run_search_strategy, SEARCH_STRATEGIES
+
+def make_page_lines():
+    texts = [
+        '2-(4-methoxyphenyl)-1-methyl-1H-indole (3a)',
+        'To a solution of the aldehyde in dry THF was added the reagent at room temperature',
+        '1H NMR (400 MHz, CDCl3) δ 7.26 (d, J = 8.4 Hz, 2H), 3.85 (s, 3H)',
+        'tert-butyl 4-(2-fluorophenyl)piperazine-1-carboxylate (3b)',
+        'The mixture was stirred for two hours and then concentrated under reduced pressure',
+        '13C NMR (101 MHz, CDCl3) δ 159.1, 130.2, 114.0, 55.3',
+        'ethyl 2-chloro-3-oxobutanoate (3c)',
+        'Rf = 0.4 (hexane/ethyl acetate 4:1)',
+    ]
+    return [(f'0_{line_idx}', text, (10.0 + line_idx, 5.0, 11.0 + line_idx, 90.0)) for line_idx, text in enumerate(texts)]
+
+class TestParameterSweep(unittest.TestCase):
+
+    def test_vectorised_selection_matches_percentile_selection(self):
+        """Every option must select the same boundary lines as get_lines_based_on_percentile."""
+        page_lines = make_page_lines()
+        document_sweep = DocumentSweep(page_lines_with_multi_idx=page_lines)
+        optimize_options = load_default_optimize_options(optimize_version='long')
+        selected_lines_list = document_sweep.get_selected_lines(optimize_options)
+        line_statistics = get_line_statistics(page_lines)
+        for opt_option, selected_lines in zip(optimize_options, selected_lines_list):
+            expected = get_lines_based_on_percentile(*line_statistics, opt_option['tokens'], opt_option['spaces'])
+            self.assertEqual(list(selected_lines), expected)
+
+    def test_segment_cache_reuses_test_lines(self):
+        """Re-processing a selection must hit the segment cache and give the same segments."""
+        document_sweep = DocumentSweep(page_lines_with_multi_idx=make_page_lines())
+        selected_lines = (0, 3, 6)
+        first_segments = document_sweep.process_selected_lines(selected_lines)
+        misses = dict(document_sweep.segment_cache.misses)
+        second_segments = document_sweep.process_selected_lines(selected_lines)
+        self.assertEqual(dict(document_sweep.segment_cache.misses), misses)
+        self.assertGreater(document_sweep.segment_cache.hits['sequences'], 0)
+        self.assertEqual([repr(segment) for segment in first_segments], [repr(segment) for segment in second_segments])
+
+    def test_search_strategies_respect_budget(self):
+        """Strategies must stay within the evaluation budget; the exhaustive grid keeps the first best option."""
+        optimize_options = load_default_optimize_options(optimize_version='long')
+        scores = {(opt_option['tokens'], opt_option['spaces']): 10 - abs(opt_option['tokens'] - 60)//10 - abs(opt_option['spaces'] - 30)//10
+                  for opt_option in optimize_options}
+        document_sweep = MagicMock()
+        document_sweep.evaluate_options.side_effect = lambda options, clusters, line_fraction=1.0: [
+            scores[(opt_option['tokens'], opt_option['spaces'])] for opt_option in options]
+        grid_result = run_search_strategy(document_sweep, None, optimize_options, 'grid')
+        self.assertEqual(grid_result.best_option, {'tokens': 60, 'spaces': 30})
+        self.assertEqual(grid_result.num_evaluated, len(optimize_options))
+        for search_strategy in SEARCH_STRATEGIES:
+            search_result = run_search_strategy(document_sweep, None, optimize_options, search_strategy, eval_budget=12)
+            self.assertLessEqual(search_result.evaluation_cost, 12 + 1e-9)
+            self.assertIn(search_result.best_option, optimize_options)
+        # budgets that do not cover a whole number of evaluations
+        for search_strategy in SEARCH_STRATEGIES:
+            for eval_budget in (0.5, 1.5):
+                search_result = run_search_strategy(document_sweep, None, optimize_options, search_strategy, eval_budget=eval_budget)
+                self.assertLessEqual(search_result.evaluation_cost, eval_budget + 1e-9)
+                self.assertIn(search_result.best_option, optimize_options)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import tempfile
+import os
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.parsing.parse_cache import ParseCache
+from src.parsing.spectra import parse_peaks, configure_parse_cache, get_parse_cache
+
+class TestParseCache(unittest.TestCase):
+
+    def test_hits_copies_and_disk(self):
+        """Repeated texts are hits returning fresh copies; a cache on disk serves a new process, per parser version."""
+        calls = []
+        def parser(kind, text):
+            calls.append(text)
+            return {'kind': kind, 'peaks': [len(text)]}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'parse_cache.sqlite')
+            parse_cache = ParseCache('1', max_size=2, db_path=db_path)
+            first = parse_cache.get_or_parse('carbon', '13C NMR δ 20.1', parser)
+            first['peaks'].append(0)
+            self.assertEqual(parse_cache.get_or_parse('carbon', ' 13C NMR δ 20.1\n', parser), {'kind': 'carbon', 'peaks': [14]})
+            self.assertEqual(parse_cache.get_or_parse('ir', '13C NMR δ 20.1', parser)['kind'], 'ir')
+            self.assertEqual(parse_cache.get_stats()['hits'], 1)
+            self.assertEqual(len(calls), 2)
+            parse_cache.close()
+            reopened = ParseCache('1', db_path=db_path)
+            reopened.get_or_parse('carbon', '13C NMR δ 20.1', parser)
+            self.assertEqual(reopened.get_stats()['disk_hits'], 1)
+            reopened.close()
+            new_version = ParseCache('2', db_path=db_path)
+            new_version.get_or_parse('carbon', '13C NMR δ 20.1', parser)
+            self.assertEqual(new_version.get_stats()['misses'], 1)
+            new_version.close()
+
+    def test_parse_peaks_uses_shared_cache(self):
+        parse_cache = configure_parse_cache()
+        text = '1H NMR (400 MHz, CDCl3) δ 7.26 (s, 1H)'
+        self.assertEqual(parse_peaks(text, '1H NMR'), parse_peaks(text, '1H NMR'))
+        self.assertIs(get_parse_cache(), parse_cache)
+        self.assertEqual(parse_cache.get_stats()['hit_rate'], 0.5)
+
+    def test_reconfigure_registers_no_exit_hook(self):
+        """The replaced cache is closed right away, the one exit hook closes whichever cache is shared."""
+        with tempfile.TemporaryDirectory() as tmp_dir, patch('atexit.register') as register:
+            first = configure_parse_cache(db_path=os.path.join(tmp_dir, 'parse_cache.sqlite'))
+            configure_parse_cache()
+            self.assertIsNone(first.connection)
+        register.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pydantic import ValidationError
+
+from src.chemsie.schemas import ExtractedData, NMRData, NMRPeak, Spectrum, Provenance, BoundingBox, Span
+
+class TestPeakColumns(unittest.TestCase):
+
+    def make_data(self):
+        bbox = BoundingBox(x0=50, y0=100, x1=300, y1=140)
+        provenance = Provenance(page_number=1, bbox=bbox, source="text")
+        other_provenance = Provenance(page_number=1, bbox=bbox, source="text", span=Span(start=3, end=9, text="7.26 (s"))
+        peaks = [NMRPeak(shift=7.26, multiplicity='s', integration=1.0, provenance=provenance),
+                 NMRPeak(shift=3.10, multiplicity='d', integration=2.0, coupling_constants=[7.1], provenance=provenance),
+                 NMRPeak(shift=1.25, multiplicity='dd', coupling_constants=[7.1, 2.0], provenance=other_provenance),
+                 NMRPeak(shift=0.90, multiplicity='m', coupling_constants=[], provenance=provenance)]
+        nmr_data = NMRData(id='s1', molecule_id='m1', nucleus='1H', peaks=peaks, raw_text='1H NMR δ ...', provenance=provenance)
+        ir = Spectrum(type='IR', peaks=[{'wn': 1720.0, 'broad': False}, {'wn': 3400.0, 'broad': True}])
+        ms = Spectrum(type='MS', peaks=[(180.0, 100.0, '')])
+        return ExtractedData(source_filename='a.pdf', molecules=[], reactions=[], spectra=[nmr_data, ir, ms])
+
+    def test_columns(self):
+        """Provenances are stored once, J-values are sliced by offset and None is told apart from []."""
+        peak_columns = self.make_data().spectra[0].to_columnar().peak_columns
+        self.assertEqual(peak_columns.provenance_index, [0, 0, 1, 0])
+        self.assertEqual(len(peak_columns.provenances), 2)
+        self.assertEqual(peak_columns.coupling_offsets, [0, 0, 1, 3, 3])
+        self.assertEqual(peak_columns.missing_coupling, [0])
+        peaks = peak_columns.to_peaks()
+        self.assertIsNone(peaks[0].coupling_constants)
+        self.assertEqual(peaks[3].coupling_constants, [])
+
+    def test_json_round_trip(self):
+        """The columnar JSON is smaller and validates back to the same data in row form."""
+        extracted_data = self.make_data()
+        columnar_json = extracted_data.to_columnar().model_dump_json()
+        self.assertLess(len(columnar_json), len(extracted_data.model_dump_json()))
+        validated = ExtractedData.model_validate_json(columnar_json)
+        self.assertIsNone(validated.spectra[1].peaks)
+        self.assertEqual(validated.spectra[2].peak_columns, None)
+        self.assertEqual(validated.to_rows().model_dump_json(), extracted_data.model_dump_json())
+
+    def test_one_peak_form(self):
+        """NMRData takes peaks or peak_columns, not both and not neither."""
+        nmr_data = self.make_data().spectra[0]
+        fields = nmr_data.model_dump(exclude={'peaks', 'peak_columns'})
+        peak_columns = nmr_data.to_columnar().peak_columns
+        self.assertEqual(NMRData(**fields, peak_columns=peak_columns).peaks, [])
+        self.assertEqual(NMRData(**fields, peaks=[]).peaks, [])
+        with self.assertRaises(ValidationError):
+            NMRData(**fields)
+        with self.assertRaises(ValidationError):
+            NMRData(**fields, peaks=nmr_data.peaks, peak_columns=peak_columns)
+
+if __name__ == '__main__':
+    unittest.main()
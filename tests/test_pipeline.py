@@ -37,7 +37,7 @@ sys.modules['yolov5.models.yolo'].Model = MagicMock()
 sys.modules['DECIMER'].predict_SMILES = MagicMock()
 
 from src.chemsie.schemas import Molecule, ExtractedData, Spectrum
-from src.chemsie.pipeline import run_extraction, _map_old_to_new
+from src.chemsie.pipeline import run_extraction
 
 class TestPipeline(unittest.TestCase):
     
@@ -51,25 +51,25 @@ class TestPipeline(unittest.TestCase):
         self.assertEqual(mol.id, "test-id")
         self.assertEqual(mol.smiles, "C")
         
+    @patch('src.chemsie.pipeline.get_page_sizes', lambda pdf_path: {3: (612.0, 792.0)})
     @patch('src.chemsie.pipeline.process_doc_pics_first')
-    @patch('src.chemsie.pipeline.ExtractedMolecule')
-    def test_run_extraction_mock(self, MockExtractedMolecule, mock_process):
+    def test_run_extraction_mock(self, mock_process):
         """Test run_extraction with mocked backend."""
-        # Setup mocks
-        mock_process.return_value = (["mock_segment"], "mock_clusters")
-        
-        # Mock the legacy object
-        mock_legacy_mol = MagicMock()
-        mock_legacy_mol.molecule_smiles_by_images = "C1=CC=CC=C1"
-        mock_legacy_mol.molecule_name = "Benzene"
+        # Mock the molecule segment
+        mock_segment = MagicMock()
+        mock_segment.mol_pic_smiles = "C1=CC=CC=C1"
+        mock_segment.molecule_name = "Benzene"
+        mock_segment.start_multi_idx, mock_segment.end_multi_idx = "3_10", "3_14"
         mock_test = MagicMock()
         mock_test.test_type = "1H NMR"
-        mock_test.test_text = "7.2 ppm"
-        mock_test.peak_list = [7.2]
-        mock_legacy_mol.molecule_tests = [mock_test]
-        mock_legacy_mol.provenance_segment = None
+        mock_test.text = "1H NMR (400 MHz, CDCl3) δ 7.2 (s, 6H)"
+        mock_test.start_page = 3
+        mock_test.bbox_list = [(3, (10.0, 20.0, 60.0, 5.0))]
+        mock_segment.test_text_sequence.test_text_lines = [mock_test]
+        mock_segment.mol_pics = []
         
-        MockExtractedMolecule.return_value = mock_legacy_mol
+        # Setup mocks
+        mock_process.return_value = ([mock_segment], "mock_clusters")
         
         # Create a dummy PDF file path
         dummy_pdf = Path("test.pdf")
@@ -83,6 +83,7 @@ class TestPipeline(unittest.TestCase):
         self.assertEqual(result.source_filename, "test.pdf")
         self.assertEqual(len(result.spectra), 1)
         self.assertEqual(result.spectra[0].type, "1H NMR")
+        self.assertEqual(result.spectra[0].peaks[0]["shift"], 7.2)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import os
+import math
+import tempfile
+from pathlib import Path
+import sys
+
+import numpy as np
+import torch
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import dark_pixel_boxes, stretch_coords, yolov5_letterbox, yolov5_scale_coords, patch_yode
+
+import pymupdf
+
+from src.chemsie.internal.region_proposals import get_region_proposals, PROPOSAL_MARGIN
+from src.chemsie.internal.mol_pic import get_proposal_layout, get_proposal_boxes, iter_page_segments_yode, get_page_shape
+from src.models.yode_backend import iter_detect_chemical_structures_yode
+
+def draw_ring(page, center, radius=20):
+    page.draw_polyline([(center[0] + radius*math.cos(k*math.pi/3), center[1] + radius*math.sin(k*math.pi/3)) for k in range(7)], width=2)
+
+def make_document():
+    """Pages: a ring, two rings and a caption, a table, text, a ring over an image."""
+    pdf_document = pymupdf.open()
+    draw_ring(pdf_document.new_page(), (150, 200))
+    page = pdf_document.new_page()
+    draw_ring(page, (150, 200))
+    draw_ring(page, (400, 600))
+    page.insert_text((100, 260), 'Compound 3a')
+    page = pdf_document.new_page()
+    for row in range(20):
+        page.draw_rect(pymupdf.Rect(72, 72 + 12*row, 540, 84 + 12*row))
+    pdf_document.new_page().insert_text((72, 72), 'General procedure')
+    page = pdf_document.new_page()
+    page.insert_image(pymupdf.Rect(72, 72, 172, 172), pixmap=pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 8, 8), False))
+    draw_ring(page, (300, 300))
+    return pdf_document
+
+def black_pixel_boxes(img_t):
+    # the box around the black pixels of the input, the grey letterbox padding left out
+    ys, xs = torch.nonzero(img_t.max(dim=0).values < 0.1, as_tuple=True)
+    return [(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1, 0.9)] if len(xs) else []
+
+class TestRegionProposals(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, 'doc.pdf')
+        with make_document() as pdf_document:
+            pdf_document.save(self.pdf_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_proposals(self):
+        """One proposal per drawn ring, with its margin; none for tables, text or pages with images."""
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            proposals = get_region_proposals(pdf_document, 1)
+            self.assertEqual(len(proposals), 2)
+            self.assertTrue(proposals[0].contains(pymupdf.Rect(130, 183, 170, 217)))
+            self.assertLess(proposals[0].width, 40 + 2*PROPOSAL_MARGIN + 4)
+            self.assertTrue(proposals[1].contains(pymupdf.Point(400, 600)))
+            self.assertEqual([get_region_proposals(pdf_document, page_num) for page_num in (2, 3, 4)], [None, None, None])
+
+    def test_layout_and_boxes(self):
+        """Proposals are packed on one shelf, boxes on the mosaic map back into the page at 300 dpi."""
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            page = pdf_document[1]
+            proposals = get_region_proposals(pdf_document, 1)
+            scale, tiles, (height, width) = get_proposal_layout(page, proposals)
+            self.assertEqual([y for _, (_, y) in tiles], [0, 0])
+            self.assertLess(height, 200)
+            rect, (x, y) = tiles[1]
+            # a box from the ring centre to past the tile is clipped to the proposal
+            box = (x + (400 - rect.x0)*scale, y + (600 - rect.y0)*scale, x + rect.width*scale + 10, y + rect.height*scale + 10)
+            (x1, y1, x2, y2), = get_proposal_boxes((scale, tiles, (height, width)), [box], get_page_shape(page))
+            self.assertTrue(np.allclose((x1, y1, x2, y2), np.array([400, 600, rect.x1, rect.y1])*300/72, atol=2))
+
+    @patch_yode(dark_pixel_boxes, stretch_coords)
+    def test_page_boxes(self):
+        """The box found on the proposals is the one found on the whole page; pages without proposals are detected as a whole."""
+        found = dict()
+        for region_proposals in (False, True):
+            page_stats = dict()
+            found[region_proposals] = {page_num: (page_shape, bboxes) for (_, page_num), page_shape, (_, bboxes) in iter_page_segments_yode(
+                [self.pdf_path], pages_by_file={self.pdf_path: [0, 4]}, page_stats=page_stats, region_proposals=region_proposals)}
+        self.assertEqual(page_stats['proposal_pages'], 1)
+        self.assertEqual(page_stats['proposals'], 1)
+        self.assertEqual(found[True][0][0], found[False][0][0])
+        self.assertTrue(np.allclose(found[True][0][1][0], found[False][0][1][0], atol=12)) # 300 dpi pixels
+        self.assertTrue(np.allclose(found[True][4][1], found[False][4][1]))
+
+    @patch_yode(black_pixel_boxes, yolov5_scale_coords, yolov5_letterbox)
+    def test_mosaic_geometry(self):
+        """Boxes map back through the yolov5 letterbox of a mosaic padded, not enlarged, and of a page rendered smaller."""
+        mosaic = np.full((300, 452, 3), 255, dtype=np.uint8) # sides not multiples of the stride
+        mosaic[40:100, 200:330] = 0
+        (_, (_, bboxes)), = iter_detect_chemical_structures_yode([('mosaic', mosaic, mosaic.shape)], scaleup=False)
+        self.assertEqual(bboxes, [(200, 40, 330, 100)])
+        (_, (_, bboxes)), = iter_detect_chemical_structures_yode([('page', mosaic, (600, 904, 3))])
+        self.assertTrue(np.allclose(bboxes, [(400, 80, 660, 200)], atol=2)) # the block blurred by the resize
+
+if __name__ == '__main__':
+    unittest.main()
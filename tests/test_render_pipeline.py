@@ -0,0 +1,90 @@
+import unittest
+import os
+import tempfile
+import weakref
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import value_boxes, patch_yode
+
+import pymupdf
+
+from src.chemsie.internal import mol_pic
+from src.chemsie.internal.mol_pic import iter_page_segments_yode, extract_pics_from_pdf
+
+@patch_yode(value_boxes)
+class TestRenderPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = os.path.join(self.tmp_dir.name, 'doc.pdf')
+        # blank pages, which the page filter would skip
+        pdf_document = pymupdf.open()
+        for _ in range(7):
+            pdf_document.new_page(width=72, height=96) # 300x400 px at 300 dpi
+        pdf_document.save(self.pdf_path)
+        pdf_document.close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_bounded_pages(self):
+        """No more rendered pages are alive than max_in_flight_pages, whatever the batch size asked for."""
+        alive, max_alive = [0], [0]
+        def release():
+            alive[0] -= 1
+        def render_page_for_detection(pdf_document, page_num, imgsz=None, placed_images=None, proposal_layout=None):
+            page_image, page_shape = self.render_page_for_detection(pdf_document, page_num, imgsz, placed_images, proposal_layout)
+            alive[0] += 1
+            max_alive[0] = max(max_alive[0], alive[0])
+            weakref.finalize(page_image, release)
+            return page_image, page_shape
+
+        self.render_page_for_detection = mol_pic.render_page_for_detection
+        keys = []
+        with patch.object(mol_pic, 'render_page_for_detection', render_page_for_detection):
+            for key, page_shape, (segments, bboxes) in iter_page_segments_yode([self.pdf_path, self.pdf_path], batch_size=4, max_in_flight_pages=3, page_filter=None):
+                keys.append(key)
+                self.assertEqual((page_shape, bboxes), ((400, 300, 3), [(255, 255, 259, 259)]))
+                self.assertEqual(segments[0].shape, (4, 4, 3))
+        self.assertEqual(keys, [(self.pdf_path, page_num) for page_num in range(7)]*2)
+        self.assertEqual(max_alive[0], 3)
+        self.assertEqual(alive[0], 0)
+
+    def test_extract_pics(self):
+        mol_pics = extract_pics_from_pdf(self.pdf_path, backend='yode', batch_size=2, max_in_flight_pages=2, page_filter=None)
+        self.assertEqual([mol_pic.page_num for mol_pic in mol_pics], list(range(7)))
+        self.assertEqual(mol_pics[0].bbox, (85.0, 63.75, 1.33, 1.0))
+
+    def test_two_resolution(self):
+        """Detecting on the low resolution page gives the boxes, crops and page shape of the 300 dpi one."""
+        with pymupdf.open(self.pdf_path) as pdf_document:
+            for page in pdf_document:
+                page.draw_rect(page.rect, color=None, fill=(0.5, 0.5, 0.5))
+            pdf_document.save(self.pdf_path, incremental=True, encryption=pymupdf.PDF_ENCRYPT_KEEP)
+        low, full = (list(iter_page_segments_yode([self.pdf_path], two_resolution=two_resolution, page_filter=None)) for two_resolution in (True, False))
+        self.assertEqual(len(low), 7)
+        for (key, page_shape, (segments, bboxes)), (full_key, full_page_shape, (full_segments, full_bboxes)) in zip(low, full):
+            self.assertEqual((key, page_shape, bboxes), (full_key, full_page_shape, full_bboxes))
+            self.assertEqual(bboxes, [(127, 127, 131, 131)])
+            self.assertTrue(all((segment == full_segment).all() for segment, full_segment in zip(segments, full_segments)))
+
+    def test_render_clip(self):
+        """A clip render is the crop of the full page render."""
+        with pymupdf.open() as pdf_document:
+            page = pdf_document.new_page(width=200, height=150)
+            page.draw_circle((60, 70), 30, color=(0, 0, 1), fill=(1, 0, 0))
+            page.insert_text((100, 40), 'OMe', fontsize=14)
+            page_image = mol_pic.render_page(pdf_document, 0)
+            for x1, y1, x2, y2 in [(100, 120, 380, 400), (401, 90, 520, 170), (0, 0, 833, 625)]:
+                crop = mol_pic.render_clip(page, (x1, y1, x2, y2))
+                self.assertEqual(crop.shape, page_image[y1:y2, x1:x2].shape)
+                self.assertLessEqual(abs(crop.astype(int) - page_image[y1:y2, x1:x2]).max(), 16)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.text_cleaning.rule_profiler import load_rule_packs, make_adversarial_texts, profile_rules
+
+class TestRuleProfiler(unittest.TestCase):
+
+    def test_hits_and_time_budget(self):
+        """Hits are counted per rule, and a catastrophic rule is stopped by the time budget."""
+        rules = [('clean', 'STEROMER', r'\(R\)|\(S\)'), ('clean', 'NESTED', r'(a|aa)+b')]
+        profiles = profile_rules(['(R)-1 and (S)-2', 'no stereo'], rules, [('nested', 'a'*40)], time_budget=0.05)
+        self.assertEqual(profiles[('clean', 'STEROMER')]['corpus'].hits, 2)
+        self.assertEqual(profiles[('clean', 'STEROMER')]['corpus'].texts_hit, 1)
+        self.assertEqual(profiles[('clean', 'NESTED')]['adversarial'].timeouts, ['nested'])
+        self.assertEqual(list(profiles)[0], ('clean', 'NESTED'))
+        self.assertTrue(make_adversarial_texts(load_rule_packs(), sizes=(50,)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import json
+from types import SimpleNamespace
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.segment_mapping import map_segments_to_models, map_segments_to_records
+from src.parsing.parse_cache import ParseCache
+from src.parsing.spectra import parse_peaks, parse_peaks_many
+
+PROTON_TEXT = "1H NMR (400 MHz, CDCl3) δ 7.26 (d, J = 8.0 Hz, 2H), 2.35 (s, 3H)."
+CARBON_TEXT = "13C{1H} NMR (101 MHz, CDCl3) δ 137.2, 129.1, 21.0."
+A4_PAGE_SIZES = {2: (595.0, 842.0), 3: (595.0, 842.0)}
+# [{segment, molecule, spectra}], what the ExtractedMolecule mapping gave (1H NMR given its peak list, it
+# rejected the parse result dict); IDs and provenance pages and boxes were placeholders then, they are left out
+EXPECTED_PATH = Path(__file__).resolve().parent / 'fixtures' / 'schema_mapping_expected.json'
+SPECTRUM_FIELDS = {'type': True, 'text_representation': True, 'peaks': True, 'provenance': {'source', 'method'}}
+
+class UntouchablePic:
+    """A matched structure image whose pixels must not be read by the mapping."""
+    page_num = 2
+    bbox = (10.0, 20.0, 30.0, 15.5)
+
+    @property
+    def pic(self):
+        raise AssertionError("the mapping read the image array")
+
+def make_segment(name="4-Methylbiphenyl (3a)", start_multi_idx="2_10"):
+    test_text_lines = [SimpleNamespace(test_type="1H NMR", text=PROTON_TEXT, start_page=2, bbox_list=[(2, (12.0, 50.0, 70.0, 3.0))]),
+                       SimpleNamespace(test_type="13C{1H} NMR", text=CARBON_TEXT, start_page=3,
+                                       bbox_list=[(2, (12.0, 90.0, 70.0, 2.0)), (3, (12.0, 5.0, 70.0, 2.0))])]
+    return SimpleNamespace(molecule_name=name, mol_pic_smiles="Cc1ccc(cc1)-c1ccccc1", start_multi_idx=start_multi_idx, end_multi_idx="3_2",
+                           mol_pics=[UntouchablePic()], test_text_sequence=SimpleNamespace(test_text_lines=test_text_lines))
+
+class TestSegmentMapping(unittest.TestCase):
+
+    def test_models(self):
+        """Peak lists of every kind, provenance from the test lines and the image, without reading its pixels."""
+        [(molecule, spectra)] = map_segments_to_models([make_segment()], "a.pdf", page_sizes=A4_PAGE_SIZES)
+        self.assertEqual((molecule.label, molecule.smiles), ("4-Methylbiphenyl (3a)", "Cc1ccc(cc1)-c1ccccc1"))
+        self.assertEqual(molecule.provenance[0].role, "structure_image")
+        bbox = molecule.provenance[0].bbox
+        self.assertEqual((bbox.x0, bbox.y0, bbox.x1, bbox.y1), (59.5, 543.09, 238.0, 673.6))
+        self.assertEqual([spectrum.type for spectrum in spectra], ["1H NMR", "13C NMR"])
+        self.assertEqual([peak["shift"] for peak in spectra[0].peaks], [7.26, 2.35])
+        self.assertEqual(spectra[1].peaks, [21.0, 129.1, 137.2])
+        self.assertEqual(spectra[1].provenance.page_number, 3)
+        self.assertEqual({spectrum.molecule_id for spectrum in spectra}, {molecule.id})
+
+    def test_provenance_bboxes(self):
+        """Text and image boxes, in percent of the page from the top, are mapped to PDF points from the bottom of their page."""
+        [(molecule, spectra)] = map_segments_to_records([make_segment()], "a.pdf", page_sizes=A4_PAGE_SIZES)
+        self.assertEqual(spectra[0]["provenance"]["bbox"], {"x0": 71.4, "y0": 395.74, "x1": 487.9, "y1": 421.0})
+        self.assertEqual(spectra[1]["provenance"]["bbox"], {"x0": 71.4, "y0": 783.06, "x1": 487.9, "y1": 799.9})
+        for provenance in [molecule["provenance"][0]] + [spectrum["provenance"] for spectrum in spectra]:
+            bbox = provenance["bbox"]
+            page_width, page_height = A4_PAGE_SIZES[provenance["page_number"]]
+            self.assertTrue(0 <= bbox["x0"] < bbox["x1"] <= page_width and 0 <= bbox["y0"] < bbox["y1"] <= page_height)
+        # no page size, no box
+        [(molecule, spectra)] = map_segments_to_records([make_segment()], "a.pdf")
+        self.assertEqual(molecule["provenance"], [])
+        self.assertEqual(spectra[0]["provenance"]["bbox"], {"x0": 0.0, "y0": 0.0, "x1": 0.0, "y1": 0.0})
+
+    def test_matches_previous_mapping(self):
+        """Molecules and spectra carry what the previous mapping gave them."""
+        for expected in json.loads(EXPECTED_PATH.read_text(encoding='utf-8')):
+            segment = expected['segment']
+            test_text_lines = [SimpleNamespace(test_type=test_type, text=text, start_page=1, bbox_list=[]) for test_type, text in segment['tests']]
+            molecule_segment = SimpleNamespace(molecule_name=segment['molecule_name'], mol_pic_smiles=segment['mol_pic_smiles'],
+                                               start_multi_idx='1_0', end_multi_idx='1_9', mol_pics=[],
+                                               test_text_sequence=SimpleNamespace(test_text_lines=test_text_lines))
+            [(molecule, spectra)] = map_segments_to_models([molecule_segment], "a.pdf")
+            self.assertEqual(molecule.model_dump(mode='json', include={'smiles', 'label', 'inchi'}), expected['molecule'])
+            self.assertEqual([spectrum.model_dump(mode='json', include=SPECTRUM_FIELDS) for spectrum in spectra], expected['spectra'])
+
+    def test_deterministic_ids(self):
+        """The same segment always gets the same ID; another document, place or name gets another one."""
+        segments = [make_segment(), make_segment(), make_segment(start_multi_idx="5_1"), make_segment(name="3b")]
+        ids = [molecule["id"] for molecule, _ in map_segments_to_records(segments, "a.pdf")]
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(len(set(ids[1:])), 3)
+        self.assertEqual(ids, [molecule["id"] for molecule, _ in map_segments_to_records(segments, "a.pdf")])
+        self.assertNotEqual(ids[0], next(map_segments_to_records([make_segment()], "b.pdf"))[0]["id"])
+
+    def test_parse_peaks_many(self):
+        """Texts are parsed once per batch, the results are those of parse_peaks."""
+        test_texts = [PROTON_TEXT, CARBON_TEXT, " " + PROTON_TEXT, None, "IR (neat) 1715, 2950 cm-1"]
+        test_types = ["1H NMR", "13C NMR", "1H NMR", "MS", "UV"]
+        self.assertEqual(parse_peaks_many(test_texts, test_types), [parse_peaks(text, test_type) for text, test_type in zip(test_texts, test_types)])
+
+        batches = []
+        def batch_parser(kind, texts):
+            batches.append(texts)
+            return [len(text) for text in texts]
+        parse_cache = ParseCache('1')
+        self.assertEqual(parse_cache.get_or_parse_many('carbon', ['ab', ' ab', 'abc'], batch_parser), [2, 2, 3])
+        self.assertEqual(parse_cache.get_or_parse_many('carbon', ['abc', 'abcd'], batch_parser), [3, 4])
+        self.assertEqual(batches, [['ab', 'abc'], ['abcd']])
+        self.assertEqual((parse_cache.get_stats()['hits'], parse_cache.get_stats()['misses']), (2, 3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+module_names = [
+    'yolov5',
+    'yolov5.utils',
+    'yolov5.utils.augmentations',
+    'yolov5.utils.general',
+    'yolov5.utils.torch_utils',
+    'yolov5.models',
+    'yolov5.models.common',
+    'yolov5.models.yolo',
+    'decimer_segmentation',
+    'imantics',
+    'DECIMER',
+]
+
+for name in module_names:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.chemsie.internal.molecule_segment_obj import MoleculeSegment
+from src.chemsie.internal.sequences2segments import spilt_molecule_segment_by_test_sequences
+from src.chemsie.internal.test_text_line import TestTextLine
+from src.chemsie.internal.test_text_sequence import TestTextSequence
+
+def make_segment_lines():
+    """Two compounds, each a name, a procedure and its 1H NMR and 13C NMR lines."""
+    texts = []
+    for name in ('2-(4-methoxyphenyl)-1-methyl-1H-indole (3a)', 'ethyl 2-chloro-3-oxobutanoate (3b)'):
+        texts += [name,
+                  'The mixture was stirred for two hours and then concentrated under reduced pressure.',
+                  '1H NMR (400 MHz, CDCl3) δ 7.26 (d, J = 8.4 Hz, 2H), 3.85 (s, 3H).',
+                  '13C NMR (101 MHz, CDCl3) δ 159.1, 130.2, 114.0, 55.3.']
+    return [(f'0_{line_num}', text, (10.0*line_num, 5.0, 10.0*line_num + 8.0, 90.0)) for line_num, text in enumerate(texts)]
+
+def make_test_text_sequence(segment_lines, start, end):
+    return TestTextSequence([TestTextLine(segment_lines[line_num][0], segment_lines[line_num + 1][0], {0: [segment_lines[line_num][2]]},
+                                          test_type, segment_lines[line_num][1])
+                             for line_num, test_type in zip(range(start, end), ('1H NMR', '13C NMR'))])
+
+class TestSequences2Segments(unittest.TestCase):
+
+    def test_split_by_test_sequences(self):
+        """A segment holding the test sequences of two compounds is split after each sequence, not dropped."""
+        segment_lines = make_segment_lines() + [('0_8', 'General procedure B', (80.0, 5.0, 88.0, 90.0))]
+        test_text_sequences = [make_test_text_sequence(segment_lines, 2, 4), make_test_text_sequence(segment_lines, 6, 8)]
+        molecule_segments = spilt_molecule_segment_by_test_sequences(MoleculeSegment(segment_lines), test_text_sequences)
+        self.assertEqual([molecule_segment.segment_lines for molecule_segment in molecule_segments], [segment_lines[:4], segment_lines[4:8]])
+        self.assertEqual([molecule_segment.test_text_sequence for molecule_segment in molecule_segments], test_text_sequences)
+        self.assertTrue(all(molecule_segment.spectra for molecule_segment in molecule_segments))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import json
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.parsing.spectra import parse_spectra_batch, parse_peaks, parse_proton_nmr, parse_carbon_nmr, parse_ir, parse_ms
+
+# {test type: [{text, peaks}]}, the peaks the per-string parsers gave before the batch parser
+EXPECTED_PATH = Path(__file__).resolve().parent / 'fixtures' / 'spectra_parser_expected.json'
+
+def as_json(peaks):
+    # the recorded peaks went through JSON, tuples became lists
+    return json.loads(json.dumps(peaks))
+
+class TestSpectraParser(unittest.TestCase):
+
+    def test_batch_matches_per_string_parsers(self):
+        """The batch tables and the per-string wrappers must give what the previous parsers gave."""
+        expected_peaks = json.loads(EXPECTED_PATH.read_text(encoding='utf-8'))
+        parsers = [('1H NMR', parse_proton_nmr), ('13C NMR', parse_carbon_nmr), ('IR', parse_ir), ('MS', parse_ms)]
+        for test_type, parser in parsers:
+            texts = [expected['text'] for expected in expected_peaks[test_type]]
+            peak_table = parse_spectra_batch(texts, test_type)
+            self.assertEqual(len(peak_table), len(texts))
+            for text_idx, (text, expected) in enumerate(zip(texts, expected_peaks[test_type])):
+                self.assertEqual(as_json(parser(text)), expected['peaks'])
+                self.assertEqual(as_json(peak_table.to_records(text_idx)), expected['peaks'])
+        proton_text = expected_peaks['1H NMR'][0]['text']
+        proton_table = parse_spectra_batch([proton_text], '1H NMR')
+        self.assertEqual(proton_table.get_peaks(0)['shift'].tolist(), [7.99, 7.46, 3.89])
+        self.assertEqual(as_json(parse_peaks(proton_text, '1H NMR')), expected_peaks['1H NMR'][0]['peaks'])
+        self.assertEqual(parse_peaks('7.26 (s)', 'Rf'), [])
+
+if __name__ == '__main__':
+    unittest.main()
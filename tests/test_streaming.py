@@ -0,0 +1,84 @@
+import unittest
+import tempfile
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+for name in ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+             'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo', 'decimer_segmentation', 'imantics', 'DECIMER']:
+    sys.modules[name] = MagicMock()
+
+from pydantic import ValidationError
+
+from src.chemsie.pipeline import stream_extraction
+from src.chemsie.segment_mapping import map_segments_to_models, map_segments_to_records
+from src.chemsie.streaming import NDJSONExtractionWriter, read_extracted_data, iter_extracted_molecules, TRUNCATED_ERROR
+
+def make_segment(test_type="13C NMR"):
+    segment = MagicMock()
+    segment.mol_pic_smiles = "c1ccccc1"
+    segment.molecule_name = "3a"
+    segment.start_multi_idx, segment.end_multi_idx = "4_2", "4_9"
+    test = MagicMock()
+    test.test_type = test_type
+    test.text = "13C NMR δ 128.5, 21.3"
+    test.start_page = 4
+    test.bbox_list = [(4, (10.0, 40.0, 60.0, 5.0))]
+    segment.test_text_sequence.test_text_lines = [test]
+    segment.mol_pics = [MagicMock(page_num=4, bbox=(10, 20, 25, 15))]
+    return segment
+
+class TestStreaming(unittest.TestCase):
+
+    def test_record_mapping_matches_models(self):
+        """The trusted dict mapping is the JSON form of the validated models."""
+        [(molecule, spectra)] = map_segments_to_models([make_segment()], 'a.pdf', {4: (612.0, 792.0)})
+        [(molecule_record, spectra_records)] = map_segments_to_records([make_segment()], 'a.pdf', {4: (612.0, 792.0)})
+        self.assertEqual(len(molecule_record['provenance']), 1)
+        self.assertEqual(molecule_record, molecule.model_dump(mode='json'))
+        self.assertEqual(spectra_records, [spectrum.model_dump(mode='json') for spectrum in spectra])
+
+    def test_write_and_read(self):
+        """Models and trusted dicts are written line by line; a file without footer is reported as cut short."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ndjson_path = os.path.join(tmp_dir, 'out.ndjson')
+            with NDJSONExtractionWriter(ndjson_path, 'a.pdf') as writer:
+                writer.write_molecule(*next(map_segments_to_models([make_segment()], 'a.pdf')))
+                writer.write_molecule(*next(map_segments_to_records([make_segment()], 'a.pdf')))
+                writer.close(errors=['page 3 skipped'])
+            extracted_data = read_extracted_data(ndjson_path)
+            self.assertEqual((extracted_data.source_filename, len(extracted_data.molecules)), ('a.pdf', 2))
+            self.assertEqual([spectrum.peaks for spectrum in extracted_data.spectra], [[21.3, 128.5], [21.3, 128.5]])
+            self.assertEqual(extracted_data.errors, ['page 3 skipped'])
+            self.assertEqual(len(list(iter_extracted_molecules(ndjson_path))), 2)
+
+            with self.assertRaises(RuntimeError):
+                with NDJSONExtractionWriter(ndjson_path, 'a.pdf') as writer:
+                    writer.write_molecule(*next(map_segments_to_records([make_segment()], 'a.pdf')))
+                    raise RuntimeError('crashed')
+            extracted_data = read_extracted_data(ndjson_path)
+            self.assertEqual((len(extracted_data.molecules), extracted_data.errors), (1, [TRUNCATED_ERROR]))
+
+            with open(ndjson_path, 'a') as f:
+                f.write('{"record": "molecule", "molecule": {}}\n')
+            with self.assertRaisesRegex(ValueError, 'line 3'):
+                read_extracted_data(ndjson_path)
+
+    @patch('src.chemsie.pipeline.get_page_sizes', lambda pdf_path: {4: (612.0, 792.0)})
+    @patch('src.chemsie.pipeline.process_doc_pics_first')
+    def test_stream_extraction_strict(self, mock_process):
+        """Trusted data is written as it is, strict mode validates it first."""
+        mock_process.return_value = ([make_segment(test_type=None)], "mock_clusters")
+        with tempfile.TemporaryDirectory() as tmp_dir, patch('pathlib.Path.exists', return_value=True):
+            ndjson_path = os.path.join(tmp_dir, 'out.ndjson')
+            self.assertEqual(stream_extraction(Path("test.pdf"), ndjson_path), 1)
+            with self.assertRaises(ValidationError):
+                stream_extraction(Path("test.pdf"), ndjson_path, strict=True)
+
+if __name__ == '__main__':
+    unittest.main()
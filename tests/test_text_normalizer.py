@@ -0,0 +1,35 @@
+import unittest
+import pickle
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.text_cleaning.clean_patterns import clean_text_by_tokens, load_default_clean_tokens
+from src.chemsie.internal.text_cleaning.replacement import replace_text_by_tokens, load_default_replacement_tokens
+from src.chemsie.internal.text_cleaning.test_enders import cut_text_by_enders, load_default_end_tokens
+from src.chemsie.internal.text_cleaning.normalizer import TextNormalizer
+
+class TestTextNormalizer(unittest.TestCase):
+
+    def test_matches_rule_functions(self):
+        """Compiled clean, replace and ender cuts must give what the rule functions give, also after pickling."""
+        texts = ['[1H] NMR (400 MHz, CDCl3) δ 7.26 (S, J = 7.1 Hz, 1H), (R) 3.10 (D , J = 2.0 Hz, 2H) Chapter 2 15 IR 3050',
+                 '21H NMR (CDCl3) δ 1.20 (t, J = 7.0 Hz, 3H) (obscured by CDCl3) HRMS calcd for C10H12O 148.0888',
+                 'IR (neat) 2950, 1720 cm-1; Rf = 0.3 (hexane)',
+                 '']
+        test_names = ['1H NMR', 'NMR']
+        text_enders = [text_ender for text_ender in load_default_end_tokens() if text_ender not in test_names]
+        replacement_patterns, replacement_dict = load_default_replacement_tokens()
+        expected = []
+        for text in texts:
+            text = cut_text_by_enders(text, text_enders)
+            text = clean_text_by_tokens(text, load_default_clean_tokens())
+            expected.append(replace_text_by_tokens(text, replacement_patterns, replacement_dict))
+        text_normalizer = TextNormalizer()
+        for normalizer in [text_normalizer, pickle.loads(pickle.dumps(text_normalizer))]:
+            self.assertEqual([normalizer.normalize(normalizer.cut_by_enders(text, test_names)) for text in texts], expected)
+
+if __name__ == '__main__':
+    unittest.main()
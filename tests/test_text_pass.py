@@ -0,0 +1,22 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+
+DEMO_PDF = Path(__file__).resolve().parent.parent / "experiments" / "demo_data" / "Benchmark_data_16.pdf"
+
+class TestTextPass(unittest.TestCase):
+
+    def test_layout_only_matches_rendered(self):
+        """Layout-only geometry must give the same lines as the rendered pixmap size."""
+        rendered_lines = extract_text_with_multi_idx(str(DEMO_PDF), layout_only=False)
+        layout_lines = extract_text_with_multi_idx(str(DEMO_PDF), layout_only=True)
+        self.assertTrue(layout_lines)
+        self.assertEqual(rendered_lines, layout_lines)
+
+if __name__ == '__main__':
+    unittest.main()
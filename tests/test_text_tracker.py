@@ -0,0 +1,41 @@
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.chemsie.internal.text_processing.init_processing import extract_text_with_multi_idx
+from src.chemsie.internal.text_processing.document_lines import DocumentLines
+from src.chemsie.internal.test_text_line import concatenate_and_track, find_end_index_in_tracker
+
+DEMO_DIR = Path(__file__).resolve().parent.parent / "experiments" / "demo_data"
+
+def find_end_index_by_prefixes(reduced_text, segmented_lines):
+    """The prefix-copy search the tracker replaces."""
+    full_text = ''
+    for multi_idx, line_text, _ in segmented_lines:
+        full_text += line_text
+        if reduced_text in full_text:
+            return multi_idx
+    return None
+
+class TestTextTracker(unittest.TestCase):
+
+    def test_end_lines_match_prefix_search(self):
+        """On windows of the benchmark PDFs, the tracker must find the end line the prefix search finds."""
+        for pdf_path in sorted(DEMO_DIR.glob('Benchmark_data_*.pdf')):
+            page_lines = extract_text_with_multi_idx(str(pdf_path))
+            document_lines = DocumentLines.from_tuples(page_lines)
+            for start in range(0, len(page_lines), 7):
+                window = page_lines[start:start + 21]
+                full_text, text_tracker = concatenate_and_track(window)
+                _, document_tracker = concatenate_and_track(document_lines[start:start + 21])
+                cut = full_text[len(window[0][1])//2:]
+                for reduced_text in [cut[:40], cut[:-15].rstrip(), window[-1][1], '', 'not in the window']:
+                    expected = find_end_index_by_prefixes(reduced_text, window)
+                    self.assertEqual(find_end_index_in_tracker(reduced_text, text_tracker), expected)
+                    self.assertEqual(find_end_index_in_tracker(reduced_text, document_tracker), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock missing dependencies BEFORE imports
+from tests.yode_fakes import FakeModel, value_boxes, patch_yode
+
+from src.models import yode_backend
+from src.models.yode_backend import iter_segment_chemical_structures_yode, segment_chemical_structures_yode
+
+def make_page(value, height=20):
+    return np.full((height, 16, 3), value, dtype=np.uint8)
+
+@patch_yode(value_boxes, model=False)
+class TestYodeBatching(unittest.TestCase):
+
+    def test_batches_keep_pages_apart(self):
+        """Pages go through the model batch_size at a time, grouped by input shape, and come back in order under their keys."""
+        fake_model = FakeModel()
+        keyed_images = [(('a.pdf', 0), make_page(1)), (('a.pdf', 1), make_page(2)),
+                        (('b.pdf', 0), make_page(3, height=24)), (('b.pdf', 1), make_page(4)), (('c.pdf', 0), make_page(5))]
+        with patch.object(yode_backend, '_get_yolo_model', return_value=(fake_model, 'cpu', 32)):
+            results = list(iter_segment_chemical_structures_yode(iter(keyed_images), batch_size=2))
+            single_result = segment_chemical_structures_yode(make_page(7))
+
+        self.assertEqual([key for key, _ in results], [key for key, _ in keyed_images])
+        self.assertEqual([bboxes for _, (_, bboxes) in results], [[(v, v, v + 4, v + 4)] for v in range(1, 6)])
+        self.assertEqual([segments[0].shape for _, (segments, _) in results], [(4, 4, 3)]*5)
+        self.assertEqual(fake_model.input_shapes, [(2, 3, 20, 16), (1, 3, 24, 16), (1, 3, 20, 16), (1, 3, 20, 16), (1, 3, 20, 16)])
+        self.assertEqual(single_result[1], [(7, 7, 11, 11)])
+
+if __name__ == '__main__':
+    unittest.main()
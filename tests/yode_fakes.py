@@ -0,0 +1,121 @@
+"""
+A stand-in for the YoDe detector in tests. Importing this module mocks out the yolov5 modules
+(not installed here), so it is to be imported before anything from src. patch_yode patches
+src.models.yode_backend with a pass-through model and an NMS whose boxes are computed from the
+input by a box rule (value_boxes, dark_pixel_boxes, ...), and with the letterbox and scale_coords
+geometry given: none by default, or that of yolov5 (yolov5_letterbox, yolov5_scale_coords).
+"""
+import sys
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import torch
+
+YOLOV5_MODULES = ['yolov5', 'yolov5.utils', 'yolov5.utils.augmentations', 'yolov5.utils.general', 'yolov5.utils.torch_utils',
+                  'yolov5.models', 'yolov5.models.common', 'yolov5.models.yolo']
+
+for name in YOLOV5_MODULES:
+    sys.modules.setdefault(name, MagicMock())
+
+from src.models import yode_backend
+
+
+class FakeModel:
+    """Returns its input as the prediction and records the batch shapes it is called with."""
+    fp16 = False
+
+    def __init__(self):
+        self.input_shapes = []
+
+    def __call__(self, img_t, augment=False, visualize=False):
+        self.input_shapes.append(tuple(img_t.shape))
+        return img_t
+
+
+def value_boxes(img_t):
+    # one 4x4 box at (v, v) for an input filled with the value v
+    v = round(float(img_t.mean())*255)
+    return [(v, v, v + 4, v + 4, 0.9)]
+
+def fixed_boxes(img_t):
+    # one box on every input
+    return [(10, 10, 20, 20, 0.9)]
+
+def dark_pixel_boxes(img_t):
+    # the box around the dark pixels of the input, confident when some are black, borderline when all are grey
+    darkness = img_t.min(dim=0).values
+    ys, xs = torch.nonzero(darkness < 0.5, as_tuple=True)
+    if not len(xs):
+        return []
+    return [(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1, 0.9 if darkness.min() < 0.1 else 0.3)]
+
+
+def make_fake_nms(box_rule):
+    """non_max_suppression giving, for each input (CHW, 0-1), the (x1, y1, x2, y2, conf) boxes of box_rule(input)."""
+    def fake_nms(pred, **nms_options):
+        return [torch.tensor([[*box, 0.0] for box in box_rule(img_t)], dtype=torch.float32).reshape(-1, 6) for img_t in pred]
+    return fake_nms
+
+def fake_letterbox(im, new_shape, stride, auto, scaleup=True):
+    # the input as it is
+    return im, (1.0, 1.0), (0.0, 0.0)
+
+def yolov5_letterbox(im, new_shape, stride, auto, scaleup=True):
+    # the yolov5 letterbox (utils.augmentations): resize keeping the aspect ratio, then pad to the stride
+    r = min(new_shape / im.shape[0], new_shape / im.shape[1])
+    if not scaleup:
+        r = min(r, 1.0)
+    new_unpad = (round(im.shape[1] * r), round(im.shape[0] * r))
+    dw, dh = new_shape - new_unpad[0], new_shape - new_unpad[1]
+    if auto:
+        dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+    dw, dh = dw / 2, dh / 2
+    if (im.shape[1], im.shape[0]) != new_unpad:
+        im = cv2.resize(im, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(dh - 0.1), round(dh + 0.1)
+    left, right = round(dw - 0.1), round(dw + 0.1)
+    im = cv2.copyMakeBorder(im, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return im, (r, r), (dw, dh)
+
+def keep_coords(input_shape, coords, image_shape, ratio_pad=None):
+    return coords
+
+def stretch_coords(input_shape, coords, image_shape, ratio_pad=None):
+    # the input is the image resized, without padding
+    coords[:, [0, 2]] *= image_shape[1] / input_shape[1]
+    coords[:, [1, 3]] *= image_shape[0] / input_shape[0]
+    return coords
+
+def yolov5_scale_coords(input_shape, coords, image_shape, ratio_pad=None):
+    # the yolov5 scale_coords (utils.general): the letterbox undone, from ratio_pad or from the shapes
+    if ratio_pad is None:
+        gain = min(input_shape[0] / image_shape[0], input_shape[1] / image_shape[1])
+        pad = (input_shape[1] - image_shape[1] * gain) / 2, (input_shape[0] - image_shape[0] * gain) / 2
+    else:
+        gain, pad = ratio_pad[0][0], ratio_pad[1]
+    coords[:, [0, 2]] -= pad[0]
+    coords[:, [1, 3]] -= pad[1]
+    coords[:, :4] /= gain
+    coords[:, [0, 2]] = coords[:, [0, 2]].clamp(0, image_shape[1])
+    coords[:, [1, 3]] = coords[:, [1, 3]].clamp(0, image_shape[0])
+    return coords
+
+
+def patch_yode(box_rule, scale_coords=keep_coords, letterbox=fake_letterbox, model=True):
+    """
+    Decorator (class or test method) patching yode_backend with the fake detector: make_fake_nms
+    of box_rule, letterbox and scale_coords, and a FakeModel unless model is False (for tests
+    that patch _get_yolo_model themselves).
+    """
+    patches = [patch.object(yode_backend, 'non_max_suppression', make_fake_nms(box_rule)),
+               patch.object(yode_backend, 'scale_coords', scale_coords),
+               patch.object(yode_backend, 'letterbox', letterbox)]
+    if model:
+        patches.append(patch.object(yode_backend, '_get_yolo_model', lambda **kwargs: (FakeModel(), 'cpu', 32)))
+
+    def decorator(target):
+        for yode_patch in patches:
+            target = yode_patch(target)
+        return target
+    return decorator